@@ -0,0 +1,239 @@
+"""
+backup.py
+
+설정 백업 수집기 (Ansible backup.yml 대체 경로): 여러 장비의 running-config 를 동시에 받아
+내용 주소(content-addressed) 저장소에 보관하고, 바뀐 장비 목록을 validate.py 에 넘긴다.
+
+- 수집: 장비마다 vtysh 'show running-config' 1회 (vtysh.py 실행 백엔드 -> NETAUTO_EXECUTOR=fake 가능),
+  스레드 풀(--workers) + 장비당 제한 시간(--timeout). FRR 머리말("Building configuration..." 등)과
+  끝 줄 "end" 는 떼어 낸다.
+- 저장소 (backups/.store, git 제외)
+  * objects/<앞 2자리>/<sha256> : 설정 본문 (같은 내용은 한 번만 저장 -> 장비 수천 대여도 중복 제거)
+  * refs/<호스트>               : "<UTC 시각> <sha256>" 이력 (내용이 바뀔 때만 한 줄 추가, 마지막 줄 = 현재)
+- backups/<호스트>.conf : 현재 본문 (validate.py / 사람이 보는 파일). 바뀐 장비만 다시 쓴다.
+- python/out/backup_changed.txt : 이번 수집에서 새로 생기거나 바뀐 호스트 (한 줄에 하나)
+  -> python python/validate.py --changed-only 가 이 호스트들만(+ 입력/결과가 바뀐 호스트) 다시 검증
+- 부분 결과 모드(기본값): 일부 장비가 실패해도 나머지는 저장한다 (--no-partial: 실패 시 종료코드 1)
+
+사용 예:
+    python python/backup.py                         # routers 그룹 전체
+    python python/backup.py --group routers --shard 1/4 --workers 64
+    python python/backup.py --log clab-netauto-r1   # 호스트 이력
+"""
+
+import argparse
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+import inventory
+import tracing
+import vtysh
+
+ROOT = Path(__file__).resolve().parents[1]
+BACKUPS_DIR = ROOT / "backups"
+STORE_DIR = BACKUPS_DIR / ".store"
+CHANGED_PATH = ROOT / "python" / "out" / "backup_changed.txt"
+
+DEFAULT_GROUP = "routers"
+DEFAULT_WORKERS = 32
+DEFAULT_TIMEOUT = 20.0
+SHOW_RUN = "show running-config"
+_HEADER = ("Building configuration...", "Current configuration:")
+
+
+def clean_running_config(text: str) -> str:
+    """
+    'show running-config' 출력 -> 설정 본문 (머리말·앞쪽 '!' / 끝의 '!' 와 'end' 제거, 끝 개행 1개).
+    FRR 이 덧붙이는 앞뒤 줄만 떼므로 같은 설정을 다시 받아도 본문이 같다 (백업 -> 재수집이 고정점).
+    """
+    lines = text.splitlines()
+    while lines and lines[0].strip() in _HEADER + ("", "!"):
+        lines.pop(0)
+    while lines and lines[-1].strip() in ("", "end"):
+        lines.pop()
+    while lines and lines[-1].strip() == "!":
+        lines.pop()
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _atomic_write(path: Path, data: bytes):
+    """임시 파일(쓰는 쪽마다 고유 이름)에 쓰고 이름 바꾸기 -> 같은 경로를 동시에 써도 서로 지우지 않는다"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".part-{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class Store:
+    """sha256 -> 본문 blob, 호스트 -> 이력 ref."""
+
+    def __init__(self, root: Path = STORE_DIR):
+        self.root = Path(root)
+
+    def _object(self, sha: str) -> Path:
+        return self.root / "objects" / sha[:2] / sha
+
+    def _ref(self, host: str) -> Path:
+        return self.root / "refs" / host
+
+    def put(self, text: str) -> str:
+        """
+        본문 저장 (이미 있으면 쓰지 않음). 반환: sha256
+        같은 본문을 여러 스레드가 동시에 넣어도 안전하다 (내용이 같으므로 마지막 replace 가 이겨도 결과 동일)
+        """
+        data = text.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        obj = self._object(sha)
+        if not obj.exists():
+            _atomic_write(obj, data)
+        return sha
+
+    def get(self, sha: str) -> str:
+        return self._object(sha).read_text(encoding="utf-8")
+
+    def log(self, host: str) -> list[tuple[str, str]]:
+        """[(UTC 시각, sha256), ...] 오래된 것부터"""
+        try:
+            text = self._ref(host).read_text(encoding="utf-8")
+        except OSError:
+            return []
+        return [tuple(line.split(" ", 1)) for line in text.splitlines() if " " in line]
+
+    def head(self, host: str) -> str | None:
+        entries = self.log(host)
+        return entries[-1][1] if entries else None
+
+    def update(self, host: str, sha: str, when: str | None = None) -> bool:
+        """현재 sha 와 다르면 이력에 한 줄 추가. 반환: 추가했으면 True"""
+        if self.head(host) == sha:
+            return False
+        ref = self._ref(host)
+        ref.parent.mkdir(parents=True, exist_ok=True)
+        when = when or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with open(ref, "a", encoding="utf-8") as f:
+            f.write(f"{when} {sha}\n")
+        return True
+
+
+def backup_host(host: str, store: Store, backups_dir: Path = BACKUPS_DIR,
+                timeout: float = DEFAULT_TIMEOUT, run=None) -> dict:
+    """
+    장비 1대 백업. 예외를 올리지 않고 결과 dict 로 돌려준다.
+    반환: {"host", "status": new|changed|unchanged|error, "sha", "error", "bytes", "latency_ms"}
+    """
+    run = run or vtysh.run_batch
+    start = time.monotonic()
+    res = {"host": host, "status": "error", "sha": None, "error": None, "bytes": 0}
+    with tracing.span("device", cat="backup", device=host) as sp:
+        try:
+            out = run(host, [SHOW_RUN], timeout=timeout)
+            text = clean_running_config(out.outputs.get(SHOW_RUN, ""))
+            if out.returncode != 0 or not text:
+                res["error"] = f"rc={out.returncode}: {(out.stderr or out.stdout).strip() or 'empty config'}"
+        except subprocess.TimeoutExpired as e:
+            res["error"] = f"timeout after {e.timeout:.1f}s"
+        except OSError as e:
+            res["error"] = str(e)
+        if res["error"] is None:
+            data = text.encode("utf-8")
+            res["bytes"] = len(data)
+            try:
+                prev = store.head(host)
+                res["sha"] = sha = store.put(text)
+                store.update(host, sha)
+                current = Path(backups_dir) / f"{host}.conf"
+                try:
+                    same_file = current.stat().st_size == len(data) and current.read_bytes() == data
+                except OSError:
+                    same_file = False
+                if not same_file:
+                    _atomic_write(current, data)
+                res["status"] = "new" if prev is None else "changed" if prev != sha or not same_file else "unchanged"
+            except OSError as e:
+                res["error"] = f"store: {e}"
+        sp.set(bytes=res["bytes"], status=res["status"])
+        if res["error"]:
+            sp.set(error=res["error"])
+    res["latency_ms"] = round((time.monotonic() - start) * 1000, 1)
+    return res
+
+
+def backup_all(hosts: list[str], store: Store | None = None, backups_dir: Path = BACKUPS_DIR,
+               workers: int = DEFAULT_WORKERS, timeout: float = DEFAULT_TIMEOUT, run=None) -> list[dict]:
+    """여러 장비를 스레드 풀로 동시에 백업. 반환 순서는 hosts 순서."""
+    if not hosts:
+        return []
+    store = store or Store()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(hosts)))) as pool:
+        futures = {pool.submit(backup_host, h, store, backups_dir, timeout, run): h for h in hosts}
+        done = {futures[f]: f.result() for f in as_completed(futures)}
+    return [done[h] for h in hosts]
+
+
+def changed_hosts(results: list[dict]) -> list[str]:
+    return [r["host"] for r in results if r["status"] in ("new", "changed")]
+
+
+def read_changed(path: Path = CHANGED_PATH) -> set[str] | None:
+    """backup_changed.txt -> 호스트 집합 (파일이 없으면 None = 알 수 없음)"""
+    try:
+        text = Path(path).read_text(encoding="utf-8")
+    except OSError:
+        return None
+    return {line.strip() for line in text.splitlines() if line.strip()}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="running-config 병렬 백업 (내용 주소 저장소)")
+    ap.add_argument("hosts", nargs="*", help="백업 대상 (기본: 인벤토리 --group 장비)")
+    ap.add_argument("--group", default=DEFAULT_GROUP, help="인벤토리 그룹 (기본: routers)")
+    ap.add_argument("--shard", type=inventory.shard_arg, default=None,
+                    help="i/N: 호스트 이름 해시 기준 N 조각 중 i번째만 백업")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="동시 수집 장비 수 상한")
+    ap.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="장비 1대당 제한 시간(초)")
+    ap.add_argument("--dir", type=Path, default=BACKUPS_DIR, help="백업 디렉토리 (기본: backups)")
+    ap.add_argument("--changed-out", type=Path, default=CHANGED_PATH,
+                    help="바뀐 호스트 목록 경로 (기본: python/out/backup_changed.txt)")
+    ap.add_argument("--partial", action=argparse.BooleanOptionalAction, default=True,
+                    help="일부 장비 실패 시에도 나머지 저장 후 종료코드 0 (--no-partial: 종료코드 1)")
+    ap.add_argument("--log", metavar="HOST", default=None, help="호스트 백업 이력 출력 후 종료")
+    tracing.add_arguments(ap)
+    args = ap.parse_args(argv)
+
+    store = Store(args.dir / ".store")
+    if args.log:
+        for when, sha in store.log(args.log):
+            print(when, sha)
+        return 0
+
+    hosts = inventory.select(args.hosts, args.group, args.shard)
+    with tracing.session("backup", args.trace, args.profile):
+        results = backup_all(hosts, store, args.dir, args.workers, args.timeout)
+    failed = [r for r in results if r["status"] == "error"]
+    for r in failed:
+        print(f"[WARN] {r['host']}: {r['error']}", file=sys.stderr)
+    changed = changed_hosts(results)
+    args.changed_out.parent.mkdir(parents=True, exist_ok=True)
+    args.changed_out.write_text("".join(h + "\n" for h in changed), encoding="utf-8")
+    print(f"backups: {len(changed)} changed, {len(results) - len(changed) - len(failed)} unchanged, "
+          f"{len(failed)} error(s) -> {args.changed_out}")
+    return 1 if failed and not args.partial else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+bench.py
+
+핫 패스 벤치마크 + 기준선 비교 (synth.py 합성 데이터 사용, 랩 불필요).
+
+- 단계(stage)마다: 준비(시간 측정 제외) -> 반복 실행 중 최소 시간 -> tracemalloc 으로 1회 더 실행해 최대 메모리
+  * throughput = 처리 항목 수 / 초  (경로 줄, 이웃, 장비, testcase, 호스트 ...)
+  * peak_kib   = 실행 중 추가로 잡힌 최대 메모리
+- 파서 캐시(frr_parse LRU)는 매 실행 전에 비워 캐시 적중이 아니라 실제 파싱을 잰다.
+- 기준선(python/bench_baseline.json, 규모별)과 비교해 throughput이 --tolerance 이상 떨어지거나
+  peak 메모리가 --mem-tolerance 이상 늘면 회귀로 보고 종료코드 1.
+  기준선은 머신 의존적이므로 같은 머신/러너에서 --update-baseline 으로 갱신한다.
+- 기준선 단계에 max_seconds 가 있으면 그 시간을 넘는 것도 회귀 (요구 시간 목표, 예: medium
+  state_diff = 10만 경로 테이블 두 개 비교 1초). --update-baseline 은 이 값을 유지한다.
+
+사용 예:
+    python python/bench.py                      # small 규모, 기준선 비교
+    python python/bench.py --scale large --stages parse_routes,state_diff
+    python python/bench.py --scale medium --update-baseline
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+
+import config_tree
+import configgen
+import frr_parse
+import history
+import prefix_audit
+import report
+import state_diff
+import synth
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE_PATH = ROOT / "python" / "bench_baseline.json"
+
+# 규모별 크기: routes = 장비 1대 경로 수, routers = 장비 수, ...
+SCALES = {
+    "small":  {"routes": 1_000,     "neighbors": 1_000,   "routers": 100,   "tests": 1_000,   "hosts": 100},
+    "medium": {"routes": 100_000,   "neighbors": 10_000,  "routers": 1_000, "tests": 10_000,  "hosts": 1_000},
+    "large":  {"routes": 1_000_000, "neighbors": 100_000, "routers": 5_000, "tests": 100_000, "hosts": 5_000},
+}
+DEFAULT_TOLERANCE = 0.30      # throughput 30% 이상 하락 = 회귀
+DEFAULT_MEM_TOLERANCE = 0.30  # peak 메모리 30% 이상 증가 = 회귀
+
+
+@dataclass
+class Stage:
+    name: str
+    unit: str
+    setup: object    # (sizes, tmpdir) -> ctx
+    run: object      # ctx -> 처리 항목 수
+
+
+# --- 단계 정의 ---
+def _setup_routes(sz, _tmp):
+    return synth.route_table(sz["routes"])
+
+
+def _run_routes(text):
+    frr_parse._route_cache.clear()
+    report.parse_ospf_routes_count(text)
+    return text.count("\n")
+
+
+def _setup_neighbors(sz, _tmp):
+    return synth.neighbor_table(sz["neighbors"])
+
+
+def _run_neighbors(text):
+    frr_parse._route_cache.clear()
+    n, _ = report.parse_ospf_neighbors(text)
+    return n
+
+
+def _setup_aggregate(sz, _tmp):
+    return synth.snapshot(sz["routers"])
+
+
+def _run_aggregate(data):
+    frr_parse._route_cache.clear()
+    report.aggregate_metrics(data)
+    return len(data)
+
+
+def _setup_junit(sz, tmp):
+    p = Path(tmp) / "junit.xml"
+    p.write_text(synth.junit_xml(sz["tests"], suites=max(1, sz["tests"] // 500)), encoding="utf-8")
+    return p
+
+
+def _run_junit(path):
+    return report.parse_junit(path)["tests"]
+
+
+def _setup_config_diff(sz, _tmp):
+    return [(synth.router_config(i), synth.router_config(i, interfaces=7)) for i in range(sz["hosts"])]
+
+
+def _run_config_diff(pairs):
+    # validate.check_host 의 비교 단계: 트리 파싱 -> 섹션 선택 -> diff
+    sections = config_tree.parse_sections("ospf,interface")
+    for old, new in pairs:
+        config_tree.diff(config_tree.select(config_tree.parse(old), sections),
+                         config_tree.select(config_tree.parse(new), sections))
+    return len(pairs)
+
+
+def _setup_render(sz, _tmp):
+    return configgen.TEMPLATE.read_text(encoding="utf-8"), [synth.host_vars(i) for i in range(sz["hosts"])]
+
+
+def _run_render(ctx):
+    tpl_src, contexts = ctx
+    for hv in contexts:
+        configgen.render(tpl_src, hv)
+    return len(contexts)
+
+
+def _setup_state_diff(sz, _tmp):
+    # 원문 파싱은 parse_routes 단계가 잰다: 파서 캐시는 미리 채우고 그룹화 + 조인만 잰다
+    old = {"routes": synth.route_table(sz["routes"], seed=1)}
+    new = {"routes": synth.route_table(sz["routes"], seed=2)}
+    frr_parse.parse_routes(old["routes"])
+    frr_parse.parse_routes(new["routes"])
+    return old, new
+
+
+def _run_state_diff(ctx):
+    history._groups_cache.clear()
+    state_diff.diff_device(*ctx)
+    return ctx[1]["routes"].count("\n")
+
+
+def _setup_prefix_audit(sz, _tmp):
+    return synth.fleet_vars(sz["hosts"])
+
+
+def _run_prefix_audit(ctxs):
+    if prefix_audit.audit(ctxs):
+        raise AssertionError("synthetic fleet should have no prefix findings")
+    return len(ctxs)
+
+
+STAGES = {s.name: s for s in (
+    Stage("parse_routes", "lines", _setup_routes, _run_routes),
+    Stage("parse_neighbors", "neighbors", _setup_neighbors, _run_neighbors),
+    Stage("aggregate_metrics", "routers", _setup_aggregate, _run_aggregate),
+    Stage("parse_junit", "tests", _setup_junit, _run_junit),
+    Stage("config_diff", "hosts", _setup_config_diff, _run_config_diff),
+    Stage("validate_render", "hosts", _setup_render, _run_render),
+    Stage("state_diff", "lines", _setup_state_diff, _run_state_diff),
+    Stage("prefix_audit", "hosts", _setup_prefix_audit, _run_prefix_audit),
+)}
+
+
+# --- 측정 ---
+def measure(stage: Stage, sizes: dict, repeat: int = 3) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = stage.setup(sizes, tmp)
+        best, items = float("inf"), 0
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            items = stage.run(ctx)
+            best = min(best, time.perf_counter() - t0)
+        tracemalloc.start()
+        try:
+            stage.run(ctx)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        "unit": stage.unit,
+        "items": items,
+        "seconds": round(best, 6),
+        "throughput": round(items / best, 1) if best > 0 else None,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(names, scale: str, repeat: int = 3) -> dict[str, dict]:
+    sizes = SCALES[scale]
+    return {n: measure(STAGES[n], sizes, repeat) for n in names}
+
+
+def compare(results: dict, baseline: dict,
+            tolerance: float = DEFAULT_TOLERANCE,
+            mem_tolerance: float = DEFAULT_MEM_TOLERANCE) -> list[str]:
+    """기준선 대비 회귀 목록 (기준선에 없는 단계는 비교하지 않음, max_seconds 는 절대 목표 시간)."""
+    out = []
+    for name, r in results.items():
+        b = baseline.get(name)
+        if not b:
+            continue
+        if b.get("throughput") and r["throughput"] is not None \
+                and r["throughput"] < b["throughput"] * (1 - tolerance):
+            out.append(f"{name}: throughput {r['throughput']:,.0f} < baseline {b['throughput']:,.0f} "
+                       f"{r['unit']}/s (-{1 - r['throughput'] / b['throughput']:.0%})")
+        if b.get("max_seconds") and r["seconds"] > b["max_seconds"]:
+            out.append(f"{name}: {r['seconds']:.3f}s > target {b['max_seconds']:.3f}s")
+        if b.get("peak_kib") and r["peak_kib"] > b["peak_kib"] * (1 + mem_tolerance):
+            out.append(f"{name}: peak {r['peak_kib']:,.0f} KiB > baseline {b['peak_kib']:,.0f} KiB "
+                       f"(+{r['peak_kib'] / b['peak_kib'] - 1:.0%})")
+    return out
+
+
+def load_baseline(path: Path) -> dict:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def format_table(results: dict, baseline: dict) -> str:
+    lines = [f"{'stage':<18} {'items':>9} {'seconds':>9} {'throughput':>14} {'vs base':>8} {'peak KiB':>10}"]
+    for name, r in results.items():
+        b = baseline.get(name) or {}
+        rel = f"{r['throughput'] / b['throughput']:.2f}x" if b.get("throughput") and r["throughput"] else "-"
+        lines.append(f"{name:<18} {r['items']:>9,} {r['seconds']:>9.4f} "
+                     f"{r['throughput'] or 0:>10,.0f}/{r['unit'][:3]} {rel:>8} {r['peak_kib']:>10,.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="파서/리포트/드리프트 핫 패스 벤치마크")
+    ap.add_argument("--scale", choices=tuple(SCALES), default="small")
+    ap.add_argument("--stages", default=",".join(STAGES),
+                    help=f"쉼표 구분 단계 (기본: 전체 = {','.join(STAGES)})")
+    ap.add_argument("--repeat", type=int, default=3, help="단계별 반복 횟수 (최소 시간 채택)")
+    ap.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    ap.add_argument("--update-baseline", action="store_true", help="이번 결과로 기준선(해당 규모) 갱신")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    ap.add_argument("--mem-tolerance", type=float, default=DEFAULT_MEM_TOLERANCE)
+    ap.add_argument("--json", type=Path, default=None, help="결과를 JSON 파일로도 저장")
+    args = ap.parse_args(argv)
+
+    names = [n.strip() for n in args.stages.split(",") if n.strip()]
+    unknown = [n for n in names if n not in STAGES]
+    if unknown:
+        ap.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    results = run(names, args.scale, args.repeat)
+    all_baselines = load_baseline(args.baseline)
+    baseline = all_baselines.get(args.scale, {})
+    print(f"scale={args.scale} {SCALES[args.scale]}")
+    print(format_table(results, baseline))
+    if args.json:
+        args.json.write_text(json.dumps({"scale": args.scale, "results": results}, indent=2), encoding="utf-8")
+
+    if args.update_baseline:
+        all_baselines[args.scale] = {**baseline, **{
+            n: {**baseline.get(n, {}), **{k: r[k] for k in ("unit", "items", "throughput", "peak_kib")}}
+            for n, r in results.items()}}
+        args.baseline.write_text(json.dumps(all_baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"baseline updated: {args.baseline} [{args.scale}]")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance, args.mem_tolerance)
+    for msg in regressions:
+        print(f"[REGRESSION] {msg}", file=sys.stderr)
+    if not baseline:
+        print(f"(no baseline for scale={args.scale}; run with --update-baseline)", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
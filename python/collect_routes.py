@@ -4,67 +4,253 @@ collect_routes.py
 컨테이너 기반 FRR 라우터들에서 라우팅/OSPF 상태를 수집해
 python/out/routes.json 파일에 저장하는 스크립트.
 
-- 각 컨테이너에 대해:
+- 각 컨테이너에 대해 (vtysh.py 배치로 docker exec 1회):
   * 'show ip route' (전체 라우팅 테이블)
   * 'show ip ospf neighbor' (OSPF 이웃 상태)
+- 대상 장비는 inventory.py의 --group(기본 routers) 장비, --shard i/N 으로 나눠 수집할 수 있다.
+- 장비들은 스레드 풀(--workers)로 동시에 수집한다.
+- 명령당(--cmd-timeout) / 장비당(--device-timeout) 데드라인을 두어
+  멈춘 vtysh 하나가 전체 수집을 막지 않도록 한다.
+  (배치 전체 제한 시간 = min(명령 수 x cmd-timeout, device-timeout))
+- 구조화 모드(--structured): 'show ip route json' / 'show ip ospf neighbor json'을
+  같은 배치에 추가로 실행해 frr_records.py의 타입 레코드(route_records /
+  neighbor_records)로 저장한다. report.py는 레코드가 있으면 그것으로 집계하고
+  원문 텍스트 파싱은 레코드가 없을 때만 쓴다.
+- 스트리밍 모드(--format ndjson): 장비 하나가 끝날 때마다 NDJSON 한 줄을 바로 쓴다
+  (snapshot.py, .gz/.zst 압축 가능). 메모리는 장비 수와 무관하고 도중에 죽어도
+  끝난 장비는 남는다. --export-json 으로 기존 routes.json 형식도 함께 만든다.
+- --history DB: 저장한 스냅샷을 history.py 시계열 저장소에 변경분만 추가한다.
+- 구간 트레이스(tracing.py): NETAUTO_TRACE / --trace 로 장비별 exec·파싱·저장 시간과 받은 바이트를
+  trace-collect_routes.json 에 남긴다 (--profile 로 cProfile/샘플링).
+- 주기 수집은 상주 수집기(collectd.py)가 같은 collect_device()를 장비별 세션으로 돌린다.
+- 부분 결과 모드(기본값): 일부 장비가 실패해도 routes.json을 저장하고
+  노드별 error / latency_ms 필드로 실패 원인과 소요 시간을 남긴다.
 - 수집 결과 예:
   {
-    "clab-netauto-r1": {"routes": "...원문...", "ospf": "...원문..."},
-    "clab-netauto-r2": {"routes": "...",       "ospf": "..."}
+    "clab-netauto-r1": {"routes": "...원문...", "ospf": "...원문...",
+                        "error": null, "latency_ms": 412.3},
+    "clab-netauto-r2": {"routes": "", "ospf": "",
+                        "error": "timeout after 20.0s", "latency_ms": 20004.1}
   }
 """
 
+import argparse
 import json
 import subprocess
 import pathlib
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# 수집 대상 컨테이너 이름들.
-# containerlab로 만든 라우터 컨테이너 이름과 동일해야 한다.
-# 필요 시 인벤토리/백업 파일에서 자동 추출하는 방식으로 개선 가능.
-CONTAINERS = ["clab-netauto-r1", "clab-netauto-r2"]
+import frr_records
+import history
+import inventory
+import snapshot
+import tracing
+import vtysh
 
-# 출력 디렉토리 Path 객체. 존재하지 않으면 생성한다.
-OUT = pathlib.Path("python/out")
-OUT.mkdir(parents=True, exist_ok=True)
+# 수집 대상 기본 그룹: inventory.py가 inventory.ini / 토폴로지에서 찾은 이 그룹의 장비
+# (인벤토리 호스트 이름 = containerlab 컨테이너 이름)
+DEFAULT_GROUP = "routers"
 
-def sh(cmd: str) -> str:
+# 출력 디렉토리 Path 객체. 존재하지 않으면 main()에서 생성한다.
+OUT = pathlib.Path(__file__).resolve().parent / "out"
+
+# 결과 키 -> vtysh 명령
+COMMANDS = {
+    "routes": "show ip route",          # 전체 라우팅 테이블 (OSPF만 원하면 show ip route ospf)
+    "ospf": "show ip ospf neighbor",    # OSPF 이웃 상태
+}
+
+# 구조화 모드에서 추가로 실행: 결과 키 -> (vtysh 명령, JSON -> 레코드 변환 함수)
+JSON_COMMANDS = {
+    "route_records": ("show ip route json", frr_records.route_records),
+    "neighbor_records": ("show ip ospf neighbor json", frr_records.neighbor_records),
+}
+
+DEFAULT_WORKERS = 16          # 동시에 수집할 최대 장비 수
+DEFAULT_CMD_TIMEOUT = 10.0    # 명령 1개당 제한 시간(초)
+DEFAULT_DEVICE_TIMEOUT = 30.0 # 장비 1대당 전체 제한 시간(초)
+
+
+def collect_device(container: str,
+                   cmd_timeout: float = DEFAULT_CMD_TIMEOUT,
+                   device_timeout: float = DEFAULT_DEVICE_TIMEOUT,
+                   structured: bool = False,
+                   run=vtysh.run_batch) -> dict:
+    """
+    장비 1대에서 COMMANDS를 배치 1회로 실행해 노드 결과 dict를 만든다.
+    - run: (container, commands, timeout) -> vtysh.BatchResult
+      기본은 docker exec 1회(run_batch), 상주 수집기는 열린 세션의 VtyshSession.run을 넘긴다
+    - structured=True 면 JSON_COMMANDS도 같은 배치로 실행해 레코드로 저장
+      (JSON이 깨졌거나 비어 있으면 레코드 키를 생략 -> report는 텍스트로 대체)
+    - 배치 timeout은 min(명령 수 x cmd_timeout, device_timeout)
+    - 실패해도 예외를 올리지 않고 error 필드에 원인을 기록한다
+    - 종료코드가 0이 아니어도 받은 명령 결과는 그대로 남긴다(부분 결과)
+    """
+    start = time.monotonic()
+    commands = list(COMMANDS.values())
+    if structured:
+        commands += [cmd for cmd, _ in JSON_COMMANDS.values()]
+    timeout = min(cmd_timeout * len(commands), device_timeout)
+    node = {key: "" for key in COMMANDS}
+    node["error"] = None
+    with tracing.span("device", cat="collect", device=container, commands=len(commands)) as sp:
+        try:
+            with tracing.span("exec", cat="collect"):
+                res = run(container, commands, timeout=timeout)
+            sp.set(bytes=len(res.stdout or ""))
+            for key, cmd in COMMANDS.items():
+                node[key] = res.outputs[cmd]
+            if structured:
+                with tracing.span("parse_json", cat="collect"):
+                    for key, (cmd, to_records) in JSON_COMMANDS.items():
+                        try:
+                            node[key] = to_records(json.loads(res.outputs[cmd]))
+                        except (ValueError, AttributeError, TypeError):
+                            pass
+            if res.returncode != 0:
+                err = (res.stderr or res.stdout).strip()
+                node["error"] = f"rc={res.returncode}: {err}"
+        except subprocess.TimeoutExpired as e:
+            node["error"] = f"timeout after {e.timeout:.1f}s"
+        except OSError as e:
+            node["error"] = str(e)
+        if node["error"]:
+            sp.set(error=node["error"])
+    node["latency_ms"] = round((time.monotonic() - start) * 1000, 1)
+    return node
+
+
+def iter_collect(containers: list[str],
+                 workers: int = DEFAULT_WORKERS,
+                 cmd_timeout: float = DEFAULT_CMD_TIMEOUT,
+                 device_timeout: float = DEFAULT_DEVICE_TIMEOUT,
+                 structured: bool = False):
+    """
+    여러 장비를 스레드 풀로 동시에 수집하고, 끝나는 순서대로 (컨테이너, 노드 결과)를 낸다.
+    """
+    if not containers:
+        return
+    workers = max(1, min(workers, len(containers)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(collect_device, c, cmd_timeout, device_timeout, structured): c
+            for c in containers
+        }
+        for fut in as_completed(futures):
+            yield futures[fut], fut.result()
+
+
+def collect_all(containers: list[str],
+                workers: int = DEFAULT_WORKERS,
+                cmd_timeout: float = DEFAULT_CMD_TIMEOUT,
+                device_timeout: float = DEFAULT_DEVICE_TIMEOUT,
+                structured: bool = False) -> dict:
     """
-    쉘 명령을 실행하고 stdout을 문자열로 반환한다.
-    - shell=True: 문자열 기반 셸 명령 사용
-    - text=True: 바이트가 아닌 문자열로 결과 반환
-    - capture_output=True: stdout/stderr를 캡처(여기선 stdout만 사용)
-    주의: 외부 입력을 그대로 cmd에 넣지 말 것(셸 인젝션 위험).
+    여러 장비를 스레드 풀로 동시에 수집한다.
+    반환 dict의 키 순서는 containers 순서를 따른다.
     """
-    result = subprocess.run(
-        cmd,
-        shell=True,
-        text=True,
-        capture_output=True
-    )
-    # 여기서는 간단히 stdout만 반환.
-    # 필요 시 result.returncode / result.stderr 검사 로깅 가능.
-    return result.stdout
-
-# 최종적으로 JSON으로 직렬화할 누적 딕셔너리
-data = {}
-
-# 각 컨테이너에 대해 라우팅/OSPF 상태를 수집
-for c in CONTAINERS:
-    # 전체 라우팅 테이블 수집 (OSPF만 원하면 show ip route ospf 로 변경)
-    routes = sh(f"docker exec {c} vtysh -c 'show ip route'")
-    # OSPF 이웃 상태 수집
-    ospf   = sh(f"docker exec {c} vtysh -c 'show ip ospf neighbor'")
-
-    # 컨테이너 이름을 키로 하여 원문 텍스트를 저장
-    data[c] = {
-        "routes": routes,  # 라우팅 테이블 원문
-        "ospf": ospf       # OSPF 이웃 테이블 원문
-    }
-
-# 수집 결과를 pretty JSON으로 저장 (들여쓰기 2칸)
-with open(OUT / "routes.json", "w") as f:
-    json.dump(data, f, indent=2)
-
-# 사용자 피드백용 메시지
-print("saved python/out/routes.json")
+    nodes = dict(iter_collect(containers, workers, cmd_timeout, device_timeout, structured))
+    return {c: nodes[c] for c in containers}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="FRR 라우팅/OSPF 상태 병렬 수집")
+    ap.add_argument("containers", nargs="*",
+                    help="수집 대상 컨테이너 (기본: 인벤토리 --group 장비)")
+    ap.add_argument("--group", default=DEFAULT_GROUP, help="인벤토리 그룹 (기본: routers)")
+    ap.add_argument("--shard", type=inventory.shard_arg, default=None,
+                    help="i/N: 장비 이름 해시 기준 N 조각 중 i번째만 수집 (여러 프로세스/머신 분할)")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                    help="동시 수집 장비 수 상한")
+    ap.add_argument("--cmd-timeout", type=float, default=DEFAULT_CMD_TIMEOUT,
+                    help="명령 1개당 제한 시간(초)")
+    ap.add_argument("--device-timeout", type=float, default=DEFAULT_DEVICE_TIMEOUT,
+                    help="장비 1대당 전체 제한 시간(초)")
+    ap.add_argument("--structured", action="store_true",
+                    help="'show ... json' 출력도 수집해 타입 레코드로 저장")
+    ap.add_argument("--partial", action=argparse.BooleanOptionalAction, default=True,
+                    help="일부 장비 실패 시에도 결과 저장 (--no-partial: 실패 시 저장하지 않고 종료코드 1)")
+    ap.add_argument("--format", choices=("json", "ndjson"), default="json",
+                    help="json: routes.json 한 번에 저장 / ndjson: 장비별 한 줄씩 스트리밍 저장")
+    ap.add_argument("--compress", choices=tuple(snapshot.COMPRESS_SUFFIXES), default="none",
+                    help="기본 출력 경로에 붙일 압축 형식 (--out 지정 시 그 확장자를 따름)")
+    ap.add_argument("--out", type=pathlib.Path, default=None,
+                    help="결과 경로 (기본: python/out/routes.json 또는 routes.ndjson[.gz|.zst])")
+    ap.add_argument("--export-json", type=pathlib.Path, default=None,
+                    help="ndjson 수집 후 기존 routes.json 형식으로도 내보낼 경로")
+    ap.add_argument("--history", type=pathlib.Path, default=None,
+                    help="수집 결과를 추가할 이력 DB (history.py, SQLite)")
+    tracing.add_arguments(ap)
+    args = ap.parse_args(argv)
+    args.containers = inventory.select(args.containers, args.group, args.shard)
+    if args.out is None:
+        name = "routes.json" if args.format == "json" else "routes.ndjson"
+        args.out = OUT / (name + snapshot.COMPRESS_SUFFIXES[args.compress])
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    with tracing.session("collect_routes", args.trace, args.profile):
+        return _run(args)
+
+
+def _run(args) -> int:
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    nodes = iter_collect(args.containers, args.workers, args.cmd_timeout, args.device_timeout,
+                         args.structured)
+
+    failed = {}
+    data = {}
+    # ndjson: 임시(.part-<이름>) 파일에 장비별로 바로 쓰고, 끝나면 이름을 바꾼다
+    # (확장자를 그대로 두므로 도중에 죽어도 snapshot.iter_nodes()로 읽을 수 있다)
+    part = args.out.with_name(".part-" + args.out.name)
+    writer = snapshot.NdjsonWriter(part) if args.format == "ndjson" else None
+    try:
+        for c, node in nodes:
+            if node["error"]:
+                failed[c] = node["error"]
+                print(f"[WARN] {c}: {node['error']}", file=sys.stderr)
+            if writer:
+                writer.write(c, node)
+            else:
+                data[c] = node
+    finally:
+        if writer:
+            writer.close()
+    total = writer.count if writer else len(data)
+
+    if failed and not args.partial:
+        if writer:
+            part.unlink()
+        print(f"[ERROR] {len(failed)}/{total} device(s) failed; not writing {args.out}", file=sys.stderr)
+        return 1
+
+    if writer:
+        part.replace(args.out)
+        if args.export_json:
+            snapshot.export_json(args.out, args.export_json)
+            print(f"exported {args.export_json}")
+    else:
+        # 수집 결과를 pretty JSON으로 저장 (들여쓰기 2칸, 순서는 containers 순서)
+        with tracing.span("write", cat="io", path=str(args.out)) as sp:
+            with snapshot.open_text(args.out, "w") as f:
+                json.dump({c: data[c] for c in args.containers if c in data}, f, indent=2)
+            sp.set(bytes=args.out.stat().st_size)
+
+    # 사용자 피드백용 메시지
+    print(f"saved {args.out} ({total - len(failed)}/{total} ok)")
+
+    if args.history:
+        with tracing.span("history", cat="io"):
+            conn = history.connect(args.history)
+            run_id, changed = history.ingest(conn, snapshot.iter_nodes(args.out), source=str(args.out))
+            conn.close()
+        print(f"history run {run_id}: {changed} change(s)")
+    return 0
+
 
+if __name__ == "__main__":
+    sys.exit(main())
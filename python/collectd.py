@@ -0,0 +1,298 @@
+"""
+collectd.py
+
+상주 수집기 (collect_routes.py의 주기 실행판).
+
+- 장비마다 vtysh 세션(vtysh.VtyshSession)을 하나씩 열어 두고 계속 재사용한다.
+  => 폴링 한 번의 지연 = 명령 실행 시간 (python 기동 / import / docker exec 비용 없음)
+- 스케줄러: (다음 실행 시각, 장비) 힙 하나 + 스레드 풀
+  * 장비별 주기(--device-interval r1=10)와 지터(--jitter)로 폴링이 한 시점에 몰리지 않게 한다
+  * 실패한 장비는 주기 x 2^연속실패 (최대 --max-backoff) 로 물러나고, 세션은 닫았다가 새로 연다
+  * 한 장비의 폴링이 끝나야 그 장비의 다음 폴링을 예약하므로 같은 장비가 겹쳐 돌지 않는다
+- 최신 스냅샷을 메모리에 들고 HTTP로 제공한다 (collect_routes.py 결과와 같은 노드 payload)
+  * GET /snapshot          : routes.json 형식 전체
+  * GET /snapshot.ndjson   : NDJSON (snapshot.iter_nodes / report.py --routes URL 로 스트리밍 읽기)
+  * GET /snapshot/<장비>   : 장비 하나
+  * GET /status            : 장비별 폴링 횟수 / 연속 실패 / 다음 실행까지 남은 시간
+
+사용 예:
+    python python/collectd.py --interval 30 --structured --listen 127.0.0.1:9180
+    NETAUTO_COLLECTOR=http://127.0.0.1:9180 python python/report.py
+    NETAUTO_COLLECTOR=http://127.0.0.1:9180 pytest -q      # snapshot 픽스처가 수집기에서 읽음
+"""
+
+import argparse
+import heapq
+import http.server
+import json
+import random
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import unquote, urlsplit
+
+import collect_routes
+import inventory
+import vtysh
+
+DEFAULT_INTERVAL = 30.0       # 장비 폴링 주기(초)
+DEFAULT_JITTER = 0.1          # 주기의 ±10% 무작위 흔들기
+DEFAULT_MAX_BACKOFF = 300.0   # 실패 장비 재시도 간격 상한(초)
+DEFAULT_LISTEN = "127.0.0.1:9180"
+
+
+def next_delay(interval: float, failures: int,
+               jitter: float = DEFAULT_JITTER,
+               max_backoff: float = DEFAULT_MAX_BACKOFF,
+               rand=random.random) -> float:
+    """
+    다음 폴링까지 기다릴 시간.
+    - 성공(failures=0): interval
+    - 연속 실패 n회: min(interval x 2^n, max_backoff)
+    - 여기에 ±jitter 비율의 무작위 흔들기
+    """
+    base = interval if failures <= 0 else min(interval * 2 ** failures, max(max_backoff, interval))
+    return max(0.0, base * (1 + jitter * (2 * rand() - 1)))
+
+
+@dataclass
+class Device:
+    """스케줄러가 들고 있는 장비 하나의 상태."""
+    container: str
+    interval: float
+    session: vtysh.VtyshSession
+    polls: int = 0
+    failures: int = 0               # 연속 실패 횟수 (성공하면 0)
+    next_due: float = 0.0           # time.monotonic() 기준
+    last_poll: float | None = None  # 마지막 폴링 종료 시각 (epoch)
+    last_error: str | None = None
+
+
+class Collector:
+    """
+    장비별 상주 세션 + 폴링 스케줄러 + 최신 스냅샷 보관소.
+    run()은 stop()이 불릴 때까지 블록하므로 보통 별도 스레드에서 돌린다.
+    """
+
+    def __init__(self, containers: list[str],
+                 interval: float = DEFAULT_INTERVAL,
+                 intervals: dict[str, float] | None = None,
+                 jitter: float = DEFAULT_JITTER,
+                 max_backoff: float = DEFAULT_MAX_BACKOFF,
+                 structured: bool = False,
+                 cmd_timeout: float = collect_routes.DEFAULT_CMD_TIMEOUT,
+                 device_timeout: float = collect_routes.DEFAULT_DEVICE_TIMEOUT,
+                 workers: int = collect_routes.DEFAULT_WORKERS,
+                 session_factory=None):
+        intervals = intervals or {}
+        # 기본: 현재 실행 백엔드의 세션 (docker exec -i ... vtysh, 또는 fakelab 세션)
+        session_factory = session_factory or vtysh.get_executor().session
+        self.devices = {c: Device(c, intervals.get(c, interval), session_factory(c)) for c in containers}
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.structured = structured
+        self.cmd_timeout = cmd_timeout
+        self.device_timeout = device_timeout
+        self.workers = max(1, min(workers, len(self.devices) or 1))
+        self.version = 0                  # 스냅샷이 갱신될 때마다 +1
+        self.updated: float | None = None
+        self._nodes: dict[str, dict] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._cond = threading.Condition()
+        self._stopping = False
+
+    # --- 폴링 ---
+    def poll(self, container: str) -> dict:
+        """장비 하나를 지금 바로 폴링해 스냅샷에 반영하고 노드 결과를 돌려준다."""
+        dev = self.devices[container]
+        node = collect_routes.collect_device(
+            container, self.cmd_timeout, self.device_timeout, self.structured,
+            run=lambda _c, commands, timeout: dev.session.run(commands, timeout),
+        )
+        if node["error"]:
+            dev.session.close()           # 다음 폴링에서 새 세션으로
+        with self._cond:
+            dev.polls += 1
+            dev.failures = dev.failures + 1 if node["error"] else 0
+            dev.last_error = node["error"]
+            dev.last_poll = time.time()
+            self._nodes[container] = node
+            self.version += 1
+            self.updated = dev.last_poll
+        return node
+
+    def poll_all(self) -> dict:
+        """모든 장비를 한 번씩 (동시에) 폴링. 첫 스냅샷을 채우거나 테스트에서 쓴다."""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(self.poll, self.devices))
+        return self.snapshot()
+
+    # --- 조회 ---
+    def snapshot(self) -> dict:
+        """최신 스냅샷 {장비: payload} (장비 순서 = 생성 시 containers 순서)."""
+        with self._cond:
+            return {c: self._nodes[c] for c in self.devices if c in self._nodes}
+
+    def node(self, container: str) -> dict | None:
+        with self._cond:
+            return self._nodes.get(container)
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        with self._cond:
+            return {
+                "version": self.version,
+                "updated": self.updated,
+                "devices": {
+                    c: {
+                        "interval": d.interval,
+                        "polls": d.polls,
+                        "failures": d.failures,
+                        "last_error": d.last_error,
+                        "last_poll": d.last_poll,
+                        "next_in": round(max(0.0, d.next_due - now), 3) if d.polls else None,
+                        "session_starts": d.session.starts,
+                    }
+                    for c, d in self.devices.items()
+                },
+            }
+
+    # --- 스케줄러 ---
+    def _schedule(self, container: str, delay: float):
+        dev = self.devices[container]
+        dev.next_due = time.monotonic() + delay
+        heapq.heappush(self._heap, (dev.next_due, container))
+        self._cond.notify()
+
+    def _poll_and_reschedule(self, container: str):
+        try:
+            self.poll(container)
+        finally:
+            dev = self.devices[container]
+            with self._cond:
+                if not self._stopping:
+                    self._schedule(container, next_delay(dev.interval, dev.failures,
+                                                         self.jitter, self.max_backoff))
+
+    def run(self):
+        """stop()까지 힙에서 기한이 된 장비를 꺼내 스레드 풀에서 폴링한다."""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            with self._cond:
+                self._stopping = False
+                for c, dev in self.devices.items():
+                    # 첫 폴링도 주기 x 지터 범위 안에 흩뿌려 동시에 몰리지 않게
+                    self._schedule(c, random.random() * self.jitter * dev.interval)
+                while not self._stopping:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    due, c = self._heap[0]
+                    wait = due - time.monotonic()
+                    if wait > 0:
+                        self._cond.wait(wait)
+                        continue
+                    heapq.heappop(self._heap)
+                    pool.submit(self._poll_and_reschedule, c)
+                self._heap.clear()
+        for dev in self.devices.values():
+            dev.session.close()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    collector: Collector
+
+    def _send(self, code: int, body: bytes, ctype: str = "application/json"):
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = unquote(urlsplit(self.path).path).rstrip("/")
+        col = self.collector
+        if path == "/snapshot":
+            self._send(200, json.dumps(col.snapshot(), indent=2).encode())
+        elif path == "/snapshot.ndjson":
+            lines = (json.dumps({"node": c, **p}, separators=(",", ":")) + "\n"
+                     for c, p in col.snapshot().items())
+            self._send(200, "".join(lines).encode(), "application/x-ndjson")
+        elif path.startswith("/snapshot/"):
+            node = col.node(path[len("/snapshot/"):])
+            if node is None:
+                self._send(404, b'{"error": "unknown device"}')
+            else:
+                self._send(200, json.dumps(node, indent=2).encode())
+        elif path == "/status":
+            self._send(200, json.dumps(col.status(), indent=2).encode())
+        else:
+            self._send(404, b'{"error": "not found"}')
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(collector: Collector, listen: str = DEFAULT_LISTEN) -> http.server.ThreadingHTTPServer:
+    """'host:port' 에 HTTP 서버를 띄운다 (port 0 = 임의 포트). 호출자가 serve_forever()."""
+    host, _, port = listen.rpartition(":")
+    handler = type("Handler", (_Handler,), {"collector": collector})
+    return http.server.ThreadingHTTPServer((host or "127.0.0.1", int(port)), handler)
+
+
+def _device_interval(text: str) -> tuple[str, float]:
+    name, sep, sec = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError("장비=초 형식이어야 합니다 (예: clab-netauto-r1=10)")
+    return name, float(sec)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="상주 vtysh 세션 기반 주기 수집기 + 스냅샷 HTTP 서버")
+    ap.add_argument("containers", nargs="*", help="수집 대상 컨테이너 (기본: 인벤토리 --group 장비)")
+    ap.add_argument("--group", default=collect_routes.DEFAULT_GROUP, help="인벤토리 그룹 (기본: routers)")
+    ap.add_argument("--shard", type=inventory.shard_arg, default=None,
+                    help="i/N: 이 수집기가 맡을 장비 조각 (수집기 여러 개로 분할)")
+    ap.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="기본 폴링 주기(초)")
+    ap.add_argument("--device-interval", type=_device_interval, action="append", default=[],
+                    metavar="CONTAINER=SEC", help="장비별 폴링 주기 (여러 번 지정 가능)")
+    ap.add_argument("--jitter", type=float, default=DEFAULT_JITTER, help="주기 흔들기 비율 (0~1)")
+    ap.add_argument("--max-backoff", type=float, default=DEFAULT_MAX_BACKOFF,
+                    help="실패 장비 재시도 간격 상한(초)")
+    ap.add_argument("--workers", type=int, default=collect_routes.DEFAULT_WORKERS)
+    ap.add_argument("--cmd-timeout", type=float, default=collect_routes.DEFAULT_CMD_TIMEOUT)
+    ap.add_argument("--device-timeout", type=float, default=collect_routes.DEFAULT_DEVICE_TIMEOUT)
+    ap.add_argument("--structured", action="store_true",
+                    help="'show ... json' 출력도 수집해 타입 레코드로 보관")
+    ap.add_argument("--listen", default=DEFAULT_LISTEN, help="HTTP 주소 host:port")
+    args = ap.parse_args(argv)
+    args.containers = inventory.select(args.containers, args.group, args.shard)
+
+    col = Collector(args.containers, args.interval, dict(args.device_interval), args.jitter,
+                    args.max_backoff, args.structured, args.cmd_timeout, args.device_timeout,
+                    args.workers)
+    server = serve(col, args.listen)
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    worker = threading.Thread(target=col.run, name="collectd-scheduler", daemon=True)
+    worker.start()
+    print(f"collectd: {len(col.devices)} device(s), serving http://{args.listen}/snapshot", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        col.stop()
+        worker.join(timeout=args.device_timeout + 5)
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
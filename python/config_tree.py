@@ -0,0 +1,127 @@
+"""
+config_tree.py
+
+FRR 설정 텍스트 -> 들여쓰기 기반 stanza 트리, 트리 단위 diff.
+
+- parse(text): 컬럼 0 줄은 최상위 stanza(interface / router ospf / vrf ...),
+  더 깊이 들여쓴 줄은 바로 위 얕은 줄의 자식이 된다.
+  '!' 와 exit / exit-vrf / exit-address-family / end 는 구조 표시일 뿐이라 버린다.
+- 자식은 정규화된 줄 문자열을 키로 하는 dict -> 순서 무관(같은 줄 중복은 하나로 합침).
+- select(tree, sections): 'ospf,interface' 처럼 고른 최상위 섹션만 남긴다.
+- diff(old, new): 두 트리를 키 합집합으로 한 번씩만 훑으므로 크기에 선형.
+  (텍스트 diff처럼 줄 순서 차이로 생기는 잡음/이차 비용이 없다)
+"""
+
+# 블록 종료 표시(비교 대상 아님)
+_TERMINATORS = frozenset(("!", "exit", "exit-vrf", "exit-address-family", "end"))
+
+# 섹션 이름 -> 최상위 줄 접두어. 목록에 없는 이름은 '<이름>' 또는 'router <이름>' 으로 매칭.
+SECTION_ALIASES = {
+    "ospf": ("router ospf",),
+    "ospf6": ("router ospf6",),
+    "bgp": ("router bgp",),
+    "interface": ("interface",),
+    "vrf": ("vrf",),
+    "route-map": ("route-map",),
+    "prefix-list": ("ip prefix-list", "ipv6 prefix-list"),
+}
+ALL = "all"
+
+
+class Stanza:
+    """설정 한 줄과 그 하위 줄들."""
+    __slots__ = ("line", "children")
+
+    def __init__(self, line: str = ""):
+        self.line = line
+        self.children: dict[str, "Stanza"] = {}
+
+    def child(self, line: str) -> "Stanza":
+        node = self.children.get(line)
+        if node is None:
+            node = self.children[line] = Stanza(line)
+        return node
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Stanza) and self.line == other.line and self.children == other.children
+
+    def __len__(self) -> int:
+        """자기 자신을 제외한 전체 하위 줄 수."""
+        return sum(1 + len(c) for c in self.children.values())
+
+
+def parse(text: str) -> Stanza:
+    root = Stanza()
+    stack: list[tuple[int, Stanza]] = [(-1, root)]
+    for raw in text.splitlines():
+        body = raw.strip()
+        if not body or body in _TERMINATORS:
+            continue
+        indent = len(raw) - len(raw.lstrip())
+        while stack[-1][0] >= indent:
+            stack.pop()
+        node = stack[-1][1].child(" ".join(body.split()))
+        stack.append((indent, node))
+    return root
+
+
+def parse_sections(spec) -> tuple[str, ...]:
+    """'ospf,interface' / ['ospf'] -> ('ospf', 'interface'). 비었거나 'all' 이면 ('all',)"""
+    if isinstance(spec, str):
+        spec = spec.split(",")
+    names = tuple(s.strip() for s in spec if s and s.strip())
+    return (ALL,) if not names or ALL in names else names
+
+
+def _matches(line: str, sections: tuple[str, ...]) -> bool:
+    for name in sections:
+        prefixes = SECTION_ALIASES.get(name, (name, f"router {name}"))
+        for p in prefixes:
+            if line == p or line.startswith(p + " "):
+                return True
+    return False
+
+
+def select(tree: Stanza, sections) -> Stanza:
+    """고른 최상위 섹션만 남긴 트리 (자식 노드는 원본과 공유)."""
+    sections = parse_sections(sections)
+    if sections == (ALL,):
+        return tree
+    out = Stanza()
+    out.children = {k: v for k, v in tree.children.items() if _matches(k, sections)}
+    return out
+
+
+def diff(old: Stanza, new: Stanza, path: tuple = ()) -> list[tuple[str, tuple[str, ...]]]:
+    """
+    old -> new 변경 목록. 각 항목은 ('+' 또는 '-', 루트부터의 줄 경로).
+    하위 트리 전체가 추가/삭제되면 그 루트 줄 하나만 보고한다.
+    """
+    changes = []
+    for key, node in old.children.items():
+        other = new.children.get(key)
+        if other is None:
+            changes.append(("-", path + (key,)))
+        elif node.children or other.children:
+            changes.extend(diff(node, other, path + (key,)))
+    for key in new.children:
+        if key not in old.children:
+            changes.append(("+", path + (key,)))
+    return changes
+
+
+def format_diff(changes) -> str:
+    return "".join(f"{op} {' > '.join(p)}\n" for op, p in changes)
+
+
+def dump(tree: Stanza, depth: int = 0) -> str:
+    """트리를 정렬된 설정 텍스트로 (비교용 파일 저장/표시)."""
+    lines = []
+    for key in sorted(tree.children):
+        lines.append(" " * depth + key)
+        sub = dump(tree.children[key], depth + 1)
+        if sub:
+            lines.append(sub)
+        if depth == 0:
+            lines.append("!")
+    return "\n".join(lines)
@@ -0,0 +1,284 @@
+"""
+configgen.py
+
+의도 설정(intended config) 생성 엔진: ansible/templates/frr.conf.j2 + group_vars/host_vars -> 호스트별 설정.
+배포(make configs -> deploy_frr.yml prebuilt_configs=true)와 드리프트 검증(validate.py)이 같이 쓴다.
+
+- 변수: inventory.py 가 Ansible 우선순위(all -> 부모 그룹 -> 자식 그룹 -> 인라인 -> host_vars)로 합친
+  호스트 변수 (입력 파일 지문 캐시). 인벤토리에 없는 호스트는 group_vars/routers.yml + host_vars/<호스트>.yml
+  을 memoize 된 YAML 로더(load_yaml: 경로+mtime+크기 키)로 읽어 합친다.
+  ospf_networks 가 없으면 lan_net / transit_net 으로 만든다 (derive).
+- 템플릿: 소스 해시별로 프로세스당 한 번만 컴파일 (프로세스 풀 워커는 initializer에서 미리 컴파일)
+- 렌더: 호스트가 PARALLEL_MIN_HOSTS 이상이면 프로세스 풀(--jobs)로 병렬, 워커가 렌더 + 쓰기까지 하고
+  (호스트, 상태, 해시)만 돌려준다
+- 재실행: 출력 디렉토리 .manifest.json 에 호스트별 [내용 해시, mtime, 크기, 입력 키(템플릿+컨텍스트 해시)]
+  * 입력 키와 파일 상태가 그대로면 렌더도 하지 않는다
+  * 렌더했더라도 내용 해시가 기존 파일과 같으면 쓰지 않는다
+    (mtime 이 그대로라 rsync/Ansible copy 가 바뀐 호스트만 보낸다)
+
+사용 예:
+    python python/configgen.py                     # routers 그룹 -> python/out/configs/<호스트>.conf
+    python python/configgen.py --group routers --shard 1/4 --jobs 8
+    python python/configgen.py clab-netauto-r1 --stdout
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+import inventory
+
+ROOT = Path(__file__).resolve().parents[1]
+ANSIBLE = ROOT / "ansible"
+TEMPLATE = ANSIBLE / "templates" / "frr.conf.j2"
+GROUP_VARS = ANSIBLE / "group_vars" / "routers.yml"   # 인벤토리에 없는 호스트용 공통 변수
+HOST_VARS_DIR = ANSIBLE / "host_vars"
+OUT_DIR = ROOT / "python" / "out" / "configs"
+MANIFEST = ".manifest.json"
+SUFFIX = ".conf"
+
+DEFAULT_GROUP = "routers"
+PARALLEL_MIN_HOSTS = 64   # 이보다 적으면 프로세스 풀 없이 직렬 렌더
+
+# Jinja 구문이 남아 있는지 (2차 렌더 필요 여부)
+JINJA_MARKERS = ("{{", "{%", "{#")
+
+# 템플릿 소스 해시 -> 컴파일된 템플릿 (프로세스마다 따로 유지)
+_templates = {}
+# YAML 경로 -> ((mtime_ns, size), 파싱 결과)
+_yaml_cache = {}
+# Jinja2 환경 (처음 렌더할 때 만든다: jinja2 import 는 CLI 시작 시간에서 뺀다)
+_env = None
+
+
+def jinja_env():
+    """
+    Jinja2 환경 (Ansible template 과 같은 결과가 나오도록)
+    - StrictUndefined: 정의되지 않은 변수가 있으면 오류 발생
+    - trim_blocks/lstrip_blocks: 불필요한 개행과 들여쓰기 제거
+    """
+    global _env
+    if _env is None:
+        from jinja2 import Environment, StrictUndefined
+        _env = Environment(undefined=StrictUndefined, trim_blocks=True, lstrip_blocks=True)
+    return _env
+
+
+def sha256(data) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(p: Path) -> str:
+    """파일 내용 해시 (없으면 빈 문자열)."""
+    return sha256(p.read_bytes()) if p.exists() else ""
+
+
+def context_hash(ctx: dict) -> str:
+    """렌더 컨텍스트 해시 (변수 파일 어디가 바뀌었든 이 호스트 결과에 영향이 있을 때만 바뀐다)."""
+    return sha256(json.dumps(ctx, sort_keys=True, default=str))
+
+
+def load_yaml(path: Path) -> dict:
+    """
+    YAML 파일 memoize 로드 (경로 + mtime + 크기가 같으면 다시 파싱하지 않음, 없으면 빈 dict).
+    돌려준 dict 는 캐시와 공유되므로 읽기 전용으로 쓴다.
+    """
+    path = Path(path)
+    try:
+        st = path.stat()
+    except OSError:
+        return {}
+    sig = (st.st_mtime_ns, st.st_size)
+    hit = _yaml_cache.get(path)
+    if hit and hit[0] == sig:
+        return hit[1]
+    import yaml
+    data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    _yaml_cache[path] = (sig, data)
+    return data
+
+
+def compile_template(src: str):
+    """템플릿 소스 해시로 캐시된 컴파일 결과를 돌려준다."""
+    key = sha256(src)
+    tpl = _templates.get(key)
+    if tpl is None:
+        tpl = _templates[key] = jinja_env().from_string(src)
+    return tpl
+
+
+def render(tpl_src: str, ctx: dict) -> str:
+    """
+    템플릿 렌더 (2-패스: nested Jinja 변수까지 치환).
+    1차 결과에 Jinja 구문이 없으면 2차 렌더는 결과가 같으므로 생략한다.
+    (Jinja는 keep_trailing_newline=False 라 끝 개행 1개만 제거되는 것까지 동일하게 맞춤)
+    """
+    once = compile_template(tpl_src).render(**ctx)
+    if any(m in once for m in JINJA_MARKERS):
+        return jinja_env().from_string(once).render(**ctx)
+    return once[:-1] if once.endswith("\n") else once
+
+
+def derive(ctx: dict) -> dict:
+    """템플릿이 기대하는 파생 변수: ospf_networks 가 없으면 lan_net, transit_net 으로 만든다."""
+    if "ospf_networks" not in ctx:
+        nets = [ctx[k] for k in ("lan_net", "transit_net") if ctx.get(k)]
+        if nets:
+            ctx["ospf_networks"] = nets
+    return ctx
+
+
+def host_context(host: str, inv: inventory.Inventory | None = None) -> dict:
+    """
+    호스트 1대의 템플릿 컨텍스트 (새 dict, 호출자가 고쳐도 캐시에 영향 없음).
+    - 인벤토리 장비: inventory.py 가 합친 변수
+    - 그 외: group_vars/routers.yml + host_vars/<호스트>.yml (host_vars 우선)
+    inventory_hostname 은 기본 제공 (템플릿에서 default 필터용)
+    """
+    inv = inv if inv is not None else inventory.load()
+    dev = inv.devices.get(host)
+    if dev is not None:
+        ctx = dict(dev.vars)
+    else:
+        ctx = {**load_yaml(GROUP_VARS), **load_yaml(HOST_VARS_DIR / f"{host}.yml")}
+    ctx.setdefault("inventory_hostname", host)
+    return derive(ctx)
+
+
+def contexts(hosts, inv: inventory.Inventory | None = None) -> dict[str, dict]:
+    inv = inv if inv is not None else inventory.load()
+    return {h: host_context(h, inv) for h in hosts}
+
+
+# --- 생성 (렌더 + 바뀐 것만 쓰기) ---
+def _stat_sig(path: Path):
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def write_if_changed(path: Path, text: str, digest: str | None = None, known: list | None = None) -> bool:
+    """
+    내용이 바뀌었을 때만 원자적으로 쓴다. 반환: 썼으면 True
+    - known: manifest 에 기록해 둔 [해시, mtime_ns, 크기]. 해시가 같고 파일이 그때 그대로면
+      파일을 읽지 않고 끝낸다 (손으로 고친 파일은 mtime/크기가 달라 내용 비교로 넘어감)
+    """
+    digest = digest or sha256(text)
+    sig = _stat_sig(path)
+    if sig is not None:
+        if known and known[0] == digest and known[1:] == sig:
+            return False
+        if file_hash(path) == digest:
+            return False
+    tmp = path.with_name(".part-" + path.name)
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
+    return True
+
+
+def init_worker(tpl_src: str):
+    """프로세스 풀 initializer: 워커마다 첫 호스트 전에 템플릿을 한 번 컴파일해 둔다."""
+    compile_template(tpl_src)
+
+
+def _generate_one(job: dict) -> tuple[str, str, object]:
+    """
+    (호스트, written|unchanged|error, manifest 항목 [해시, mtime_ns, 크기, 입력 키] 또는 오류 메시지)
+    - 워커에서도 실행
+    """
+    host = job["host"]
+    try:
+        text = render(job["tpl_src"], job["ctx"]) + "\n"
+    except Exception as e:
+        return host, "error", f"Jinja render failed for {host}: {e}"
+    digest = sha256(text)
+    path = Path(job["outdir"]) / f"{host}{SUFFIX}"
+    changed = write_if_changed(path, text, digest, job["known"])
+    return host, "written" if changed else "unchanged", [digest, *_stat_sig(path), job["key"]]
+
+
+def _load_manifest(outdir: Path) -> dict:
+    try:
+        return json.loads((outdir / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def generate(hosts, outdir: Path = OUT_DIR, jobs: int = 1, template: Path = TEMPLATE,
+             ctxs: dict | None = None) -> dict:
+    """
+    hosts 설정을 outdir/<호스트>.conf 로 생성. 반환: {"written", "unchanged", "errors": {호스트: 메시지}}
+    """
+    outdir = Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    tpl_src = Path(template).read_text(encoding="utf-8")
+    ctxs = ctxs if ctxs is not None else contexts(hosts)
+    manifest = _load_manifest(outdir)
+    tpl_hash = sha256(tpl_src)
+
+    # 입력(템플릿 + 컨텍스트) 키와 파일 상태가 manifest 그대로면 렌더도 하지 않는다
+    done, job_list = [], []
+    for h in hosts:
+        key = sha256(tpl_hash + context_hash(ctxs[h]))
+        known = manifest.get(h)
+        if known and len(known) == 4 and known[3] == key \
+                and known[1:3] == _stat_sig(outdir / f"{h}{SUFFIX}"):
+            done.append((h, "unchanged", known))
+            continue
+        job_list.append({"host": h, "ctx": ctxs[h], "tpl_src": tpl_src, "outdir": str(outdir),
+                         "known": known[:3] if known else None, "key": key})
+    if jobs > 1 and len(job_list) >= PARALLEL_MIN_HOSTS:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(tpl_src,)) as pool:
+            done += pool.map(_generate_one, job_list, chunksize=max(1, len(job_list) // (jobs * 4)))
+    else:
+        done += [_generate_one(j) for j in job_list]
+
+    stats = {"written": [], "unchanged": [], "errors": {}}
+    for host, status, value in done:
+        if status == "error":
+            stats["errors"][host] = value
+            manifest.pop(host, None)
+            continue
+        stats[status].append(host)
+        manifest[host] = value
+    write_if_changed(outdir / MANIFEST, json.dumps(manifest, sort_keys=True))
+    return stats
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="템플릿 + 변수 -> 호스트별 의도 설정 생성")
+    ap.add_argument("hosts", nargs="*", help="생성 대상 (기본: 인벤토리 --group 장비)")
+    ap.add_argument("--group", default=DEFAULT_GROUP, help="인벤토리 그룹 (기본: routers)")
+    ap.add_argument("--shard", type=inventory.shard_arg, default=None,
+                    help="i/N: 호스트 이름 해시 기준 N 조각 중 i번째만 생성")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="렌더 프로세스 수")
+    ap.add_argument("--template", type=Path, default=TEMPLATE)
+    ap.add_argument("--out", type=Path, default=OUT_DIR, help="출력 디렉토리 (기본: python/out/configs)")
+    ap.add_argument("--stdout", action="store_true", help="파일로 쓰지 않고 렌더 결과를 출력")
+    args = ap.parse_args(argv)
+
+    hosts = inventory.select(args.hosts, args.group, args.shard)
+    if args.stdout:
+        tpl_src = args.template.read_text(encoding="utf-8")
+        for h, ctx in contexts(hosts).items():
+            print(f"# --- {h}\n{render(tpl_src, ctx)}")
+        return 0
+
+    stats = generate(hosts, args.out, args.jobs, args.template)
+    for msg in stats["errors"].values():
+        print(f"[ERROR] {msg}", file=sys.stderr)
+    print(f"{args.out}: {len(stats['written'])} written, {len(stats['unchanged'])} unchanged, "
+          f"{len(stats['errors'])} error(s)")
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+"""
+fakelab.py
+
+docker exec / vtysh 대역(stand-in): 랩 없이 수집 파이프라인을 돌리고 부하/장애를 흉내 낸다.
+
+- FakeLab      : 장비별 'show ip route' / 'show ip ospf neighbor' / 'show running-config' 원문 보관소
+  * recorded(): python/out/routes.json 에 녹화된 출력 (모르는 장비 이름은 이름 해시로
+                녹화 장비 중 하나에 대응시켜 수천 대도 흉내 낼 수 있다)
+  * synthetic(): synth.py 로 만든 장비 n대 (경로/이웃 수 지정)
+  * 'show ... json' 은 원문을 파싱한 레코드로 FRR JSON 모양을 만들어 답한다 (--structured 수집 가능)
+  * 'show running-config' 는 장비의 config (녹화: 만들 때 읽어 둔 backups/<장비>.conf 사본,
+    합성: synth.router_config)를 FRR 머리말/끝 줄로 감싸 답한다 (backup.py 수집용)
+- Profile      : 배치 1회당 지연(latency ± jitter), 멈춤(hang) 비율, 오류(error) 비율, 항상 죽어 있는 장비
+  * hang  : timeout 까지 실제로 기다린 뒤 subprocess.TimeoutExpired (docker exec 과 같은 예외)
+  * error : returncode=1 + docker 데몬 오류 메시지
+  * seed 로 재현 가능
+- FakeExecutor : vtysh.DockerExecutor 와 같은 인터페이스 (run_batch / session)
+  vtysh.set_executor(FakeExecutor(...)) 또는 환경변수로 통째로 바꾼다:
+      NETAUTO_EXECUTOR=fake NETAUTO_FAKE="latency=50,jitter=20,hang=0.01,error=0.02" \\
+          python python/collect_routes.py --structured
+
+사용 예 (부하 테스트):
+    python python/fakelab.py stress --devices 2000 --workers 64 --latency 50 --jitter 20 \\
+        --hang 0.01 --error 0.02 --device-timeout 2
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+
+import frr_parse
+import frr_records
+import vtysh
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_SNAPSHOT = ROOT / "python" / "out" / "routes.json"
+BACKUPS_DIR = ROOT / "backups"
+
+_PROTOCOLS = {code: proto for proto, code in frr_records.PROTO_CODES.items()}
+_VERSION = "FRRouting 9.1-fake ({host}) on Linux.\nCopyright 1996-2005 Kunihiro Ishiguro, et al.\n"
+_RUNNING = "Building configuration...\n\nCurrent configuration:\n!\n{config}!\nend\n"
+
+
+@dataclass
+class Profile:
+    """배치 1회당 동작. 지연 단위는 ms, 비율은 0~1."""
+    latency: float = 0.0
+    jitter: float = 0.0
+    hang: float = 0.0
+    error: float = 0.0
+    seed: int = 0
+    down: frozenset = field(default_factory=frozenset)   # 항상 실패하는 장비
+
+    @classmethod
+    def parse(cls, spec: str) -> "Profile":
+        """'latency=50,jitter=20,hang=0.01,error=0.02,seed=1,down=a+b' -> Profile"""
+        kw = {}
+        types = {f.name: f.type for f in fields(cls)}
+        for item in filter(None, (x.strip() for x in (spec or "").split(","))):
+            key, _, value = item.partition("=")
+            if key not in types:
+                raise ValueError(f"unknown fake profile key: {key!r}")
+            if key == "down":
+                kw[key] = frozenset(filter(None, value.split("+")))
+            else:
+                kw[key] = int(value) if key == "seed" else float(value)
+        return cls(**kw)
+
+
+def _load_configs(directory: Path, names) -> dict[str, str]:
+    """<디렉토리>/<장비>.conf 사본 (FakeLab 을 만들 때 한 번만 읽는다. 없으면 빈 문자열)"""
+    out = {}
+    for n in names:
+        p = Path(directory) / f"{n}.conf"
+        out[n] = p.read_text(encoding="utf-8") if p.exists() else ""
+    return out
+
+
+class FakeLab:
+    """장비 이름 -> {"routes": 원문, "ospf": 원문, "config": frr.conf 본문(없으면 빈 문자열)}"""
+
+    def __init__(self, nodes: dict[str, dict], any_name: bool = False):
+        if not nodes:
+            raise ValueError("fake lab needs at least one device")
+        self.nodes = nodes
+        self.any_name = any_name
+        self._templates = sorted(nodes)
+        self._json: dict[tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def recorded(cls, path=DEFAULT_SNAPSHOT, any_name: bool = True, configs_dir=BACKUPS_DIR) -> "FakeLab":
+        """
+        녹화 스냅샷 + running-config 사본. 설정은 여기서 한 번 읽어 두므로 이 랩을 쓰는 동안
+        backup.py 가 같은 디렉토리에 써도 장비 설정이 바뀌지 않는다.
+        """
+        import snapshot
+        nodes = {n: {"routes": p.get("routes") or "", "ospf": p.get("ospf") or ""}
+                 for n, p in snapshot.iter_nodes(path) if not p.get("error")}
+        for n, config in _load_configs(configs_dir, nodes).items():
+            nodes[n]["config"] = config
+        return cls(nodes, any_name)
+
+    @classmethod
+    def synthetic(cls, devices: int, routes: int = 200, neighbors: int = 4, seed: int = 0) -> "FakeLab":
+        import synth
+        return cls({n: {"routes": p["routes"], "ospf": p["ospf"], "config": synth.router_config(i) + "\n"}
+                    for i, (n, p) in enumerate(synth.snapshot(devices, routes, neighbors, seed).items(), 1)})
+
+    def template_of(self, container: str) -> str | None:
+        """장비 이름 -> 출력을 빌려 올 녹화 장비 (any_name이면 이름 해시로 고정 대응)."""
+        if container in self.nodes:
+            return container
+        if not self.any_name:
+            return None
+        h = int.from_bytes(hashlib.blake2b(container.encode(), digest_size=8).digest(), "big")
+        return self._templates[h % len(self._templates)]
+
+    def _route_json(self, name: str) -> str:
+        out: dict[str, list] = {}
+        for r in frr_parse.parse_routes(self.nodes[name]["routes"]):
+            entries = out.setdefault(r.prefix, [])
+            entry = next((e for e in entries if e["protocol"] == _PROTOCOLS.get(r.code, r.code)), None)
+            if entry is None:
+                entry = {"prefix": r.prefix, "protocol": _PROTOCOLS.get(r.code, r.code),
+                         "selected": r.selected, "installed": r.fib, "distance": r.distance or 0,
+                         "metric": r.metric or 0, "uptime": r.age, "nexthops": []}
+                entries.append(entry)
+            entry["nexthops"].append({"ip": r.nexthop, "interfaceName": r.interface,
+                                      "fib": r.fib, "active": True})
+        return json.dumps(out)
+
+    def _neighbor_json(self, name: str) -> str:
+        nbrs: dict[str, list] = {}
+        for nb in frr_parse.parse_neighbors(self.nodes[name]["ospf"]):
+            nbrs.setdefault(nb.neighbor_id, []).append({
+                "nbrState": nb.state, "nbrPriority": nb.priority,
+                "ifaceAddress": nb.address, "ifaceName": nb.interface,
+            })
+        return json.dumps({"neighbors": nbrs})
+
+    def answer(self, container: str, command: str) -> str:
+        name = self.template_of(container)
+        cmd = " ".join(command.split())
+        if cmd == "show version":
+            return _VERSION.format(host=container)
+        if cmd == "show ip route":
+            return self.nodes[name]["routes"]
+        if cmd == "show ip ospf neighbor":
+            return self.nodes[name]["ospf"]
+        if cmd in ("show ip route json", "show ip ospf neighbor json"):
+            key = (name, cmd)
+            with self._lock:
+                if key not in self._json:
+                    self._json[key] = (self._route_json(name) if "route" in cmd
+                                       else self._neighbor_json(name)) + "\n"
+                return self._json[key]
+        if cmd in ("show running-config", "show run"):
+            config = self.nodes[name].get("config") or ""
+            return _RUNNING.format(config=config if config.endswith("\n") or not config else config + "\n")
+        if cmd.startswith("show ip route "):
+            prefix = cmd.split()[3]
+            lines = [ln for ln in self.nodes[name]["routes"].splitlines(keepends=True) if f" {prefix} " in ln]
+            return "".join(lines) or "% Network not in table\n"
+        return f"% Unknown command: {command}\n"
+
+
+class FakeExecutor:
+    """vtysh.DockerExecutor 대역. 배치 결과 형식(에코 줄 포함 stdout)까지 같게 만든다."""
+    name = "fake"
+
+    def __init__(self, lab: FakeLab, profile: Profile | None = None):
+        self.lab = lab
+        self.profile = profile or Profile()
+        self.calls = 0
+        self._rng = random.Random(self.profile.seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "FakeExecutor":
+        """NETAUTO_FAKE(프로필) / NETAUTO_FAKE_SNAPSHOT(녹화 스냅샷 경로)로 생성."""
+        profile = Profile.parse(os.getenv("NETAUTO_FAKE", ""))
+        return cls(FakeLab.recorded(os.getenv("NETAUTO_FAKE_SNAPSHOT") or DEFAULT_SNAPSHOT), profile)
+
+    def _draw(self) -> tuple[float, float]:
+        """(이번 배치 지연 초, 운명 난수) - 스레드가 여러 개여도 seed 기준 순서대로 뽑는다."""
+        p = self.profile
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, p.latency + self._rng.uniform(-p.jitter, p.jitter)) / 1000
+            return delay, self._rng.random()
+
+    def run_batch(self, container: str, commands: list[str], timeout: float | None = None) -> vtysh.BatchResult:
+        delay, fate = self._draw()
+        p = self.profile
+        argv = vtysh.batch_argv(container, commands)
+        if fate < p.hang:
+            threading.Event().wait(timeout if timeout is not None else 3600)
+            raise subprocess.TimeoutExpired(argv, timeout)
+        if timeout is not None and delay > timeout:
+            threading.Event().wait(timeout)
+            raise subprocess.TimeoutExpired(argv, timeout)
+        if delay:
+            time.sleep(delay)
+        empty = {cmd: "" for cmd in commands}
+        if container in p.down or fate < p.hang + p.error:
+            return vtysh.BatchResult(container, list(commands), 1, "",
+                                     f"Error response from daemon: container {container} is not running\n", empty)
+        if self.lab.template_of(container) is None:
+            return vtysh.BatchResult(container, list(commands), 1, "",
+                                     f"Error response from daemon: No such container: {container}\n", empty)
+        host = container.rsplit("-", 1)[-1]
+        outputs = {cmd: self.lab.answer(container, cmd) for cmd in commands}
+        stdout = "".join(f"{host}# {cmd}\n{outputs[cmd]}" for cmd in commands)
+        return vtysh.BatchResult(container, list(commands), 0, stdout, "", outputs)
+
+    def session(self, container: str) -> "FakeSession":
+        return FakeSession(self, container)
+
+
+class FakeSession:
+    """vtysh.VtyshSession 대역: 오류/멈춤이 나면 닫히고 다음 run()에서 다시 '연결'한다."""
+
+    def __init__(self, executor: FakeExecutor, container: str):
+        self.executor = executor
+        self.container = container
+        self.starts = 0
+        self.alive = False
+
+    def run(self, commands: list[str], timeout: float | None = None) -> vtysh.BatchResult:
+        if not self.alive:
+            self.starts += 1
+            self.alive = True
+        try:
+            res = self.executor.run_batch(self.container, commands, timeout)
+        except subprocess.TimeoutExpired:
+            self.alive = False
+            raise
+        if res.returncode != 0:
+            self.alive = False
+        return res
+
+    def close(self):
+        self.alive = False
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def stress(devices: int, workers: int, profile: Profile, device_timeout: float,
+           structured: bool = False, snapshot_path=DEFAULT_SNAPSHOT, out: Path | None = None) -> dict:
+    """
+    가짜 장비 devices대를 collect_routes 파이프라인으로 수집(NDJSON 저장)하고 report 집계까지.
+    반환: 처리량 / 지연 분포 / 오류·타임아웃 수
+    """
+    import collect_routes
+    import report
+    import snapshot
+
+    executor = FakeExecutor(FakeLab.recorded(snapshot_path), profile)
+    prev = vtysh.set_executor(executor)
+    names = [f"clab-fake-r{i}" for i in range(1, devices + 1)]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = out or Path(tmp) / "routes.ndjson"
+            t0 = time.perf_counter()
+            latencies, errors, timeouts = [], 0, 0
+            with snapshot.NdjsonWriter(path) as w:
+                for c, node in collect_routes.iter_collect(names, workers, device_timeout, device_timeout,
+                                                           structured):
+                    w.write(c, node)
+                    latencies.append(node["latency_ms"])
+                    if node["error"]:
+                        errors += 1
+                        timeouts += node["error"].startswith("timeout")
+            t_collect = time.perf_counter() - t0
+            t1 = time.perf_counter()
+            report.aggregate_metrics(snapshot.iter_nodes(path))
+            t_report = time.perf_counter() - t1
+    finally:
+        vtysh.set_executor(prev)
+    return {
+        "devices": devices,
+        "workers": workers,
+        "collect_s": round(t_collect, 3),
+        "devices_per_s": round(devices / t_collect, 1) if t_collect else None,
+        "latency_ms_p50": _percentile(latencies, 0.50),
+        "latency_ms_p95": _percentile(latencies, 0.95),
+        "latency_ms_p99": _percentile(latencies, 0.99),
+        "errors": errors - timeouts,
+        "timeouts": timeouts,
+        "report_s": round(t_report, 3),
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="가짜 docker/vtysh 랩 (오프라인 부하/장애 테스트)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    st = sub.add_parser("stress", help="가짜 장비 N대 수집 + 리포트 집계 부하 테스트")
+    st.add_argument("--devices", type=int, default=1000)
+    st.add_argument("--workers", type=int, default=64)
+    st.add_argument("--latency", type=float, default=50.0, help="배치 1회 평균 지연(ms)")
+    st.add_argument("--jitter", type=float, default=20.0, help="지연 ± 흔들기(ms)")
+    st.add_argument("--hang", type=float, default=0.0, help="멈춤(타임아웃) 비율 0~1")
+    st.add_argument("--error", type=float, default=0.0, help="오류 비율 0~1")
+    st.add_argument("--seed", type=int, default=0)
+    st.add_argument("--device-timeout", type=float, default=5.0)
+    st.add_argument("--structured", action="store_true")
+    st.add_argument("--snapshot", type=Path, default=DEFAULT_SNAPSHOT, help="녹화 출력으로 쓸 스냅샷")
+    st.add_argument("--out", type=Path, default=None, help="수집 결과 NDJSON 저장 경로 (기본: 임시)")
+    args = ap.parse_args(argv)
+
+    profile = Profile(args.latency, args.jitter, args.hang, args.error, args.seed)
+    res = stress(args.devices, args.workers, profile, args.device_timeout, args.structured,
+                 args.snapshot, args.out)
+    print(json.dumps(res, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
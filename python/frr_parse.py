@@ -0,0 +1,257 @@
+"""
+frr_parse.py
+
+FRR CLI 텍스트 파서 (구조화 레코드가 없을 때의 대체 경로).
+
+- parse_routes(text)    : 'show ip route' 원문 -> RouteRecord 튜플
+- parse_neighbors(text) : 'show ip ospf neighbor' 원문 -> NeighborRecord 튜플
+- route_records_for(payload) / neighbor_records_for(payload):
+    routes.json 노드 payload에서 레코드를 꺼낸다.
+    구조화 레코드(frr_records.py)가 있으면 그것을 변환하고, 없으면 원문을 파싱한다.
+
+설계
+- 정규식은 모듈 로드 시 한 번만 컴파일하고, 한 줄을 한 번만 훑는다(single pass).
+- 같은 텍스트를 여러 번 파싱하지 않도록 내용 해시(blake2b) -> 결과 튜플을 LRU로 캐시한다.
+  (반환 레코드는 캐시와 공유되므로 읽기 전용으로 다룰 것)
+- 레코드는 __slots__ 클래스라 노드당 수십만 경로도 dict보다 작게 들고 있을 수 있다.
+- 리포트 지표와 이후 검사들은 문자열을 다시 훑지 말고 이 레코드를 읽는다.
+"""
+
+import hashlib
+import re
+import socket
+from collections import OrderedDict
+
+# 경로 줄: 'O>* 10.0.2.0/24 [110/20] via 10.0.12.2, eth1, weight 1, 00:51:15'
+#          'C>* 10.0.1.0/24 is directly connected, eth2, 00:52:17'
+# 범례 줄('Codes: K - kernel', '       O - OSPF')은 컬럼 0의 코드 + prefix 조건에서 걸러진다.
+# 한 번의 match 로 next-hop('via X' / 'via X (recursive)'), 인터페이스, 나머지(', weight 1, 00:51:15')까지 꺼낸다.
+_ROUTE_LINE = re.compile(
+    r"^(?P<code>[A-Za-z])(?P<flags>[^\s\d]*)\s+"
+    r"(?P<net>\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})/(?P<len>3[0-2]|[12]?\d)"
+    r"(?:\s+\[(?P<dist>\d+)/(?P<metric>\d+)\])?"
+    r"\s+(?:via\s+(?P<via>\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})[^,]*|[^,]*)"
+    r"(?:, (?P<iface>[^,]+))?(?P<tail>.*)$"
+)
+# ECMP 추가 next-hop 줄: '  *                    via 10.0.12.6, eth3, weight 1, 00:01:00'
+_CONT_LINE = re.compile(
+    r"^\s+(?P<flags>[>*]*)\s*via\s+(?:(?P<via>\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})[^,]*|[^,]*)"
+    r"(?:, (?P<iface>[^,]+))?(?P<tail>.*)$"
+)
+# 경로 나이: 00:51:15 / 1d02h03m / 2w3d01h
+_AGE = re.compile(r"^(?:\d{2}:\d{2}:\d{2}|(?:\d+[wdhms])+)$")
+
+# 이웃 줄: '172.20.20.3  1 Full/-  51m25s  35.472s 10.0.12.2  eth1:10.0.12.1  0 0 0'
+_NEIGHBOR_LINE = re.compile(
+    r"^(?P<id>\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\s+(?P<pri>\d+)\s+(?P<state>\S+)\s+(?P<rest>.*)$"
+)
+_IPV4 = re.compile(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$")
+
+# prefix 길이 -> 넷마스크 정수
+_MASKS = tuple((0xFFFFFFFF << (32 - n)) & 0xFFFFFFFF for n in range(33))
+
+_CACHE_SIZE = 256
+_route_cache: "OrderedDict[tuple[str, str], tuple]" = OrderedDict()
+
+
+def ip_to_int(ip: str) -> int:
+    """dotted quad -> 정수. '10.0.2' / '1' 같은 축약형, 범위 밖 옥텟은 ValueError."""
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+    except (OSError, TypeError):
+        raise ValueError(f"invalid IPv4 address: {ip!r}") from None
+
+
+def int_to_ip(n: int) -> str:
+    return f"{n >> 24 & 255}.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}"
+
+
+def prefix_to_ints(prefix: str) -> tuple[int, int]:
+    """'10.0.2.0/24' -> (network 정수, prefix 길이). 호스트 비트는 0으로 정리."""
+    net, _, plen = prefix.partition("/")
+    length = int(plen) if plen else 32
+    if not 0 <= length <= 32:
+        raise ValueError(f"invalid IPv4 prefix length: {prefix!r}")
+    return ip_to_int(net) & _MASKS[length], length
+
+
+def prefix_bounds(prefix: str) -> tuple[int, int, int]:
+    """'10.0.2.0/24' -> (시작 정수, 끝(브로드캐스트) 정수, prefix 길이). 형식 오류는 ValueError."""
+    start, length = prefix_to_ints(prefix)
+    return start, start | (~_MASKS[length] & 0xFFFFFFFF), length
+
+
+class RouteRecord:
+    """
+    'show ip route' 한 줄(또는 ECMP next-hop 하나) = 레코드 하나.
+    - network/prefixlen: prefix를 정수 쌍으로 보관 (LPM/정렬/비교가 빠름)
+    - distance/metric: '[110/20]'이 없는 줄(connected 등)은 None
+    - nexthop: 'via X'의 X, 직접 연결이면 None
+    """
+    __slots__ = ("code", "selected", "fib", "network", "prefixlen",
+                 "distance", "metric", "nexthop", "interface", "age")
+
+    def __init__(self, code, selected, fib, network, prefixlen,
+                 distance=None, metric=None, nexthop=None, interface=None, age=""):
+        self.code = code
+        self.selected = selected
+        self.fib = fib
+        self.network = network
+        self.prefixlen = prefixlen
+        self.distance = distance
+        self.metric = metric
+        self.nexthop = nexthop
+        self.interface = interface
+        self.age = age
+
+    @property
+    def prefix(self) -> str:
+        return f"{int_to_ip(self.network)}/{self.prefixlen}"
+
+    def __repr__(self) -> str:
+        flags = (">" if self.selected else "") + ("*" if self.fib else "")
+        via = f"via {self.nexthop}" if self.nexthop else "directly connected"
+        return f"<RouteRecord {self.code}{flags} {self.prefix} {via}, {self.interface}>"
+
+
+class NeighborRecord:
+    """'show ip ospf neighbor' 한 줄 = 레코드 하나."""
+    __slots__ = ("neighbor_id", "priority", "state", "full", "address", "interface")
+
+    def __init__(self, neighbor_id, priority, state, address=None, interface=None):
+        self.neighbor_id = neighbor_id
+        self.priority = priority
+        self.state = state
+        self.full = state.split("/", 1)[0].lower() == "full"
+        self.address = address
+        self.interface = interface
+
+    def __repr__(self) -> str:
+        return f"<NeighborRecord {self.neighbor_id} {self.state} {self.address} {self.interface}>"
+
+
+def _route_fields(m):
+    """_ROUTE_LINE / _CONT_LINE match -> (nexthop, interface, age). 나이는 마지막 필드가 _AGE 형식일 때만."""
+    iface = m.group("iface")
+    if iface is None:
+        return m.group("via"), None, ""
+    last = (m.group("tail").rpartition(", ")[2] or iface).strip()
+    return m.group("via"), iface.strip(), last if _AGE.match(last) else ""
+
+
+def _content_key(kind: str, text: str) -> tuple[str, str]:
+    return kind, hashlib.blake2b(text.encode("utf-8", "surrogateescape"), digest_size=16).hexdigest()
+
+
+def _cached(key, build):
+    hit = _route_cache.get(key)
+    if hit is not None:
+        _route_cache.move_to_end(key)
+        return hit
+    value = build()
+    _route_cache[key] = value
+    if len(_route_cache) > _CACHE_SIZE:
+        _route_cache.popitem(last=False)
+    return value
+
+
+def _parse_routes(text: str) -> tuple:
+    out = []
+    prev = None
+    for line in text.splitlines():
+        m = _ROUTE_LINE.match(line)
+        if m:
+            flags = m.group("flags")
+            prefixlen = int(m.group("len"))
+            network = ip_to_int(m.group("net")) & _MASKS[prefixlen]
+            nexthop, interface, age = _route_fields(m)
+            dist = m.group("dist")
+            prev = RouteRecord(
+                m.group("code"), ">" in flags, "*" in flags, network, prefixlen,
+                int(dist) if dist is not None else None,
+                int(m.group("metric")) if dist is not None else None,
+                nexthop, interface, age,
+            )
+            out.append(prev)
+            continue
+        if prev is not None:
+            c = _CONT_LINE.match(line)
+            if c:
+                flags = c.group("flags")
+                nexthop, interface, age = _route_fields(c)
+                out.append(RouteRecord(
+                    prev.code, prev.selected, "*" in flags, prev.network, prev.prefixlen,
+                    prev.distance, prev.metric, nexthop, interface, age or prev.age,
+                ))
+    return tuple(out)
+
+
+def _parse_neighbors(text: str) -> tuple:
+    out = []
+    for line in text.splitlines():
+        m = _NEIGHBOR_LINE.match(line.strip())
+        if not m:
+            continue
+        address = interface = None
+        tokens = m.group("rest").split()
+        for i, tok in enumerate(tokens):
+            if _IPV4.match(tok):
+                address = tok
+                interface = tokens[i + 1] if i + 1 < len(tokens) else None
+                break
+        out.append(NeighborRecord(m.group("id"), int(m.group("pri")), m.group("state"), address, interface))
+    return tuple(out)
+
+
+def parse_routes(text: str) -> tuple:
+    """'show ip route' 원문 -> RouteRecord 튜플 (내용 해시로 캐시)."""
+    if not text:
+        return ()
+    return _cached(_content_key("routes", text), lambda: _parse_routes(text))
+
+
+def parse_neighbors(text: str) -> tuple:
+    """'show ip ospf neighbor' 원문 -> NeighborRecord 튜플 (내용 해시로 캐시)."""
+    if not text:
+        return ()
+    return _cached(_content_key("neighbors", text), lambda: _parse_neighbors(text))
+
+
+def routes_from_dicts(recs: list[dict]) -> tuple:
+    """frr_records.route_records() 레코드 -> RouteRecord 튜플 (next-hop마다 하나)."""
+    out = []
+    for r in recs:
+        network, prefixlen = prefix_to_ints(r["prefix"])
+        nexthops = r.get("nexthops") or [{}]
+        for nh in nexthops:
+            out.append(RouteRecord(
+                r.get("code", "?"), bool(r.get("selected")), bool(nh.get("fib", r.get("fib"))),
+                network, prefixlen, r.get("distance"), r.get("metric"),
+                nh.get("ip"), nh.get("interface"), r.get("uptime", ""),
+            ))
+    return tuple(out)
+
+
+def neighbors_from_dicts(recs: list[dict]) -> tuple:
+    """frr_records.neighbor_records() 레코드 -> NeighborRecord 튜플."""
+    return tuple(
+        NeighborRecord(r["neighbor_id"], r.get("priority", 0), r.get("state", ""),
+                       r.get("address"), r.get("interface"))
+        for r in recs
+    )
+
+
+def route_records_for(payload: dict) -> tuple:
+    """노드 payload의 경로 레코드: route_records가 있으면 우선, 없으면 'routes' 원문 파싱."""
+    payload = payload or {}
+    if "route_records" in payload:
+        return routes_from_dicts(payload["route_records"])
+    return parse_routes(payload.get("routes") or "")
+
+
+def neighbor_records_for(payload: dict) -> tuple:
+    """노드 payload의 OSPF 이웃 레코드: neighbor_records 우선, 없으면 'ospf' 원문 파싱."""
+    payload = payload or {}
+    if "neighbor_records" in payload:
+        return neighbors_from_dicts(payload["neighbor_records"])
+    return parse_neighbors(payload.get("ospf") or "")
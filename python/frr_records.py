@@ -0,0 +1,71 @@
+"""
+frr_records.py
+
+FRR 'show ... json' 출력을 타입이 정해진 레코드로 정규화한다.
+
+- route_records(obj)    : 'show ip route json'         -> 경로 레코드 리스트
+- neighbor_records(obj) : 'show ip ospf neighbor json' -> OSPF 이웃 레코드 리스트
+
+레코드는 routes.json에 그대로 저장되므로 JSON 직렬화 가능한 dict로 둔다.
+  route    = {"prefix", "protocol", "code", "selected", "fib", "distance",
+              "metric", "uptime", "nexthops": [{"ip", "interface", "fib", "active"}]}
+  neighbor = {"neighbor_id", "state", "full", "priority", "address", "interface"}
+FRR 버전마다 키 이름이 조금씩 달라서(nbrState/state, ifaceAddress/address 등) 둘 다 받는다.
+"""
+
+# FRR 프로토콜 이름 -> 'show ip route' 한 글자 코드
+PROTO_CODES = {
+    "kernel": "K", "connected": "C", "local": "L", "static": "S", "rip": "R",
+    "ospf": "O", "isis": "I", "bgp": "B", "eigrp": "E", "nhrp": "N",
+    "table": "T", "vnc": "v", "vnc-direct": "V", "babel": "A", "pbr": "F",
+    "openfabric": "f",
+}
+
+
+def route_records(obj: dict) -> list[dict]:
+    """'show ip route json' 결과({prefix: [entry, ...]})를 경로 레코드 리스트로 변환."""
+    recs = []
+    for prefix, entries in (obj or {}).items():
+        for e in entries:
+            proto = e.get("protocol", "")
+            nexthops = [
+                {
+                    "ip": nh.get("ip"),
+                    "interface": nh.get("interfaceName"),
+                    "fib": bool(nh.get("fib")),
+                    "active": bool(nh.get("active")),
+                }
+                for nh in e.get("nexthops", [])
+            ]
+            recs.append({
+                "prefix": e.get("prefix", prefix),
+                "protocol": proto,
+                "code": PROTO_CODES.get(proto, "?"),
+                "selected": bool(e.get("selected")),
+                "fib": bool(e.get("installed")),
+                "distance": int(e.get("distance", 0)),
+                "metric": int(e.get("metric", 0)),
+                "uptime": e.get("uptime", ""),
+                "nexthops": nexthops,
+            })
+    return recs
+
+
+def neighbor_records(obj: dict) -> list[dict]:
+    """'show ip ospf neighbor json' 결과({"neighbors": {id: [entry, ...]}})를 이웃 레코드 리스트로 변환."""
+    recs = []
+    for nbr_id, entries in ((obj or {}).get("neighbors") or {}).items():
+        # 구버전 FRR은 이웃당 리스트가 아니라 dict 하나
+        if isinstance(entries, dict):
+            entries = [entries]
+        for e in entries:
+            state = e.get("nbrState") or e.get("state") or ""
+            recs.append({
+                "neighbor_id": nbr_id,
+                "state": state,
+                "full": state.split("/", 1)[0].lower() == "full",
+                "priority": int(e.get("nbrPriority", e.get("priority", 0))),
+                "address": e.get("ifaceAddress") or e.get("address"),
+                "interface": e.get("ifaceName"),
+            })
+    return recs
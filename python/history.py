@@ -0,0 +1,304 @@
+"""
+history.py
+
+라우팅 상태 시계열 저장소 (SQLite, 추가 전용).
+
+- 수집 실행(run)마다 장비별 경로/OSPF 이웃 상태를 받아 "바뀐 것만" 저장한다(delta 인코딩).
+  각 행은 상태 하나가 유지된 구간 [first_run, last_run) 이다.
+    * 새로 생긴 경로/속성이 바뀐 경로  -> 새 행 (first_run = 이번 run)
+    * 사라진 경로/속성이 바뀌기 전 행  -> last_run = 이번 run 으로 닫음
+    * 그대로인 경로                    -> 아무것도 쓰지 않음
+  => 매시간 수집해도 전체 테이블 사본이 아니라 변경분만 쌓인다.
+- 수집 실패(error)한 장비는 상태를 모르므로 건드리지 않는다.
+- 조회: prefix별 이력(플랩), 특정 시점 상태, 이웃이 언제부터 down인지.
+
+사용 예:
+    python python/history.py ingest python/out/routes.json
+    python python/history.py prefix 10.0.2.0/24 --since 2025-10-01T00:00
+    python python/history.py neighbor clab-netauto-r1 172.20.20.3
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import frr_parse
+import snapshot
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DB = ROOT / "python" / "out" / "history.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id     INTEGER PRIMARY KEY,
+    ts     REAL NOT NULL,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS routes (
+    device    TEXT NOT NULL,
+    prefix    TEXT NOT NULL,
+    code      TEXT NOT NULL,
+    state     TEXT NOT NULL,            -- selected/fib/distance/metric/nexthops (JSON)
+    first_run INTEGER NOT NULL,
+    last_run  INTEGER                   -- NULL = 아직 유효
+);
+CREATE INDEX IF NOT EXISTS routes_prefix ON routes(prefix, device);
+CREATE INDEX IF NOT EXISTS routes_open ON routes(device) WHERE last_run IS NULL;
+CREATE TABLE IF NOT EXISTS neighbors (
+    device      TEXT NOT NULL,
+    neighbor_id TEXT NOT NULL,
+    state       TEXT NOT NULL,
+    full        INTEGER NOT NULL,
+    address     TEXT,
+    interface   TEXT,
+    first_run   INTEGER NOT NULL,
+    last_run    INTEGER
+);
+CREATE INDEX IF NOT EXISTS neighbors_id ON neighbors(device, neighbor_id);
+CREATE INDEX IF NOT EXISTS neighbors_open ON neighbors(device) WHERE last_run IS NULL;
+"""
+
+
+def connect(db=DEFAULT_DB) -> sqlite3.Connection:
+    Path(db).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db))
+    conn.executescript(SCHEMA)
+    return conn
+
+
+ROUTE_FIELDS = ("selected", "fib", "distance", "metric", "nexthops")
+
+
+_GROUPS_CACHE_SIZE = 64
+# id(레코드 튜플) -> (레코드 튜플, 그룹). frr_parse 가 같은 원문에 같은 튜플을 돌려주므로 내용 캐시와 같다
+_groups_cache: "OrderedDict[int, tuple]" = OrderedDict()
+
+
+def route_groups(payload: dict) -> dict[tuple[int, int, str], tuple]:
+    """
+    노드 payload -> {(network 정수, prefix 길이, code): (selected, fib, distance, metric, nexthops)}.
+    ECMP next-hop들은 한 상태로 묶고 정렬하므로 next-hop 순서는 비교에 영향이 없다.
+    키/상태가 정수·튜플이라 문자열 변환 없이 바로 해시 조인/== 비교할 수 있다(state_diff).
+    원문 파싱 결과는 레코드 튜플 단위로 캐시한다 (반환 dict는 캐시와 공유되므로 읽기 전용).
+    """
+    recs = frr_parse.route_records_for(payload)
+    if "route_records" in (payload or {}):     # 구조화 레코드는 매번 새 튜플 -> 캐시하지 않음
+        return _group_routes(recs)
+    hit = _groups_cache.get(id(recs))
+    if hit is not None and hit[0] is recs:
+        _groups_cache.move_to_end(id(recs))
+        return hit[1]
+    groups = _group_routes(recs)
+    _groups_cache[id(recs)] = (recs, groups)
+    if len(_groups_cache) > _GROUPS_CACHE_SIZE:
+        _groups_cache.popitem(last=False)
+    return groups
+
+
+def _group_routes(recs) -> dict[tuple[int, int, str], tuple]:
+    """
+    레코드 -> 그룹. 대부분인 단일 next-hop 경로는 상태 튜플 하나만 만들고
+    ((next-hop, 인터페이스),) 튜플은 같은 값끼리 공유한다. ECMP 그룹만 따로 모아 정렬한다.
+    """
+    groups = {}
+    single = {}     # (next-hop, 인터페이스) -> ((next-hop, 인터페이스),)
+    ecmp = []
+    for r in recs:
+        key = (r.network, r.prefixlen, r.code)
+        nh = (r.nexthop, r.interface)
+        st = groups.get(key)
+        if st is None:
+            nhs = single.get(nh)
+            if nhs is None:
+                nhs = single[nh] = (nh,)
+            groups[key] = (r.selected, r.fib, r.distance, r.metric, nhs)
+            continue
+        if len(st[4]) == 1:
+            ecmp.append(key)
+        groups[key] = (st[0], st[1] or r.fib, st[2], st[3], st[4] + (nh,))
+    for key in ecmp:
+        st = groups[key]
+        groups[key] = st[:4] + (tuple(sorted(st[4], key=str)),)
+    return groups
+
+
+def route_key(key: tuple[int, int, str]) -> tuple[str, str]:
+    """route_groups() 키 -> (prefix 문자열, code)"""
+    return f"{frr_parse.int_to_ip(key[0])}/{key[1]}", key[2]
+
+
+def state_dict(state: tuple) -> dict:
+    """route_groups()의 상태 튜플 -> {"selected", "fib", "distance", "metric", "nexthops"}"""
+    d = dict(zip(ROUTE_FIELDS, state))
+    d["nexthops"] = [list(nh) for nh in d["nexthops"]]
+    return d
+
+
+def route_states(payload: dict) -> dict[tuple[str, str], str]:
+    """노드 payload -> {(prefix, code): 상태 JSON} (routes.state 컬럼에 저장되는 형태)."""
+    return {route_key(k): json.dumps(state_dict(v), sort_keys=True) for k, v in route_groups(payload).items()}
+
+
+def neighbor_states(payload: dict) -> dict[str, tuple]:
+    """노드 payload -> {neighbor_id: (state, full, address, interface)}"""
+    return {nb.neighbor_id: (nb.state, int(nb.full), nb.address, nb.interface)
+            for nb in frr_parse.neighbor_records_for(payload)}
+
+
+def _apply(conn, run_id: int, device: str, table: str, key_cols: tuple, val_cols: tuple, current: dict) -> int:
+    """열린 행과 현재 상태를 비교해 닫기/추가만 수행. 반환: 바뀐 행 수"""
+    keys = ", ".join(key_cols)
+    vals = ", ".join(val_cols)
+    open_rows = {}
+    for row in conn.execute(
+            f"SELECT rowid, {keys}, {vals} FROM {table} WHERE device = ? AND last_run IS NULL", (device,)):
+        rowid, key, val = row[0], row[1:1 + len(key_cols)], row[1 + len(key_cols):]
+        open_rows[key if len(key) > 1 else key[0]] = (rowid, tuple(val))
+
+    to_close, to_insert = [], []
+    for key, val in current.items():
+        val = val if isinstance(val, tuple) else (val,)
+        old = open_rows.pop(key, None)
+        if old is not None and old[1] == val:
+            continue
+        if old is not None:
+            to_close.append(old[0])
+        key_t = key if isinstance(key, tuple) else (key,)
+        to_insert.append((device, *key_t, *val, run_id))
+    to_close += [rowid for rowid, _ in open_rows.values()]
+
+    conn.executemany(f"UPDATE {table} SET last_run = ? WHERE rowid = ?", [(run_id, r) for r in to_close])
+    cols = ("device",) + key_cols + val_cols + ("first_run",)
+    conn.executemany(
+        f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})", to_insert)
+    return len(to_close) + len(to_insert)
+
+
+def ingest(conn: sqlite3.Connection, nodes, ts: float | None = None, source: str = "") -> tuple[int, int]:
+    """
+    스냅샷 하나를 run으로 추가. nodes는 dict 또는 snapshot.iter_nodes() 스트림.
+    반환: (run id, 바뀐 행 수)
+    """
+    items = nodes.items() if isinstance(nodes, dict) else nodes
+    with conn:
+        run_id = conn.execute("INSERT INTO runs (ts, source) VALUES (?, ?)",
+                              (time.time() if ts is None else ts, source)).lastrowid
+        changed = 0
+        for device, payload in items:
+            if (payload or {}).get("error"):
+                continue
+            changed += _apply(conn, run_id, device, "routes", ("prefix", "code"), ("state",),
+                              route_states(payload))
+            changed += _apply(conn, run_id, device, "neighbors", ("neighbor_id",),
+                              ("state", "full", "address", "interface"), neighbor_states(payload))
+    return run_id, changed
+
+
+def _ts(value) -> float | None:
+    """ISO 문자열/epoch -> epoch 초 (시간대 없으면 UTC로 간주)."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _iso(ts: float | None) -> str | None:
+    return None if ts is None else datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+def prefix_history(conn, prefix: str, device: str | None = None, since=None, until=None) -> list[dict]:
+    """
+    prefix의 상태 구간들 (since~until 구간과 겹치는 것만).
+    같은 장비에서 구간이 여러 개면 그 사이에 경로가 사라졌거나 속성이 바뀐 것(플랩).
+    """
+    q = ("SELECT r.device, r.code, r.state, a.ts, b.ts FROM routes r "
+         "JOIN runs a ON a.id = r.first_run LEFT JOIN runs b ON b.id = r.last_run "
+         "WHERE r.prefix = ?")
+    args: list = [prefix]
+    if device:
+        q += " AND r.device = ?"
+        args.append(device)
+    if until is not None:
+        q += " AND a.ts <= ?"
+        args.append(_ts(until))
+    if since is not None:
+        q += " AND (b.ts IS NULL OR b.ts > ?)"
+        args.append(_ts(since))
+    q += " ORDER BY r.device, a.ts"
+    return [{"device": d, "code": c, "state": json.loads(s), "from": f, "to": t}
+            for d, c, s, f, t in conn.execute(q, args)]
+
+
+def routes_at(conn, device: str, at) -> list[dict]:
+    """특정 시점에 유효했던 장비 경로들."""
+    q = ("SELECT r.prefix, r.code, r.state FROM routes r "
+         "JOIN runs a ON a.id = r.first_run LEFT JOIN runs b ON b.id = r.last_run "
+         "WHERE r.device = ? AND a.ts <= ? AND (b.ts IS NULL OR b.ts > ?) ORDER BY r.prefix")
+    t = _ts(at)
+    return [{"prefix": p, "code": c, "state": json.loads(s)} for p, c, s in conn.execute(q, (device, t, t))]
+
+
+def neighbor_down_since(conn, device: str, neighbor_id: str) -> float | None:
+    """
+    이웃이 지금 Full이 아니면(또는 사라졌으면) 마지막으로 Full이 끝난 시각.
+    Full이면 None. 한 번도 Full이었던 적이 없으면 처음 기록된 시각.
+    """
+    rows = conn.execute(
+        "SELECT n.full, a.ts, b.ts FROM neighbors n "
+        "JOIN runs a ON a.id = n.first_run LEFT JOIN runs b ON b.id = n.last_run "
+        "WHERE n.device = ? AND n.neighbor_id = ? ORDER BY a.ts", (device, neighbor_id)).fetchall()
+    if not rows:
+        return None
+    full_rows = [r for r in rows if r[0]]
+    if any(r[2] is None for r in full_rows):
+        return None
+    if full_rows:
+        return max(r[2] for r in full_rows)
+    return rows[0][1]
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="라우팅/OSPF 이웃 상태 이력 저장소")
+    ap.add_argument("--db", type=Path, default=DEFAULT_DB)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_in = sub.add_parser("ingest", help="스냅샷을 이력에 추가")
+    p_in.add_argument("snapshot", type=Path, nargs="?", default=ROOT / "python" / "out" / "routes.json")
+    p_pf = sub.add_parser("prefix", help="prefix 상태 이력 (플랩)")
+    p_pf.add_argument("prefix")
+    p_pf.add_argument("--device")
+    p_pf.add_argument("--since")
+    p_pf.add_argument("--until")
+    p_nb = sub.add_parser("neighbor", help="OSPF 이웃 down 시각")
+    p_nb.add_argument("device")
+    p_nb.add_argument("neighbor_id")
+    args = ap.parse_args(argv)
+
+    conn = connect(args.db)
+    if args.cmd == "ingest":
+        run_id, changed = ingest(conn, snapshot.iter_nodes(args.snapshot), source=str(args.snapshot))
+        print(f"run {run_id}: {changed} change(s) recorded")
+    elif args.cmd == "prefix":
+        rows = prefix_history(conn, args.prefix, args.device, args.since, args.until)
+        for r in rows:
+            nhs = ", ".join(nh or "connected" for nh, _ in r["state"]["nexthops"])
+            print(f"{r['device']:<20} {r['code']} {_iso(r['from'])} -> {_iso(r['to']) or 'now':<23} via {nhs}")
+        print(f"{len(rows)} interval(s)", file=sys.stderr)
+    else:
+        since = neighbor_down_since(conn, args.device, args.neighbor_id)
+        if since is None:
+            print(f"{args.neighbor_id} on {args.device}: up (or unknown)")
+        else:
+            print(f"{args.neighbor_id} on {args.device}: down since {_iso(since)} "
+                  f"({(time.time() - since) / 60:.1f} min)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+inventory.py
+
+장비 목록의 단일 출처 (수집 / 검증 / 테스트가 같이 쓴다).
+
+- 입력
+  * ansible/inventory.ini        : 호스트, 그룹, [그룹:children], [그룹:vars], 인라인 호스트 변수
+  * ansible/group_vars/*.yml     : 그룹 변수 (group_vars/<그룹>/*.yml 디렉토리 형식도 지원)
+  * ansible/host_vars/*.yml      : 호스트 변수
+  * lab/*.clab.yml               : containerlab 토폴로지 (노드 이름 <-> 컨테이너 이름, kind/image)
+- 파싱 결과는 입력 파일들의 (경로, mtime, 크기) 지문을 키로 캐시한다.
+  * 프로세스 안: 같은 지문이면 다시 읽지 않음
+  * 프로세스 사이: python/out/.inventory_cache.json (수천 대 인벤토리를 워커마다 파싱하지 않도록)
+- 샤딩: shard(names, "i/N") 는 이름의 안정 해시(blake2b)로 N 조각 중 i번째(1부터)만 남긴다.
+  순서/프로세스/머신과 무관하게 같은 장비는 항상 같은 조각에 들어간다.
+
+사용 예:
+    python python/inventory.py                          # 전체 장비
+    python python/inventory.py --group routers --shard 2/8
+    python python/inventory.py --json
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+TOPOLOGY_GLOB = "lab/*.clab.yml"
+CACHE_PATH = ROOT / "python" / "out" / ".inventory_cache.json"
+CACHE_VERSION = 1
+
+ALL = "all"
+ROUTERS = "routers"
+
+_SECTION = re.compile(r"^\[([^\]:]+)(?::(\w+))?\]$")
+
+
+@dataclass
+class Device:
+    """인벤토리 호스트 하나. name = 인벤토리 호스트 이름 = 컨테이너 이름."""
+    name: str
+    node: str | None = None              # 토폴로지 노드 이름 (r1 등), 토폴로지에 없으면 None
+    groups: list[str] = field(default_factory=list)
+    vars: dict = field(default_factory=dict)
+    kind: str | None = None
+    image: str | None = None
+
+
+@dataclass
+class Inventory:
+    devices: dict[str, Device]           # 이름 -> Device (inventory.ini 순서)
+    groups: dict[str, list[str]]         # 그룹 -> 소속 장비 이름 (children 풀어서)
+    lab: str = ""                        # containerlab 이름 (컨테이너 접두사 clab-<lab>-)
+
+    def group(self, name: str = ALL) -> list[str]:
+        """그룹 소속 장비 이름 (ALL이면 전체). 없는 그룹은 빈 목록."""
+        if name == ALL:
+            return list(self.devices)
+        return list(self.groups.get(name, []))
+
+    def nodes(self, group: str = ALL) -> dict[str, str]:
+        """{토폴로지 노드 이름: 컨테이너 이름} (토폴로지에 있는 장비만)"""
+        return {self.devices[n].node: n for n in self.group(group) if self.devices[n].node}
+
+
+# --- inventory.ini ---
+def _scalar(value: str):
+    import yaml
+    try:
+        return yaml.safe_load(value)
+    except yaml.YAMLError:
+        return value
+
+
+def _kv(tokens: list[str]) -> dict:
+    out = {}
+    for tok in tokens:
+        key, sep, value = tok.partition("=")
+        if sep:
+            out[key] = _scalar(value)
+    return out
+
+
+def parse_ini(text: str) -> tuple[dict, dict, dict, dict]:
+    """
+    Ansible INI 인벤토리 -> (호스트 인라인 변수, 그룹 -> 직속 호스트, 그룹 -> 자식 그룹, 그룹 변수)
+    그룹 없이 맨 위에 적힌 호스트는 'ungrouped'.
+    """
+    hosts: dict[str, dict] = {}
+    members: dict[str, list[str]] = {}
+    children: dict[str, list[str]] = {}
+    group_vars: dict[str, dict] = {}
+    group, kind = "ungrouped", None
+    for raw in text.splitlines():
+        line = raw.split(" #", 1)[0].strip()
+        if not line or line.startswith((";", "#")):
+            continue
+        m = _SECTION.match(line)
+        if m:
+            group, kind = m.group(1), m.group(2)
+            if kind == "children":
+                children.setdefault(group, [])
+            elif kind == "vars":
+                group_vars.setdefault(group, {})
+            else:
+                members.setdefault(group, [])
+            continue
+        tokens = line.split()
+        if kind == "children":
+            children[group].append(tokens[0])
+        elif kind == "vars":
+            group_vars[group].update(_kv([line.replace(" = ", "=")]))
+        else:
+            hosts.setdefault(tokens[0], {}).update(_kv(tokens[1:]))
+            members.setdefault(group, []).append(tokens[0])
+    return hosts, members, children, group_vars
+
+
+def _expand(group: str, members: dict, children: dict, seen=()) -> list[str]:
+    out = list(members.get(group, []))
+    for child in children.get(group, []):
+        if child not in seen:
+            out += _expand(child, members, children, seen + (group,))
+    return list(dict.fromkeys(out))
+
+
+def _depth(group: str, parents: dict, seen=()) -> int:
+    ps = [p for p in parents.get(group, []) if p not in seen]
+    return 1 + max((_depth(p, parents, seen + (group,)) for p in ps), default=0)
+
+
+def _yaml_vars(base: Path, name: str) -> dict:
+    """<base>/<name>.yml(.yaml) 또는 <base>/<name>/*.yml 병합"""
+    import yaml
+    out = {}
+    for suffix in (".yml", ".yaml"):
+        p = base / f"{name}{suffix}"
+        if p.is_file():
+            out.update(yaml.safe_load(p.read_text(encoding="utf-8")) or {})
+    d = base / name
+    if d.is_dir():
+        for p in sorted(d.glob("*.y*ml")):
+            out.update(yaml.safe_load(p.read_text(encoding="utf-8")) or {})
+    return out
+
+
+# --- 로드 + 캐시 ---
+def _sources(root: Path) -> list[Path]:
+    ansible = root / "ansible"
+    paths = [ansible / "inventory.ini"]
+    for sub in ("group_vars", "host_vars"):
+        d = ansible / sub
+        if d.is_dir():
+            paths += sorted(p for p in d.rglob("*") if p.is_file())
+    paths += sorted(root.glob(TOPOLOGY_GLOB))
+    return paths
+
+
+def fingerprint(root: Path = ROOT) -> str:
+    """입력 파일들의 (상대 경로, mtime_ns, 크기) 해시. 하나라도 바뀌면 캐시 무효."""
+    h = hashlib.sha256(str(CACHE_VERSION).encode())
+    for p in _sources(root):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        h.update(f"{p.relative_to(root)}\0{st.st_mtime_ns}\0{st.st_size}\n".encode())
+    return h.hexdigest()
+
+
+def _build(root: Path) -> Inventory:
+    ansible = root / "ansible"
+    ini = ansible / "inventory.ini"
+    hosts, members, children, ini_group_vars = parse_ini(
+        ini.read_text(encoding="utf-8") if ini.exists() else "")
+
+    import yaml
+    lab, nodes = "", {}
+    for topo_path in sorted(root.glob(TOPOLOGY_GLOB)):
+        doc = yaml.safe_load(topo_path.read_text(encoding="utf-8")) or {}
+        lab = lab or doc.get("name", "")
+        for node, spec in ((doc.get("topology") or {}).get("nodes") or {}).items():
+            nodes[f"clab-{doc.get('name', '')}-{node}"] = (node, spec or {})
+
+    all_groups = list(dict.fromkeys([*members, *children, *ini_group_vars]))
+    groups = {g: _expand(g, members, children) for g in all_groups}
+    parents: dict[str, list[str]] = {}
+    for g, kids in children.items():
+        for k in kids:
+            parents.setdefault(k, []).append(g)
+
+    # 인벤토리에 없는 토폴로지 노드도 장비로 (그룹 'clab')
+    names = list(dict.fromkeys([*hosts, *nodes]))
+    extra = [n for n in nodes if n not in hosts]
+    if extra:
+        groups.setdefault("clab", []).extend(extra)
+
+    all_vars = {**_yaml_vars(ansible / "group_vars", ALL), **ini_group_vars.get(ALL, {})}
+    group_var_cache = {g: {**_yaml_vars(ansible / "group_vars", g), **ini_group_vars.get(g, {})}
+                       for g in groups}
+    member_of: dict[str, list[str]] = {}
+    for g, ms in groups.items():
+        for m in ms:
+            member_of.setdefault(m, []).append(g)
+    depth = {g: _depth(g, parents) for g in groups}
+    devices = {}
+    for name in names:
+        host_groups = sorted(member_of.get(name, []), key=lambda g: (depth[g], g))
+        merged = dict(all_vars)
+        for g in host_groups:                 # 부모 그룹 -> 자식 그룹 순 (자식 우선)
+            merged.update(group_var_cache[g])
+        merged.update(hosts.get(name, {}))
+        merged.update(_yaml_vars(ansible / "host_vars", name))
+        node, spec = nodes.get(name, (None, {}))
+        devices[name] = Device(name, node, host_groups, merged, spec.get("kind"), spec.get("image"))
+    return Inventory(devices, groups, lab)
+
+
+_memo: dict[str, Inventory] = {}
+
+
+def load(root: Path = ROOT, cache_path: Path | None = CACHE_PATH) -> Inventory:
+    """
+    인벤토리 로드. 입력 파일 지문이 같으면 프로세스 메모리 -> 디스크 캐시 순으로 재사용한다.
+    cache_path=None 이면 디스크 캐시를 쓰지 않는다.
+    """
+    root = Path(root)
+    key = f"{root}:{fingerprint(root)}"
+    inv = _memo.get(key)
+    if inv is not None:
+        return inv
+    if cache_path is not None:
+        try:
+            doc = json.loads(Path(cache_path).read_text(encoding="utf-8"))
+            if doc.get("key") == key:
+                inv = Inventory({n: Device(**d) for n, d in doc["devices"].items()},
+                                doc["groups"], doc.get("lab", ""))
+        except (OSError, ValueError, KeyError, TypeError):
+            inv = None
+    if inv is None:
+        inv = _build(root)
+        if cache_path is not None:
+            try:
+                Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+                Path(cache_path).write_text(json.dumps({
+                    "key": key, "lab": inv.lab, "groups": inv.groups,
+                    "devices": {n: asdict(d) for n, d in inv.devices.items()},
+                }), encoding="utf-8")
+            except OSError:
+                pass
+    _memo.clear()
+    _memo[key] = inv
+    return inv
+
+
+# --- 샤딩 ---
+def parse_shard(spec: str) -> tuple[int, int]:
+    """'i/N' -> (i, N). i는 1부터 N까지."""
+    try:
+        i, n = (int(x) for x in spec.split("/", 1))
+    except ValueError:
+        raise ValueError(f"shard must be i/N (e.g. 1/4): {spec!r}") from None
+    if not 1 <= i <= n:
+        raise ValueError(f"shard index out of range: {spec!r}")
+    return i, n
+
+
+def shard_of(name: str, n: int) -> int:
+    """이름 -> 조각 번호(1..n). 이름만으로 정해지는 안정 해시."""
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % n + 1
+
+
+def shard(names, spec: str | tuple[int, int] | None) -> list[str]:
+    """names 중 spec('i/N') 조각에 속하는 것만 (원래 순서 유지). spec이 없으면 전체."""
+    names = list(names)
+    if not spec:
+        return names
+    i, n = parse_shard(spec) if isinstance(spec, str) else spec
+    return [x for x in names if shard_of(x, n) == i] if n > 1 else names
+
+
+def shard_arg(text: str) -> str:
+    """argparse type: --shard i/N 검증"""
+    try:
+        parse_shard(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return text
+
+
+def select(names=None, group: str = ALL, spec: str | None = None, root: Path = ROOT) -> list[str]:
+    """CLI 공통: 명시한 이름들(없으면 인벤토리 그룹) -> 샤드 적용."""
+    return shard(names or load(root).group(group), spec)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="인벤토리 장비 목록 / 그룹 / 샤드")
+    ap.add_argument("--group", default=ALL, help="그룹 이름 (기본: all)")
+    ap.add_argument("--shard", type=shard_arg, default=None, help="i/N 조각만 (1부터)")
+    ap.add_argument("--json", action="store_true", help="장비 변수까지 JSON으로 출력")
+    args = ap.parse_args(argv)
+
+    inv = load()
+    names = shard(inv.group(args.group), args.shard)
+    if args.json:
+        print(json.dumps({n: asdict(inv.devices[n]) for n in names}, indent=2))
+    else:
+        print("\n".join(names))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
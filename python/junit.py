@@ -0,0 +1,215 @@
+"""
+junit.py
+
+pytest --junitxml 결과 집계기 (스트리밍, 여러 파일/glob).
+
+- iterparse 로 testcase 하나씩 읽고 바로 트리에서 떼어내므로 파일 크기와 무관한 메모리로 동작한다
+  (xdist 샤드별 junit 파일 여러 개도 한 번씩만 읽는다)
+- 합계(tests/failures/errors/skipped)는 기존 report.parse_junit 과 같이 최상위 testsuite 속성 기준,
+  속성이 없는 suite는 testcase 결과로 센다
+- testcase별 소요 시간: iter_cases() / 가장 느린 테스트 top N / 모듈(classname)별 누적 시간
+- CLI: 요약 출력, --github-output 으로 GitHub Actions step output(tests/passed/failed/skipped) 기록
+
+사용 예:
+    python python/junit.py 'tests/artifacts/junit*.xml' --top 10
+    python python/junit.py artifacts/tests/artifacts/junit*.xml --github-output
+"""
+
+import argparse
+import glob
+import heapq
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_GLOB = str(ROOT / "tests" / "artifacts" / "junit*.xml")
+DEFAULT_TOP = 10
+COUNT_KEYS = ("tests", "failures", "errors", "skipped")
+_OUTCOME_OF = {"failure": "failed", "error": "error", "skipped": "skipped"}
+_COUNT_OF = {"failed": "failures", "error": "errors", "skipped": "skipped"}
+
+
+@dataclass(slots=True)
+class Case:
+    classname: str
+    name: str
+    time: float
+    outcome: str     # passed | failed | error | skipped
+    file: str = ""
+
+    @property
+    def nodeid(self) -> str:
+        return f"{self.classname}::{self.name}" if self.classname else self.name
+
+
+def module_of(classname: str) -> str:
+    """pytest classname = 모듈[.클래스] -> 모듈 (클래스 이름은 대문자로 시작한다고 본다)"""
+    head, _, last = classname.rpartition(".")
+    return head if head and last[:1].isupper() else classname
+
+
+def expand(patterns) -> list[Path]:
+    """경로/glob 목록 -> 존재하는 파일 목록 (중복 제거, 정렬)."""
+    if isinstance(patterns, (str, Path)):
+        patterns = [patterns]
+    found = set()
+    for pat in patterns:
+        pat = str(pat)
+        if glob.has_magic(pat):
+            found.update(glob.glob(pat, recursive=True))
+        elif os.path.isfile(pat):
+            found.add(pat)
+    return sorted(Path(p) for p in found)
+
+
+def _outcome(elem) -> str:
+    for child in elem:
+        outcome = _OUTCOME_OF.get(child.tag)
+        if outcome:
+            return outcome
+    return "passed"
+
+
+def _float(v) -> float:
+    try:
+        return float(v or 0)
+    except ValueError:
+        return 0.0
+
+
+def _scan(path: Path):
+    """
+    파일 1개를 iterparse 로 훑으며 이벤트를 낸다.
+    - ("case", (classname, name, time, outcome)): testcase 가 끝날 때
+      (낸 뒤 suite에서 떼어내 메모리를 돌려준다. Case 객체는 필요한 쪽에서 만든다)
+    - ("suite", (속성 dict, 그 suite의 testcase 결과 수 | None)): 최상위 testsuite 가 끝날 때
+      (결과 수는 합계 속성이 없는 suite만 센다)
+    """
+    import xml.etree.ElementTree as ET
+    suites = []   # 열린 testsuite: [element, testcase 결과 수 dict | None]
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == "testsuite":
+                has_attrs = any(k in elem.attrib for k in COUNT_KEYS)
+                suites.append([elem, None if has_attrs else dict.fromkeys(COUNT_KEYS, 0)])
+            continue
+        if tag == "testcase":
+            outcome = _outcome(elem) if len(elem) else "passed"
+            case = (elem.get("classname", ""), elem.get("name", ""), _float(elem.get("time")), outcome)
+            if suites:
+                suite, own = suites[-1]
+                if own is not None:
+                    own["tests"] += 1
+                    key = _COUNT_OF.get(outcome)
+                    if key:
+                        own[key] += 1
+                if len(suite) and suite[-1] is elem:
+                    del suite[-1]
+            elem.clear()
+            yield "case", case
+        elif tag == "testsuite":
+            _, own = suites.pop()
+            attrib = dict(elem.attrib)
+            elem.clear()
+            if not suites:   # 중첩 suite는 바깥 suite 합계에 포함된다
+                yield "suite", (attrib, own)
+
+
+def iter_cases(patterns):
+    """glob/경로 목록의 모든 testcase 를 파일 순서대로 하나씩 낸다."""
+    for path in expand(patterns):
+        file = str(path)
+        for kind, item in _scan(path):
+            if kind == "case":
+                yield Case(*item, file)
+
+
+def aggregate(patterns, top: int = DEFAULT_TOP) -> dict:
+    """
+    여러 junit 파일 합계 + 소요 시간 분석.
+    반환: {tests, failures, errors, skipped, passed,   # 기존 parse_junit 과 같은 키
+           time, files, bytes, slowest: [Case dict...], modules: [{module, tests, time}...]}
+    """
+    totals = dict.fromkeys(COUNT_KEYS, 0)
+    heap = []          # (time, -seq, case 튜플, 파일) 최소 힙으로 top N 유지
+    by_class = {}      # classname -> [테스트 수, 누적 시간] (끝에 모듈 단위로 합친다)
+    seq = 0
+    total_time = 0.0
+    paths = expand(patterns)
+    size = 0
+    for path in paths:
+        size += path.stat().st_size
+        for kind, item in _scan(path):
+            if kind == "suite":
+                attrib, own = item
+                for k in COUNT_KEYS:
+                    totals[k] += own[k] if own is not None else int(attrib.get(k, 0) or 0)
+                continue
+            classname, _, t, _ = item
+            seq += 1
+            total_time += t
+            c = by_class.get(classname)
+            if c is None:
+                c = by_class[classname] = [0, 0.0]
+            c[0] += 1
+            c[1] += t
+            if top > 0:
+                if len(heap) < top:
+                    heapq.heappush(heap, (t, -seq, item, path))
+                elif (t, -seq) > heap[0][:2]:
+                    heapq.heapreplace(heap, (t, -seq, item, path))
+
+    modules = {}
+    for classname, (n, t) in by_class.items():
+        m = modules.setdefault(module_of(classname), [0, 0.0])
+        m[0] += n
+        m[1] += t
+    return {
+        **totals,
+        "passed": max(0, totals["tests"] - totals["failures"] - totals["errors"] - totals["skipped"]),
+        "time": round(total_time, 3),
+        "files": len(paths),
+        "bytes": size,
+        "slowest": [asdict(Case(*item, str(path))) for _, _, item, path in sorted(heap, reverse=True)],
+        "modules": sorted(({"module": m, "tests": n, "time": round(t, 3)} for m, (n, t) in modules.items()),
+                          key=lambda d: d["time"], reverse=True),
+    }
+
+
+def format_text(agg: dict) -> str:
+    lines = [f"{agg['files']} file(s): {agg['tests']} tests, {agg['passed']} passed, "
+             f"{agg['failures'] + agg['errors']} failed, {agg['skipped']} skipped, {agg['time']:.2f}s"]
+    if agg["slowest"]:
+        lines.append("slowest:")
+        lines += [f"  {c['time']:8.3f}s  {c['outcome']:<7}  {c['classname']}::{c['name']}" for c in agg["slowest"]]
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="junit XML 스트리밍 집계 (여러 파일/glob)")
+    ap.add_argument("paths", nargs="*", default=[DEFAULT_GLOB], help="junit 파일 또는 glob (기본: tests/artifacts/junit*.xml)")
+    ap.add_argument("--top", type=int, default=DEFAULT_TOP, help="가장 느린 테스트 수")
+    ap.add_argument("--json", action="store_true", help="집계 결과를 JSON으로 출력")
+    ap.add_argument("--github-output", action="store_true",
+                    help="$GITHUB_OUTPUT 에 tests/passed/failed/skipped 기록 (GitHub Actions)")
+    args = ap.parse_args(argv)
+
+    agg = aggregate(args.paths, args.top)
+    print(json.dumps(agg, indent=2) if args.json else format_text(agg))
+    if args.github_output:
+        out = os.environ.get("GITHUB_OUTPUT")
+        if not out:
+            print("GITHUB_OUTPUT is not set", file=sys.stderr)
+            return 1
+        with open(out, "a", encoding="utf-8") as f:
+            f.write(f"tests={agg['tests']}\npassed={agg['passed']}\n"
+                    f"failed={agg['failures'] + agg['errors']}\nskipped={agg['skipped']}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
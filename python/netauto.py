@@ -0,0 +1,71 @@
+"""
+netauto.py
+
+단일 CLI 진입점: `python python/netauto.py <명령> [인자...]` (python/<모듈>.py 를 직접 실행해도 같다).
+
+- 명령 -> 모듈 main(argv) 으로 넘긴다. 모듈은 고른 명령 하나만 import 하므로
+  `netauto.py --help` 나 가벼운 명령은 jinja2 / yaml / 프로세스 풀 등을 불러오지 않는다
+- 각 모듈은 import 해도 아무 일도 하지 않고(파일 쓰기 / 종료 없음) main(argv) 가 종료코드를 돌려주므로
+  테스트·훅·다른 도구는 서브프로세스 대신 같은 프로세스에서 run("validate", ...) 처럼 부른다
+
+사용 예:
+    python python/netauto.py collect --structured
+    python python/netauto.py validate --changed-only
+    python python/netauto.py report --junit 'tests/artifacts/junit*.xml'
+"""
+
+import importlib
+import sys
+
+# 명령 -> (모듈, 한 줄 설명)
+COMMANDS = {
+    "collect": ("collect_routes", "장비 라우팅/OSPF 상태 수집 -> python/out/routes.json"),
+    "collectd": ("collectd", "상주 수집기 (HTTP 스냅샷)"),
+    "report": ("report", "docs/report.md 생성"),
+    "validate": ("validate", "의도 설정 vs 백업 드리프트 검증"),
+    "audit": ("prefix_audit", "배포 전 OSPF prefix 겹침 / transit / area 검사"),
+    "backup": ("backup", "running-config 병렬 백업 (내용 주소 저장소)"),
+    "configs": ("configgen", "의도 설정 파일 생성 (python/out/configs)"),
+    "inventory": ("inventory", "인벤토리 조회"),
+    "paths": ("path_sim", "스냅샷 기반 포워딩 경로 시뮬레이션"),
+    "history": ("history", "라우팅 상태 이력 DB"),
+    "diff": ("state_diff", "두 스냅샷 / 이력 시점 비교"),
+    "junit": ("junit", "junit XML 집계"),
+    "bench": ("bench", "핫 패스 벤치마크"),
+    "fakelab": ("fakelab", "가짜 vtysh 랩 / 부하 테스트"),
+}
+
+
+def usage() -> str:
+    width = max(map(len, COMMANDS))
+    lines = ["usage: netauto.py <command> [args...]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {desc}" for name, (_, desc) in COMMANDS.items()]
+    return "\n".join(lines)
+
+
+def run(command: str, argv=None) -> int:
+    """명령 1개를 같은 프로세스에서 실행하고 종료코드를 돌려준다 (argparse 종료도 코드로 바꾼다)."""
+    try:
+        module, _ = COMMANDS[command]
+    except KeyError:
+        raise ValueError(f"unknown command {command!r} (choose from {', '.join(COMMANDS)})") from None
+    try:
+        rc = importlib.import_module(module).main(list(argv or []))
+    except SystemExit as e:
+        rc = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    return rc or 0
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 2
+    if argv[0] not in COMMANDS:
+        print(f"netauto.py: unknown command {argv[0]!r}\n\n{usage()}", file=sys.stderr)
+        return 2
+    return run(argv[0], argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+path_sim.py
+
+수집된 스냅샷 기반 오프라인 다중 홉 포워딩 경로 시뮬레이터.
+
+- 입력:
+  - 스냅샷 (python/out/routes.json, collect_routes.py 결과)
+  - 토폴로지 (lab/netauto.clab.yml 의 links: 어떤 인터페이스가 어느 이웃과 연결되는지)
+  - ansible/host_vars/*.yml (호스트 IP/GW: 호스트는 라우팅 테이블을 수집하지 않으므로
+    'connected + default via host_gw' 테이블을 만들어 쓴다)
+- 동작: 라우터마다 LPM 조회(route_index.py) -> 나가는 인터페이스의 링크 상대 노드로 이동
+  -> 목적지 주소를 가진 노드에 닿을 때까지 반복.
+  루프(같은 노드 재방문), 블랙홀(경로 없음 / 토폴로지 밖으로 나감)을 판정한다.
+- 전체 (출발 노드 x 목적지 주소) 경로 행렬을 랩 없이 몇 초 안에 계산한다.
+
+사용 예:
+    python python/path_sim.py                          # 전체 경로 행렬
+    python python/path_sim.py --src h1 --dst 10.0.2.100
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import frr_parse
+import route_index
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_SNAPSHOT = ROOT / "python" / "out" / "routes.json"
+DEFAULT_TOPOLOGY = ROOT / "lab" / "netauto.clab.yml"
+HOST_VARS_DIR = ROOT / "ansible" / "host_vars"
+
+MAX_HOPS = 64
+
+
+@dataclass
+class Topology:
+    name: str
+    nodes: list[str]
+    links: dict[tuple[str, str], tuple[str, str]]  # (노드, 인터페이스) -> (상대 노드, 상대 인터페이스)
+
+    def container(self, node: str) -> str:
+        """containerlab 컨테이너 이름 (clab-<lab>-<node>)."""
+        return f"clab-{self.name}-{node}"
+
+    def node_of(self, key: str) -> str:
+        """스냅샷/host_vars 키(컨테이너 이름 또는 노드 이름) -> 노드 이름."""
+        prefix = f"clab-{self.name}-"
+        return key[len(prefix):] if key.startswith(prefix) else key
+
+
+@dataclass
+class PathResult:
+    src: str
+    dst: str
+    status: str                      # delivered / blackhole / loop / max_hops
+    hops: list[str] = field(default_factory=list)
+    reason: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "delivered"
+
+
+def load_topology(path: Path = DEFAULT_TOPOLOGY) -> Topology:
+    import yaml
+    doc = yaml.safe_load(Path(path).read_text(encoding="utf-8")) or {}
+    topo = doc.get("topology") or {}
+    links = {}
+    for link in topo.get("links") or []:
+        a, b = link["endpoints"]
+        an, ai = a.split(":", 1)
+        bn, bi = b.split(":", 1)
+        links[(an, ai)] = (bn, bi)
+        links[(bn, bi)] = (an, ai)
+    return Topology(doc.get("name", ""), list((topo.get("nodes") or {}).keys()), links)
+
+
+def load_host_vars(directory: Path = HOST_VARS_DIR) -> dict[str, dict]:
+    """host_vars/*.yml -> {호스트 이름(파일 stem): 변수}"""
+    import yaml
+    return {
+        p.stem: yaml.safe_load(p.read_text(encoding="utf-8")) or {}
+        for p in sorted(Path(directory).glob("*.yml"))
+    }
+
+
+class Simulator:
+    """스냅샷 + 토폴로지 위에서 홉 단위 LPM 조회를 이어 붙인다."""
+
+    def __init__(self, snapshot: dict, topology: Topology, host_vars: dict | None = None):
+        self.topology = topology
+        self.indexes: dict[str, route_index.RouteIndex] = {}
+        self.owners: dict[int, str] = {}   # 주소 정수 -> 그 주소를 가진 노드
+
+        for key, payload in snapshot.items():
+            node = topology.node_of(key)
+            self.indexes[node] = route_index.build_index(payload)
+            # OSPF 이웃 레코드: interface 'eth1:10.0.12.1' 의 주소는 자기 것,
+            # address 는 그 인터페이스 링크 상대 노드의 것
+            for nb in frr_parse.neighbor_records_for(payload):
+                ifname, _, local = (nb.interface or "").partition(":")
+                if local:
+                    self.owners[frr_parse.ip_to_int(local)] = node
+                peer = topology.links.get((node, ifname))
+                if nb.address and peer:
+                    self.owners.setdefault(frr_parse.ip_to_int(nb.address), peer[0])
+
+        for key, hv in (host_vars or {}).items():
+            node = topology.node_of(key)
+            if not hv.get("host_ip") or node in self.indexes:
+                continue
+            self._add_host(node, hv["host_ip"], hv.get("host_gw"))
+
+    def _add_host(self, node: str, host_ip: str, host_gw: str | None):
+        """호스트: 첫 링크 인터페이스에 connected + default via host_gw 테이블을 만든다."""
+        ifaces = sorted(i for (n, i) in self.topology.links if n == node)
+        iface = ifaces[0] if ifaces else None
+        ip, _, plen = host_ip.partition("/")
+        net, length = frr_parse.prefix_to_ints(f"{ip}/{plen or 32}")
+        records = [frr_parse.RouteRecord("C", True, True, net, length, interface=iface)]
+        self.owners[frr_parse.ip_to_int(ip)] = node
+        if host_gw:
+            records.append(frr_parse.RouteRecord("K", True, True, 0, 0, 0, 0, host_gw, iface))
+            peer = self.topology.links.get((node, iface))
+            if peer:
+                self.owners.setdefault(frr_parse.ip_to_int(host_gw), peer[0])
+        self.indexes[node] = route_index.RouteIndex(records)
+
+    def addresses(self) -> list[str]:
+        """알려진(소유 노드가 있는) 모든 주소."""
+        return [frr_parse.int_to_ip(a) for a in sorted(self.owners)]
+
+    def trace(self, src: str, dst: str, max_hops: int = MAX_HOPS) -> PathResult:
+        """src 노드에서 dst 주소까지의 포워딩 경로."""
+        d = frr_parse.ip_to_int(dst)
+        owner = self.owners.get(d)
+        node = src
+        res = PathResult(src, dst, "max_hops", [src])
+        seen = {src}
+        for _ in range(max_hops):
+            if owner == node:
+                res.status = "delivered"
+                return res
+            idx = self.indexes.get(node)
+            if idx is None:
+                res.status, res.reason = "blackhole", f"{node}: no routing data"
+                return res
+            route = idx.lookup(d)
+            if route is None:
+                res.status, res.reason = "blackhole", f"{node}: no route to {dst}"
+                return res
+            peer = self.topology.links.get((node, route.interface))
+            if peer is None:
+                res.status, res.reason = "blackhole", f"{node}: {route.prefix} leaves the lab via {route.interface}"
+                return res
+            nxt = peer[0]
+            if route.nexthop is None and owner != nxt:
+                res.status, res.reason = "blackhole", f"{node}: {dst} not owned by any node on {route.interface}"
+                return res
+            res.hops.append(nxt)
+            if nxt in seen:
+                res.status, res.reason = "loop", f"revisited {nxt}"
+                return res
+            seen.add(nxt)
+            node = nxt
+        res.reason = f"exceeded {max_hops} hops"
+        return res
+
+    def matrix(self, sources=None, destinations=None) -> dict[tuple[str, str], PathResult]:
+        """(출발 노드, 목적지 주소) 전체 조합의 경로."""
+        sources = list(sources or sorted(self.indexes))
+        destinations = list(destinations or self.addresses())
+        return {(s, d): self.trace(s, d) for s in sources for d in destinations}
+
+
+def load_simulator(snapshot_path: Path = DEFAULT_SNAPSHOT,
+                   topology_path: Path = DEFAULT_TOPOLOGY,
+                   host_vars_dir: Path = HOST_VARS_DIR) -> Simulator:
+    snapshot = json.loads(Path(snapshot_path).read_text(encoding="utf-8"))
+    return Simulator(snapshot, load_topology(topology_path), load_host_vars(host_vars_dir))
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="스냅샷 기반 오프라인 포워딩 경로 시뮬레이션")
+    ap.add_argument("--snapshot", type=Path, default=DEFAULT_SNAPSHOT)
+    ap.add_argument("--topology", type=Path, default=DEFAULT_TOPOLOGY)
+    ap.add_argument("--src", action="append", help="출발 노드 (여러 번 지정 가능, 기본: 전체)")
+    ap.add_argument("--dst", action="append", help="목적지 주소 (여러 번 지정 가능, 기본: 알려진 전체 주소)")
+    ap.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = ap.parse_args(argv)
+
+    sim = load_simulator(args.snapshot, args.topology)
+    results = sim.matrix(args.src, args.dst)
+    if args.json:
+        print(json.dumps([vars(r) for r in results.values()], indent=2))
+    else:
+        for r in results.values():
+            mark = "✅" if r.ok else "❌"
+            tail = f"  ({r.reason})" if r.reason else ""
+            print(f"{mark} {r.src:>4} -> {r.dst:<15} {r.status:<9} {' > '.join(r.hops)}{tail}")
+    bad = sum(1 for r in results.values() if not r.ok)
+    print(f"{len(results) - bad}/{len(results)} path(s) delivered", file=sys.stderr)
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+prefix_audit.py
+
+배포 전 OSPF 주소 계획 검사기: 의도 변수(host_vars / group_vars / 인벤토리)의
+lan_net, transit_net, ospf_networks, ospf_area 를 장비 전체에 걸쳐 서로 맞춰 본다.
+
+- 장비마다 prefix 를 정수 구간 [네트워크 주소, 브로드캐스트 주소] 로 바꾸고,
+  같은 prefix 는 하나로 묶은 뒤 (주소 버전, 시작, -끝) 순으로 정렬해 한 번 훑는다(sweep line).
+  열린 구간은 끝 주소 최소 힙으로 관리 -> 장비 수천 대도 O(n log n + 보고 건수)
+- 보고 항목
+  * overlap      : 서로 다른 LAN/transit prefix 가 겹침 (같은 LAN 을 두 장비가 선언한 경우 포함)
+  * one-sided    : transit 을 한쪽 장비만 선언했거나, 양쪽이 선언했는데 한쪽만 OSPF 로 광고
+  * transit-shared : /30·/31 transit 을 세 대 이상이 선언
+  * area-mismatch: transit 양 끝 장비의 ospf_area 가 다름
+  * uncovered    : LAN(또는 양쪽 다 광고하지 않은 transit)이 그 장비 ospf_networks 어디에도 포함되지 않음
+  * invalid      : prefix 형식 오류
+- 변수는 configgen.py 와 같은 방식으로 합친다 (ospf_networks 가 없으면 lan_net, transit_net 으로 파생)
+- 종료코드: 0=문제 없음, 1=보고 항목 있음 -> make push / push-prebuilt 앞, CI 드리프트 검사 옆에서 게이트로 쓴다
+
+사용 예:
+    python python/prefix_audit.py                  # routers 그룹 전체
+    python python/prefix_audit.py --json
+"""
+
+import argparse
+import bisect
+import heapq
+import ipaddress
+import json
+import sys
+from dataclasses import asdict, dataclass
+
+import configgen
+import frr_parse
+import inventory
+
+DEFAULT_GROUP = "routers"
+KINDS = ("overlap", "one-sided", "transit-shared", "area-mismatch", "uncovered", "invalid")
+# 이 크기 이하(/30·/31, IPv6 /126 이상)의 transit 은 점대점 링크: 두 대만 선언해야 한다
+_LINK_SIZE = {4: 2 ** (32 - 30), 6: 2 ** (128 - 126)}
+
+
+@dataclass
+class Finding:
+    kind: str
+    prefix: str
+    hosts: tuple[str, ...]
+    detail: str
+
+
+@dataclass
+class Prefix:
+    """같은 prefix 를 선언한 장비들: 역할(lan/transit)별 호스트 목록"""
+    version: int
+    start: int
+    end: int
+    text: str
+    lan: list[str]
+    transit: list[str]
+
+
+def _as_list(value) -> list:
+    if value is None or value == "":
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _interval(value):
+    """prefix -> (버전, 시작 정수, 끝 정수, 정규화 문자열). IPv4 는 frr_parse 정수 변환(빠름), 그 외는 ipaddress"""
+    text = str(value).strip()
+    if text.count(".") == 3 and ":" not in text:
+        try:
+            start, end, length = frr_parse.prefix_bounds(text)
+            return 4, start, end, f"{frr_parse.int_to_ip(start)}/{length}"
+        except ValueError:
+            pass
+    net = ipaddress.ip_network(text, strict=False)
+    return net.version, int(net.network_address), int(net.broadcast_address), str(net)
+
+
+def collect(ctxs: dict[str, dict]):
+    """
+    호스트 변수 -> (prefix 목록, 호스트별 OSPF 광고 구간, 호스트별 area, invalid 보고).
+    광고 구간: {호스트: {버전: (시작 정렬 리스트, 누적 최대 끝 리스트)}} -> covers() 에서 이분 탐색
+    """
+    by_key: dict[tuple, Prefix] = {}
+    ospf: dict[str, dict[int, tuple]] = {}
+    areas: dict[str, object] = {}
+    invalid = []
+    for host, ctx in ctxs.items():
+        areas[host] = ctx.get("ospf_area", 0)
+        for role in ("lan", "transit"):
+            for value in _as_list(ctx.get(f"{role}_net")):
+                try:
+                    ver, s, e, text = _interval(value)
+                except ValueError as err:
+                    invalid.append(Finding("invalid", str(value), (host,), f"{role}_net: {err}"))
+                    continue
+                p = by_key.get((ver, s, e))
+                if p is None:
+                    p = by_key[(ver, s, e)] = Prefix(ver, s, e, text, [], [])
+                getattr(p, role).append(host)
+        spans = {}
+        for value in _as_list(ctx.get("ospf_networks")):
+            try:
+                ver, s, e, _ = _interval(value)
+            except ValueError as err:
+                invalid.append(Finding("invalid", str(value), (host,), f"ospf_networks: {err}"))
+                continue
+            spans.setdefault(ver, []).append((s, e))
+        index = {}
+        for ver, items in spans.items():
+            items.sort()
+            running, maxes = -1, []
+            for _, e in items:
+                running = max(running, e)
+                maxes.append(running)
+            index[ver] = ([s for s, _ in items], maxes)
+        ospf[host] = index
+    return sorted(by_key.values(), key=lambda p: (p.version, p.start, -p.end)), ospf, areas, invalid
+
+
+def covers(index: dict[int, tuple], p: Prefix) -> bool:
+    """호스트의 ospf_networks 중 하나가 p 를 포함하는지 (시작 <= p.start 인 구간들의 최대 끝 >= p.end)."""
+    starts, maxes = index.get(p.version, ((), ()))
+    i = bisect.bisect_right(starts, p.start) - 1
+    return i >= 0 and maxes[i] >= p.end
+
+
+def _owners(p: Prefix) -> list[str]:
+    return [f"lan {h}" for h in p.lan] + [f"transit {h}" for h in p.transit]
+
+
+def find_overlaps(prefixes: list[Prefix]) -> list[Finding]:
+    """
+    정렬된 prefix 를 한 번 훑으며 겹침 보고.
+    - 같은 prefix: LAN 을 두 곳 이상이 선언했거나 LAN 과 transit 으로 같이 쓰이면 overlap
+      (transit 만 여러 장비가 같은 prefix 를 선언하는 건 정상 링크 -> check_transits 에서 따짐)
+    - 다른 prefix: 구간이 겹치면 항상 overlap (prefix 는 포함 관계로만 겹친다)
+    """
+    out = []
+    active = []    # (끝 주소, 순번, Prefix) 최소 힙: 아직 끝나지 않은 구간
+    version = None
+    for seq, p in enumerate(prefixes):
+        if p.version != version:
+            active, version = [], p.version
+        while active and active[0][0] < p.start:
+            heapq.heappop(active)
+        if len(p.lan) > 1 or (p.lan and p.transit):
+            out.append(Finding("overlap", p.text, tuple(sorted(set(p.lan + p.transit))),
+                               f"{p.text} declared by {', '.join(_owners(p))}"))
+        for _, _, outer in active:
+            out.append(Finding("overlap", f"{outer.text} / {p.text}",
+                               tuple(sorted(set(outer.lan + outer.transit + p.lan + p.transit))),
+                               f"{p.text} ({', '.join(_owners(p))}) is inside "
+                               f"{outer.text} ({', '.join(_owners(outer))})"))
+        heapq.heappush(active, (p.end, seq, p))
+    return out
+
+
+def check_transits(prefixes: list[Prefix], ospf: dict, areas: dict) -> list[Finding]:
+    out = []
+    for p in prefixes:
+        hosts = sorted(set(p.transit))
+        if not hosts:
+            continue
+        if len(hosts) == 1:
+            out.append(Finding("one-sided", p.text, tuple(hosts),
+                               f"transit {p.text} is only declared by {hosts[0]}"))
+            continue
+        if len(hosts) > 2 and p.end - p.start + 1 <= _LINK_SIZE[p.version]:
+            out.append(Finding("transit-shared", p.text, tuple(hosts),
+                               f"point-to-point transit {p.text} is declared by {len(hosts)} routers"))
+        adv = [h for h in hosts if covers(ospf.get(h, {}), p)]
+        if not adv:
+            out += [Finding("uncovered", p.text, (h,), f"transit {p.text} is not in {h} ospf_networks")
+                    for h in hosts]
+        elif len(adv) < len(hosts):
+            silent = [h for h in hosts if h not in adv]
+            out.append(Finding("one-sided", p.text, tuple(hosts),
+                               f"transit {p.text} is advertised by {', '.join(adv)} but not by {', '.join(silent)}"))
+        if len({str(areas.get(h)) for h in adv}) > 1:
+            out.append(Finding("area-mismatch", p.text, tuple(adv),
+                               f"transit {p.text} areas: " + ", ".join(f"{h}={areas.get(h)}" for h in adv)))
+    return out
+
+
+def check_lans(prefixes: list[Prefix], ospf: dict) -> list[Finding]:
+    return [Finding("uncovered", p.text, (h,), f"lan {p.text} is not in {h} ospf_networks")
+            for p in prefixes for h in p.lan if not covers(ospf.get(h, {}), p)]
+
+
+def audit(ctxs: dict[str, dict]) -> list[Finding]:
+    """호스트 -> 의도 변수 dict 전체 검사. 반환: 보고 항목 (KINDS 순서, 그 안에서는 주소 순)"""
+    prefixes, ospf, areas, invalid = collect(ctxs)
+    found = find_overlaps(prefixes) + check_transits(prefixes, ospf, areas) + check_lans(prefixes, ospf) + invalid
+    order = {k: i for i, k in enumerate(KINDS)}
+    return sorted(found, key=lambda f: order[f.kind])
+
+
+def discover_hosts(group: str = DEFAULT_GROUP) -> list[str]:
+    """
+    검사 대상: 인벤토리 그룹 장비 (없으면 host_vars 에 lan_net / transit_net 이 있는 호스트).
+    링크 양 끝을 함께 봐야 하므로 --shard 로 나누지 않는다.
+    """
+    hosts = inventory.load().group(group)
+    if not hosts:
+        hosts = sorted(p.stem for p in configgen.HOST_VARS_DIR.glob("*.yml")
+                       if {"lan_net", "transit_net"} & set(configgen.load_yaml(p)))
+    return hosts
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="배포 전 OSPF prefix 겹침 / transit / area 검사")
+    ap.add_argument("hosts", nargs="*", help="검사 대상 (기본: 인벤토리 --group 장비)")
+    ap.add_argument("--group", default=DEFAULT_GROUP, help="인벤토리 그룹 (기본: routers)")
+    ap.add_argument("--json", action="store_true", help="보고 항목을 JSON 으로 출력")
+    args = ap.parse_args(argv)
+
+    hosts = args.hosts or discover_hosts(args.group)
+    findings = audit(configgen.contexts(hosts))
+    if args.json:
+        print(json.dumps([asdict(f) for f in findings], indent=2))
+    else:
+        for f in findings:
+            print(f"[{f.kind.upper()}] {f.detail}")
+        if not findings:
+            print(f"✅ No prefix conflicts across {len(hosts)} host(s): {', '.join(hosts)}")
+    return 1 if findings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
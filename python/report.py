@@ -2,115 +2,107 @@
 
 - 입력:
   - python/out/routes.json  (텍스트 기반: {"node": {"routes": "...", "ospf": "..."}})
-  - tests/artifacts/junit.xml (있으면 요약 반영, 없으면 0으로 처리)
+    * --routes 로 NDJSON 스냅샷(routes.ndjson[.gz|.zst])도 받는다 (노드 단위 스트리밍 읽기)
+    * 상주 수집기(collectd.py)가 떠 있으면 --routes URL 또는 환경변수 NETAUTO_COLLECTOR 로
+      메모리의 최신 스냅샷을 바로 읽는다
+    * collect_routes.py --structured 로 수집했다면 노드별 route_records /
+      neighbor_records 레코드로 집계하고, 없을 때만 원문 텍스트를 파싱한다
+  - tests/artifacts/junit*.xml (--junit 으로 파일/glob 지정, 여러 개면 합산, 없으면 0으로 처리)
+    * junit.py 스트리밍 집계: 합계 + 총 소요 시간 + 가장 느린 테스트/모듈
   - 환경변수 DRIFT_STATUS (0/ok/true/clean => No drift)
 
 - 출력:
   - docs/report.md
     - 상단: Netauto Health Summary (요약 표 + 노드별 요약 표)
+      + Performance: 트레이스 파일(tracing.py, python/out/trace-*.json)이 있으면 도구별 구간 시간 /
+        가장 느린 장비·호스트 표 (NETAUTO_TRACE=1 로 make report / make drift 를 돌리면 생김)
     - 구분선 --- 이후: 노드별 OSPF/Routes 원문 코드블록(6-backticks)
-    - 같은 파일 재실행 시 상단 요약만 갈아끼움(---를 경계로)
+  - docs/.report_state.json (노드별 원본 지문 + 지표 + report.md 안 상세 블록 위치 offset/length)
+    - 재실행 시 지문이 바뀐 노드만 다시 파싱/렌더하고, 그대로인 노드의 상세 블록은 이전 report.md 에서
+      offset 으로 복사 -> 상세 섹션은 노드 하나씩 파일로 흘려 쓰고 메모리/상태 파일에 모아 두지 않는다
+    - report.md 의 stat 서명이 상태에 저장된 것과 다르면(손으로 고쳤거나 checkout) 전부 다시 렌더
 """
-import os, json, re, datetime, xml.etree.ElementTree as ET
+import os, json, argparse, hashlib, tempfile
+from contextlib import nullcontext
 from pathlib import Path
 from datetime import datetime, timezone
 
+import frr_parse
+import junit as junit_xml
+import snapshot
+import tracing
+
 ROOT = Path(__file__).resolve().parents[1]
 ROUTES_PATH = ROOT / "python" / "out" / "routes.json"
-JUNIT_PATH  = ROOT / "tests" / "artifacts" / "junit.xml"
+JUNIT_GLOB  = junit_xml.DEFAULT_GLOB                   # xdist/샤드별 junit*.xml 전부 합산
 DOCS_DIR    = ROOT / "docs"
 REPORT_MD   = DOCS_DIR / "report.md"
+STATE_PATH  = DOCS_DIR / ".report_state.json"   # 노드별 지문/지표/상세 블록 위치 캐시
 
 FENCE = "``````"
 SUMMARY_MARK = "## Netauto Health Summary ("
 SEPARATOR = "\n---\n"
+DETAIL_TITLE = "# Netauto Report\n\n"
+STATE_VERSION = 2
+VOLATILE_KEYS = ("latency_ms",)
+SLOWEST_TESTS = 5       # 요약: 가장 느린 테스트 / 모듈 수
+PERF_TOP_STAGES = 8     # 성능 섹션: 도구별로 누적 시간이 큰 구간 수
+PERF_TOP_SLOWEST = 5    # 성능 섹션: 가장 느린 장비/호스트 구간 수
 
 def load_routes_json(p: Path) -> dict:
-    if not p.exists():
-        return {}
-    return json.loads(p.read_text(encoding="utf-8"))
+    return snapshot.load(p)
+
+def ospf_route_count(records) -> int:
+    """RouteRecord 중 OSPF 경로 수 (ECMP next-hop 여러 줄은 prefix 하나로 센다)."""
+    return len({(r.network, r.prefixlen) for r in records if r.code == "O"})
 
 def parse_ospf_routes_count(routes_text: str) -> int:
     """
-    FRR 'show ip route' 텍스트에서 OSPF 라인만 카운트.
-    - 좌측 공백 제거 후 'O'로 시작하는 라인 (O, O>*, O   등)
-    - 'Codes:'나 'A - Babel' 같은 범례/설명 라인은 제외
+    FRR 'show ip route' 텍스트에서 OSPF 경로 수.
+    - frr_parse.parse_routes()의 레코드 기준 ('Codes:' 등 범례 줄은 파서가 걸러냄)
     """
-    if not routes_text:
-        return 0
-    cnt = 0
-    for raw in routes_text.splitlines():
-        line = raw.lstrip()
-        if not line:
-            continue
-        if line.startswith("Codes:"):
-            continue
-        # 'X - YYY' 형태 범례 라인 배제
-        if re.match(r"^[A-Z]\s*-\s", line):
-            continue
-        if line.startswith("O"):
-            cnt += 1
-    return cnt
+    return ospf_route_count(frr_parse.parse_routes(routes_text))
 
 def parse_ospf_neighbors(ospf_text: str) -> tuple[int, int]:
     """
-    FRR 'show ip ospf neighbor' 테이블에서
-    - 헤더 제외, 빈 줄 제외
-    - 한 줄 = 한 이웃으로 간주
-    - 'Full' 포함 여부로 Full 카운트
-    """
-    if not ospf_text:
-        return 0, 0
-    total = full = 0
-    for raw in ospf_text.splitlines():
-        line = raw.strip()
-        if not line:
-            continue
-        if "Neighbor ID" in line and "State" in line:
-            continue
-        # 데이터 라인
-        parts = line.split()
-        if len(parts) < 4:
-            continue
-        total += 1
-        if re.search(r"\bFull\b", line, flags=re.I):
-            full += 1
-    return total, full
+    FRR 'show ip ospf neighbor' 테이블에서 (이웃 수, Full 이웃 수).
+    - frr_parse.parse_neighbors()의 레코드 기준 (헤더/빈 줄은 파서가 걸러냄)
+    """
+    nbrs = frr_parse.parse_neighbors(ospf_text)
+    return len(nbrs), sum(1 for nb in nbrs if nb.full)
 
-def aggregate_metrics(data: dict):
+def node_ospf_metrics(payload: dict) -> tuple[int, int, int]:
+    """
+    노드 하나의 (OSPF 경로 수, 이웃 수, Full 이웃 수).
+    - 구조화 레코드(route_records / neighbor_records)가 있으면 그것을,
+      없으면 원문 텍스트를 파싱한 frr_parse 레코드로 집계
+    """
+    nbrs = frr_parse.neighbor_records_for(payload)
+    return (ospf_route_count(frr_parse.route_records_for(payload)),
+            len(nbrs), sum(1 for nb in nbrs if nb.full))
+
+def _items(data):
+    """dict 또는 (노드, payload) 이터러블(snapshot.iter_nodes) 모두 받는다."""
+    return sorted(data.items()) if isinstance(data, dict) else data
+
+def aggregate_metrics(data):
+    """
+    노드별/전체 OSPF 지표. data가 snapshot.iter_nodes() 스트림이면
+    payload를 하나씩만 들고 집계하므로 원본 크기와 무관한 메모리로 동작한다.
+    """
     node = {}
     total_routes = total_neigh = total_full = 0
-    for n, payload in sorted(data.items()):
-        routes_txt = (payload or {}).get("routes", "") or ""
-        ospf_txt   = (payload or {}).get("ospf", "") or ""
-        r_cnt = parse_ospf_routes_count(routes_txt)
-        neigh_all, full = parse_ospf_neighbors(ospf_txt)
+    for n, payload in _items(data):
+        r_cnt, neigh_all, full = node_ospf_metrics(payload)
         node[n] = {"routes": r_cnt, "neigh_all": neigh_all, "full": full}
         total_routes += r_cnt
         total_neigh  += neigh_all
         total_full   += full
     return node, total_routes, total_neigh, total_full
 
-def parse_junit(p: Path):
-    if not p.exists():
-        return dict(tests=0, failures=0, errors=0, skipped=0, passed=0)
-    txt = p.read_text(encoding="utf-8")
-    root = ET.fromstring(txt)
-    suites = []
-    if root.tag == "testsuites":
-        suites = list(root)
-    elif root.tag == "testsuite":
-        suites = [root]
-    else:
-        suites = root.findall(".//testsuite")
-    tests = failures = errors = skipped = 0
-    for ts in suites:
-        tests   += int(ts.attrib.get("tests", 0))
-        failures+= int(ts.attrib.get("failures", 0))
-        errors  += int(ts.attrib.get("errors", 0))
-        skipped += int(ts.attrib.get("skipped", 0))
-    passed = max(0, tests - failures - errors - skipped)
-    return dict(tests=tests, failures=failures, errors=errors, skipped=skipped, passed=passed)
+def parse_junit(p, top: int = junit_xml.DEFAULT_TOP) -> dict:
+    """junit 파일/glob (하나 또는 목록) 스트리밍 집계. 키는 junit.aggregate() 참고."""
+    return junit_xml.aggregate(p, top)
 
 def drift_status_from_env() -> str:
     v = os.environ.get("DRIFT_STATUS", "").strip().lower()
@@ -118,7 +110,56 @@ def drift_status_from_env() -> str:
         return "Unknown"
     return "✅ No drift" if v in ("0", "ok", "true", "clean") else "❌ Drift detected"
 
-def build_summary_md(node_metrics: dict, t_routes: int, t_neigh: int, t_full: int, junit: dict) -> str:
+def build_slowest_tests_md(junit: dict, top: int = SLOWEST_TESTS) -> str:
+    """parse_junit() 결과 -> 가장 느린 테스트 / 모듈별 누적 시간 (소요 시간 정보가 없으면 빈 문자열)."""
+    slowest = [c for c in junit.get("slowest", [])[:top] if c["time"] > 0]
+    if not slowest:
+        return ""
+    lines = ["\n### Slowest Tests",
+             "| Test | Outcome | Time (s) |",
+             "|------|---------|----------|"]
+    lines += [f"| `{c['classname']}::{c['name']}` | {c['outcome']} | {c['time']:.3f} |" for c in slowest]
+    modules = junit.get("modules", [])[:top]
+    if modules:
+        lines += ["", "| Module | Tests | Time (s) |", "|--------|-------|----------|"]
+        lines += [f"| `{m['module']}` | {m['tests']} | {m['time']:.3f} |" for m in modules]
+    return "\n".join(lines)
+
+def build_perf_md(traces: list[dict]) -> str:
+    """
+    tracing.load_summaries() 결과 -> Performance 섹션 (없으면 빈 문자열).
+    - 도구별 누적 시간 상위 구간 (스레드/프로세스에서 겹쳐 돈 구간은 누적 합)
+    - 전체 도구에서 가장 느린 장비/호스트 구간
+    """
+    if not traces:
+        return ""
+    lines = ["\n### Performance",
+             "| Tool | Stage | Count | Total ms | Max ms | Bytes | Retries |",
+             "|------|-------|-------|----------|--------|-------|---------|"]
+    slowest = []
+    for t in sorted(traces, key=lambda t: t.get("tool", "")):
+        tool = t.get("tool", "?")
+        at = datetime.fromtimestamp(t.get("started", 0) / 1e6, timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+        lines.append(f"| **{tool}** | wall ({at}) | 1 | {t.get('wall_ms', 0):,.1f} | | | |")
+        stages = t["summary"].get("stages", {})
+        top = sorted((kv for kv in stages.items() if kv[0] != "total"),
+                     key=lambda kv: kv[1]["total_ms"], reverse=True)[:PERF_TOP_STAGES]
+        for name, s in top:
+            lines.append(f"| {tool} | {name} | {s['count']} | {s['total_ms']:,.1f} | {s['max_ms']:,.1f} "
+                         f"| {s['bytes']:,} | {s['retries']} |")
+        slowest += [(tool, sp) for sp in t["summary"].get("slowest", [])]
+    if slowest:
+        slowest.sort(key=lambda ts: ts[1]["ms"], reverse=True)
+        lines += ["\n#### Slowest devices / hosts",
+                  "| Tool | Stage | Device/Host | ms | Bytes | Error |",
+                  "|------|-------|-------------|----|-------|-------|"]
+        for tool, sp in slowest[:PERF_TOP_SLOWEST]:
+            lines.append(f"| {tool} | {sp['stage']} | {sp['subject']} | {sp['ms']:,.1f} "
+                         f"| {sp.get('bytes') or 0:,} | {sp.get('error') or ''} |")
+    return "\n".join(lines)
+
+def build_summary_md(node_metrics: dict, t_routes: int, t_neigh: int, t_full: int, junit: dict,
+                     perf: list | None = None) -> str:
     ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
     commit = os.environ.get("GITHUB_SHA", "")[:7]
     lines = []
@@ -129,6 +170,8 @@ def build_summary_md(node_metrics: dict, t_routes: int, t_neigh: int, t_full: in
     lines.append(f"| OSPF Routes (Total) | {t_routes} |")
     lines.append(f"| Pytest Passed/Failed | {junit['passed']}/{junit['failures'] + junit['errors']} |")
     lines.append(f"| Pytest Skipped | {junit['skipped']} |")
+    if junit.get("time"):
+        lines.append(f"| Pytest Time (sum) | {junit['time']:,.1f}s |")
     lines.append(f"| Drift | {drift_status_from_env()} |")
     lines.append(f"| Commit | `{commit}` |")
     lines.append("\n### Node Breakdown")
@@ -137,59 +180,161 @@ def build_summary_md(node_metrics: dict, t_routes: int, t_neigh: int, t_full: in
     for n in sorted(node_metrics):
         m = node_metrics[n]
         lines.append(f"| {n} | {m['full']} | {m['neigh_all']} | {m['routes']} |")
+    slow_md = build_slowest_tests_md(junit)
+    if slow_md:
+        lines.append(slow_md)
+    perf_md = build_perf_md(perf or [])
+    if perf_md:
+        lines.append(perf_md)
     return "\n".join(lines) + SEPARATOR
 
-def build_detail_md(data: dict) -> str:
-    lines = []
-    for n in sorted(data.keys()):
-        d = data.get(n, {}) or {}
-        ospf_txt = (d.get("ospf") or "").strip()
-        routes_txt = (d.get("routes") or "").strip()
-        lines += [
-            f"## {n}",
-            "### OSPF Neighbors",
-            FENCE, ospf_txt, FENCE,
-            "### Routes",
-            FENCE, routes_txt, FENCE,
-            ""
-        ]
+def build_node_detail_md(n: str, d: dict) -> str:
+    d = d or {}
+    ospf_txt = (d.get("ospf") or "").strip()
+    routes_txt = (d.get("routes") or "").strip()
+    lines = [f"## {n}"]
+    if d.get("error"):
+        lines.append(f"> ⚠️ collection error: {d['error']}")
+    lines += [
+        "### OSPF Neighbors",
+        FENCE, ospf_txt, FENCE,
+        "### Routes",
+        FENCE, routes_txt, FENCE,
+        ""
+    ]
     return "\n".join(lines)
 
-def merge_summary_into_existing(summary_md: str, existing: str) -> str:
+def build_detail_md(data: dict) -> str:
+    return DETAIL_TITLE + "\n".join(build_node_detail_md(n, data.get(n)) for n in sorted(data.keys()))
+
+def node_fingerprint(payload: dict) -> str:
+    """노드 원본 데이터 지문 (수집 때마다 바뀌는 latency_ms는 제외)."""
+    body = {k: v for k, v in (payload or {}).items() if k not in VOLATILE_KEYS}
+    return hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+
+def report_sig(p: Path):
+    """report.md 의 stat 서명 [mtime_ns, size] (없으면 None). 상태의 상세 블록 offset 이 아직 맞는지 본다."""
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+def load_state(p: Path, report_md: Path) -> dict:
+    try:
+        state = json.loads(p.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if state.get("version") != STATE_VERSION:
+        return {}
+    sig = report_sig(report_md)
+    return state.get("nodes", {}) if sig is not None and state.get("report") == sig else {}
+
+def refresh_nodes(data, prev: dict, scratch) -> tuple[dict, set]:
     """
-    기존 report.md가 Summary 블록으로 시작하면 그 블록을 교체,
-    아니면 summary를 맨 위에 삽입. Summary 끝은 SEPARATOR(---)로 구분.
+    노드별 지문이 이전과 같으면 저장된 지표/블록 위치(이전 report.md 기준)를 재사용하고,
+    바뀐 노드만 다시 파싱/렌더해 상세 블록을 scratch(바이너리 임시 파일)에 이어 쓴다.
+    반환: (새 상태, 다시 만든 노드 이름 -> 그 노드의 offset/length 는 scratch 기준)
+    data는 dict 또는 스트림. 원본 payload와 상세 블록은 노드 하나씩만 메모리에 둔다.
     """
-    if existing.startswith(SUMMARY_MARK):
-        if SEPARATOR in existing:
-            _, after = existing.split(SEPARATOR, 1)
-            return summary_md + after
-        else:
-            return summary_md
-    else:
-        return summary_md + existing
+    nodes = {}
+    fresh = set()
+    for n, payload in _items(data):
+        fp = node_fingerprint(payload)
+        old = prev.get(n)
+        if old and old.get("fp") == fp:
+            nodes[n] = old
+            continue
+        with tracing.span("render_node", cat="report", node=n):
+            r_cnt, neigh_all, full = node_ospf_metrics(payload)
+            block = build_node_detail_md(n, payload).encode("utf-8")
+            nodes[n] = {
+                "fp": fp,
+                "metrics": {"routes": r_cnt, "neigh_all": neigh_all, "full": full},
+                "offset": scratch.tell(),
+                "length": len(block),
+            }
+            scratch.write(block)
+        fresh.add(n)
+    return nodes, fresh
 
-def main():
+def write_report(path: Path, summary_md: str, nodes: dict, fresh: set, scratch) -> int:
+    """
+    요약 + 상세 섹션을 임시 파일에 노드 하나씩 써서 path 를 교체한다 (tmp + replace).
+    상세 블록은 fresh 노드면 scratch, 아니면 이전 path 에서 offset 으로 복사하고,
+    nodes 의 offset 은 새 파일 기준으로 고친다. 반환: 쓴 바이트 수
+    """
+    fd, tmp = tempfile.mkstemp(prefix=f".part-{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as out, \
+                (open(path, "rb") if len(fresh) < len(nodes) else nullcontext()) as old:
+            out.write((summary_md + DETAIL_TITLE).encode("utf-8"))
+            for i, n in enumerate(sorted(nodes)):
+                st = nodes[n]
+                src = scratch if n in fresh else old
+                src.seek(st["offset"])
+                if i:
+                    out.write(b"\n")
+                st["offset"] = out.tell()
+                out.write(src.read(st["length"]))
+            size = out.tell()
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return size
+
+def update_report(data, junit: dict, perf: list | None = None) -> int:
+    """
+    report.md 전체(요약 + 상세)를 갱신하고 노드 지문 상태를 저장한다.
+    perf: tracing.load_summaries() 결과 (있으면 요약에 Performance 섹션 추가)
+    반환: 다시 파싱/렌더한 노드 수
+    """
     DOCS_DIR.mkdir(parents=True, exist_ok=True)
-    data = load_routes_json(ROUTES_PATH)
+    with tracing.span("load_state", cat="io"):
+        prev = load_state(STATE_PATH, REPORT_MD)
+    with tempfile.TemporaryFile(dir=DOCS_DIR) as scratch:
+        with tracing.span("refresh_nodes", cat="report") as sp:
+            nodes, fresh = refresh_nodes(data, prev, scratch)
+            sp.set(nodes=len(nodes), rebuilt=len(fresh))
 
-    node_metrics, t_routes, t_neigh, t_full = aggregate_metrics(data)
-    junit = parse_junit(JUNIT_PATH)
+        node_metrics = {n: st["metrics"] for n, st in nodes.items()}
+        t_routes = sum(m["routes"] for m in node_metrics.values())
+        t_neigh  = sum(m["neigh_all"] for m in node_metrics.values())
+        t_full   = sum(m["full"] for m in node_metrics.values())
+        summary_md = build_summary_md(node_metrics, t_routes, t_neigh, t_full, junit, perf)
 
-    summary_md = build_summary_md(node_metrics, t_routes, t_neigh, t_full, junit)
+        with tracing.span("write", cat="io") as sp:
+            size = write_report(REPORT_MD, summary_md, nodes, fresh, scratch)
+            # report.md 를 먼저 교체하고 그 서명을 상태에 남긴다 (중간에 죽으면 서명 불일치 -> 다음 실행은 전부 렌더)
+            state = json.dumps({"version": STATE_VERSION, "report": report_sig(REPORT_MD), "nodes": nodes})
+            STATE_PATH.write_text(state, encoding="utf-8")
+            sp.set(bytes=size + len(state))
+    return len(fresh)
 
-    # 상세 섹션은 기존 파일이 없거나 상세가 비어 있으면 새로 생성
-    if REPORT_MD.exists():
-        existing = REPORT_MD.read_text(encoding="utf-8")
-        # 기존 내용에 상세 섹션이 이미 있다면 유지하고 상단만 교체
-        new_text = merge_summary_into_existing(summary_md, existing)
-    else:
-        detail_md = build_detail_md(data)
-        new_text = summary_md + detail_md
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Netauto 헬스 리포트 생성")
+    ap.add_argument("--routes", default=None,
+                    help="스냅샷 경로 (routes.json 또는 routes.ndjson[.gz|.zst]) 또는 수집기 URL "
+                         "(기본: $NETAUTO_COLLECTOR 가 있으면 그 수집기의 최신 스냅샷, 없으면 routes.json)")
+    ap.add_argument("--junit", nargs="+", default=[JUNIT_GLOB],
+                    help="junit XML 파일 또는 glob, 여러 개면 합산 (기본: tests/artifacts/junit*.xml)")
+    tracing.add_arguments(ap)
+    args = ap.parse_args(argv)
+    if args.routes is None:
+        collector = os.getenv("NETAUTO_COLLECTOR")
+        args.routes = collector.rstrip("/") + "/snapshot.ndjson" if collector else ROUTES_PATH
+    elif not snapshot.is_url(args.routes):
+        args.routes = Path(args.routes)
 
-    REPORT_MD.write_text(new_text, encoding="utf-8")
-    print("wrote", REPORT_MD)
+    with tracing.session("report", args.trace, args.profile):
+        with tracing.span("parse_junit", cat="report") as sp:
+            junit = parse_junit(args.junit)
+            sp.set(bytes=junit["bytes"], files=junit["files"])
+        # 트레이스를 켠 실행에서만 성능 섹션을 붙인다 (report 자신의 트레이스는 끝나야 생기므로 제외)
+        perf = [t for t in tracing.load_summaries() if t.get("tool") != "report"] if tracing.enabled() else []
+        rebuilt = update_report(snapshot.iter_nodes(args.routes), junit, perf)
+    print("wrote", REPORT_MD, f"({rebuilt} node(s) re-rendered)")
 
 if __name__ == "__main__":
     main()
-
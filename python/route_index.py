@@ -0,0 +1,67 @@
+"""
+route_index.py
+
+라우터별 최장 일치(LPM, longest-prefix match) 경로 인덱스.
+
+- 수집된 스냅샷(routes.json 형식)에서 라우터마다 한 번만 빌드한다.
+- "라우터 X는 주소 Y로 갈 때 어떤 경로/next-hop을 쓰나"를
+  docker exec 없이 메모리에서 바로 답한다.
+- 구조: prefix 길이별 {network 정수: 경로 레코드들} 해시 테이블.
+  조회는 존재하는 길이만 긴 것부터 최대 33번 dict 조회 -> 마이크로초 단위.
+
+사용 예:
+    idx = build_indexes(json.load(open("python/out/routes.json")))
+    r = idx["clab-netauto-r1"].lookup("10.0.2.100")
+    r.code, r.nexthop   # ('O', '10.0.12.2')
+"""
+
+import frr_parse
+
+
+class RouteIndex:
+    """
+    경로 레코드(frr_parse.RouteRecord)에 대한 LPM 인덱스.
+    - 기본적으로 선택된 경로(selected, '>')만 넣는다 (실제 포워딩에 쓰이는 경로)
+    - 같은 prefix의 ECMP next-hop들은 하나의 튜플로 묶인다
+    """
+
+    def __init__(self, records, selected_only: bool = True):
+        tables: dict[int, dict[int, list]] = {}
+        for r in records:
+            if selected_only and not r.selected:
+                continue
+            tables.setdefault(r.prefixlen, {}).setdefault(r.network, []).append(r)
+        self._tables = {plen: {net: tuple(rs) for net, rs in t.items()} for plen, t in tables.items()}
+        self._masks = [(plen, (0xFFFFFFFF << (32 - plen)) & 0xFFFFFFFF, self._tables[plen])
+                       for plen in sorted(self._tables, reverse=True)]
+
+    def __len__(self) -> int:
+        return sum(len(t) for t in self._tables.values())
+
+    def lookup_all(self, addr) -> tuple:
+        """addr(문자열 또는 정수)에 대한 최장 일치 경로들(ECMP 포함). 없으면 빈 튜플."""
+        a = frr_parse.ip_to_int(addr) if isinstance(addr, str) else addr
+        for _, mask, table in self._masks:
+            hit = table.get(a & mask)
+            if hit is not None:
+                return hit
+        return ()
+
+    def lookup(self, addr):
+        """최장 일치 경로 하나(ECMP면 첫 next-hop). 없으면 None."""
+        hit = self.lookup_all(addr)
+        return hit[0] if hit else None
+
+    def nexthops(self, addr) -> list:
+        """최장 일치 경로의 next-hop 목록 (직접 연결이면 [None])."""
+        return [r.nexthop for r in self.lookup_all(addr)]
+
+
+def build_index(payload: dict, selected_only: bool = True) -> RouteIndex:
+    """노드 payload(구조화 레코드 또는 원문) -> RouteIndex."""
+    return RouteIndex(frr_parse.route_records_for(payload), selected_only)
+
+
+def build_indexes(snapshot: dict, selected_only: bool = True) -> dict[str, RouteIndex]:
+    """스냅샷 전체 -> {노드: RouteIndex}."""
+    return {node: build_index(payload, selected_only) for node, payload in snapshot.items()}
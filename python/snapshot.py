@@ -0,0 +1,131 @@
+"""
+snapshot.py
+
+수집 스냅샷 입출력.
+
+- routes.json : 기존 형식. {"노드": {payload}, ...} 전체를 한 번에 dump
+- NDJSON      : 한 줄 = 장비 하나 {"node": "...", ...payload}
+                장비 수집이 끝나는 즉시 한 줄씩 쓰고 flush -> 중간에 죽어도 끝난 장비는 남는다
+- 압축        : 파일 이름이 .gz 면 gzip, .zst 면 zstandard (zstandard 패키지가 있을 때만)
+
+- http(s) URL  : 상주 수집기(collectd.py)의 /snapshot(.ndjson) 을 파일처럼 읽는다
+
+iter_nodes()는 형식에 상관없이 (노드, payload)를 하나씩 돌려주므로
+NDJSON을 읽을 때는 메모리에 장비 한 대 분량만 올라간다.
+"""
+
+import gzip
+import io
+import json
+from pathlib import Path
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+COMPRESS_SUFFIXES = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("zstd 압축에는 'zstandard' 패키지가 필요합니다 (pip install zstandard)") from e
+    return zstandard
+
+
+def open_text(path, mode: str = "r"):
+    """확장자(.gz/.zst)에 맞춰 텍스트 스트림을 연다. mode는 'r' 또는 'w'."""
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if path.suffix == ".zst":
+        zstd = _zstd()
+        raw = open(path, mode + "b")
+        if mode == "w":
+            stream = zstd.ZstdCompressor().stream_writer(raw, closefd=True)
+        else:
+            stream = zstd.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def is_url(path) -> bool:
+    return isinstance(path, str) and path.startswith(("http://", "https://"))
+
+
+def is_ndjson(path) -> bool:
+    if is_url(path):
+        return path.split("?", 1)[0].endswith(NDJSON_SUFFIXES)
+    path = Path(path)
+    name = path.stem if path.suffix in (".gz", ".zst") else path.name
+    return name.endswith(NDJSON_SUFFIXES)
+
+
+class NdjsonWriter:
+    """
+    장비 하나 = JSON 한 줄. write() 마다 flush 하므로 수집 도중 프로세스가 죽어도
+    이미 쓴 줄은 읽을 수 있다(압축 스트림은 마지막 블록이 잘릴 수 있음).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.count = 0
+        self._f = open_text(self.path, "w")
+
+    def write(self, node: str, payload: dict):
+        self._f.write(json.dumps({"node": node, **payload}, separators=(",", ":")) + "\n")
+        self._f.flush()
+        self.count += 1
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_nodes(path):
+    """
+    스냅샷 파일(또는 수집기 URL)에서 (노드, payload)를 하나씩.
+    파일이 없으면 아무것도 내지 않는다.
+    """
+    if is_url(path):
+        import urllib.request
+        f = io.TextIOWrapper(urllib.request.urlopen(path, timeout=30), encoding="utf-8")
+    else:
+        path = Path(path)
+        if not path.exists():
+            return
+        f = open_text(path, "r")
+    with f:
+        if not is_ndjson(path):
+            yield from json.load(f).items()
+            return
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            yield rec.pop("node"), rec
+
+
+def load(path) -> dict:
+    """스냅샷 전체를 dict로 (작은 스냅샷/호환용)."""
+    return dict(iter_nodes(path))
+
+
+def export_json(src, dst) -> int:
+    """
+    스냅샷(NDJSON 등)을 기존 routes.json 형식(indent=2)으로 내보낸다.
+    노드 단위로 써 내려가므로 전체를 메모리에 올리지 않는다. 반환: 노드 수
+    """
+    n = 0
+    with open_text(dst, "w") as out:
+        out.write("{")
+        for node, payload in iter_nodes(src):
+            body = json.dumps(payload, indent=2).replace("\n", "\n  ")
+            out.write(("," if n else "") + f"\n  {json.dumps(node)}: {body}")
+            n += 1
+        out.write("\n}" if n else "}")
+    return n
@@ -0,0 +1,151 @@
+"""
+state_diff.py
+
+두 수집 스냅샷 사이의 운영 상태(경로 / OSPF 이웃) 비교.
+
+- 장비별로 (prefix, 프로토콜 코드) 키의 해시 조인 -> 테이블 크기에 선형
+  * added   : 새 스냅샷에만 있는 경로
+  * removed : 이전 스냅샷에만 있는 경로
+  * changed : 양쪽에 있지만 next-hop / metric / distance / 선택 여부가 바뀐 경로
+- OSPF 이웃은 neighbor_id 키로 상태 전이(Full/- -> Init/- 등), 생김/사라짐을 보고한다.
+- 경로 상태는 history.py와 같은 정규화(route_groups)를 쓰므로 ECMP next-hop 순서는 무시된다.
+
+사용 예:
+    python python/state_diff.py old/routes.json python/out/routes.json
+    python python/state_diff.py a.ndjson.gz b.ndjson.gz --json
+종료 코드: 0=차이 없음, 1=차이 있음
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import history
+import snapshot
+
+def diff_routes(old: dict, new: dict) -> dict:
+    """
+    history.route_groups() 결과 두 개 -> {"added", "removed", "changed"}
+    정수 키로 조인하고, 출력에 실릴 경로만 prefix 문자열/dict로 바꾼다.
+    """
+    state_dict, route_key = history.state_dict, history.route_key
+    added, changed = [], []
+    for key, state in new.items():
+        prev = old.get(key)
+        if prev is None:
+            prefix, code = route_key(key)
+            added.append({"prefix": prefix, "code": code, **state_dict(state)})
+        elif prev != state:
+            prefix, code = route_key(key)
+            changed.append({"prefix": prefix, "code": code, "changes": _changes(prev, state)})
+    removed = []
+    for key, state in old.items():
+        if key not in new:
+            prefix, code = route_key(key)
+            removed.append({"prefix": prefix, "code": code, **state_dict(state)})
+    return {"added": added, "removed": removed, "changed": changed}
+
+
+def _changes(old: tuple, new: tuple) -> dict:
+    """상태 튜플 두 개 -> {필드: [이전, 이후]} (바뀐 필드만, next-hop 은 state_dict 와 같은 리스트 형태)"""
+    out = {}
+    for field, a, b in zip(history.ROUTE_FIELDS, old, new):
+        if a != b:
+            out[field] = [[list(nh) for nh in a], [list(nh) for nh in b]] if field == "nexthops" else [a, b]
+    return out
+
+
+def diff_neighbors(old: dict, new: dict) -> list[dict]:
+    """neighbor_states() 결과 두 개 -> 상태가 바뀐/생긴/사라진 이웃 목록"""
+    out = []
+    for nid in sorted(old.keys() | new.keys()):
+        a, b = old.get(nid), new.get(nid)
+        if a == b:
+            continue
+        out.append({
+            "neighbor_id": nid,
+            "old": a[0] if a else None,
+            "new": b[0] if b else None,
+            "address": (b or a)[2],
+        })
+    return out
+
+
+def diff_device(old_payload: dict | None, new_payload: dict | None) -> dict:
+    old_payload, new_payload = old_payload or {}, new_payload or {}
+    res = diff_routes(history.route_groups(old_payload), history.route_groups(new_payload))
+    res["neighbors"] = diff_neighbors(history.neighbor_states(old_payload),
+                                      history.neighbor_states(new_payload))
+    return res
+
+
+def is_empty(d: dict) -> bool:
+    return not (d["added"] or d["removed"] or d["changed"] or d["neighbors"])
+
+
+def diff_snapshots(old_path, new_path) -> dict[str, dict]:
+    """
+    두 스냅샷 파일 비교 -> {장비: 장비 diff} (차이 없는 장비는 제외).
+    이전 스냅샷만 메모리에 올리고 새 스냅샷은 장비 단위로 스트리밍한다.
+    수집 오류(error)가 있는 장비는 비교하지 않는다.
+    """
+    old = snapshot.load(old_path)
+    out = {}
+    for device, payload in snapshot.iter_nodes(new_path):
+        prev = old.pop(device, None)
+        if (payload or {}).get("error") or (prev or {}).get("error"):
+            continue
+        d = diff_device(prev, payload)
+        if not is_empty(d):
+            out[device] = d
+    for device, prev in old.items():     # 새 스냅샷에서 사라진 장비
+        if not (prev or {}).get("error"):
+            out[device] = diff_device(prev, None)
+    return out
+
+
+def format_text(result: dict[str, dict]) -> str:
+    lines = []
+    for device in sorted(result):
+        d = result[device]
+        lines.append(f"## {device}")
+        for r in d["added"]:
+            lines.append(f"+ {r['code']} {r['prefix']} via {_nh(r['nexthops'])}")
+        for r in d["removed"]:
+            lines.append(f"- {r['code']} {r['prefix']} via {_nh(r['nexthops'])}")
+        for r in d["changed"]:
+            parts = []
+            for f, (a, b) in r["changes"].items():
+                if f == "nexthops":
+                    a, b = _nh(a), _nh(b)
+                parts.append(f"{f} {a} -> {b}")
+            lines.append(f"~ {r['code']} {r['prefix']}: {'; '.join(parts)}")
+        for nb in d["neighbors"]:
+            lines.append(f"~ neighbor {nb['neighbor_id']} ({nb['address']}): {nb['old']} -> {nb['new']}")
+    return "\n".join(lines)
+
+
+def _nh(nexthops) -> str:
+    return ", ".join(ip or f"connected {ifname}" for ip, ifname in nexthops or [])
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="두 스냅샷 간 경로/OSPF 이웃 상태 diff")
+    ap.add_argument("old", type=Path)
+    ap.add_argument("new", type=Path)
+    ap.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = ap.parse_args(argv)
+
+    result = diff_snapshots(args.old, args.new)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    elif result:
+        print(format_text(result))
+    else:
+        print("no state changes")
+    return 1 if result else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+synth.py
+
+벤치마크/부하 테스트용 합성 데이터 생성기 (랩 없이 대규모 장비군 흉내).
+
+- route_table(n)        : FRR 'show ip route' 원문 (범례 + K/C/S/O 경로, 일부 ECMP)
+- neighbor_table(n)     : FRR 'show ip ospf neighbor' 원문
+- snapshot(routers, ..) : collect_routes.py 결과와 같은 {컨테이너: payload}
+- host_vars(i) / router_config(i) : validate.py 템플릿 컨텍스트와 그에 맞는 백업 설정
+- fleet_vars(routers)   : LAN / transit / area 까지 갖춘 장비군 의도 변수 (prefix_audit.py 입력)
+- junit_xml(tests)      : pytest --junitxml 형식 결과
+
+모든 생성기는 seed가 같으면 같은 출력을 낸다 (기준선 비교가 흔들리지 않도록).
+"""
+
+import random
+
+LEGEND = (
+    "Codes: K - kernel route, C - connected, S - static, R - RIP,\n"
+    "       O - OSPF, I - IS-IS, B - BGP, E - EIGRP, N - NHRP,\n"
+    "       T - Table, v - VNC, V - VNC-Direct, A - Babel, F - PBR,\n"
+    "       f - OpenFabric,\n"
+    "       > - selected route, * - FIB route, q - queued, r - rejected, b - backup\n"
+    "       t - trapped, o - offload failure\n\n"
+)
+NEIGHBOR_HEADER = (
+    "\nNeighbor ID     Pri State           Up Time         Dead Time Address         "
+    "Interface                        RXmtL RqstL DBsmL\n"
+)
+
+
+def _net(i: int) -> str:
+    """i번째 /24: 10.0.0.0/24, 10.0.1.0/24, ... (2^16개 이후는 11.x, 12.x ...)"""
+    return f"{10 + (i >> 16)}.{(i >> 8) & 255}.{i & 255}.0/24"
+
+
+def route_table(n: int, seed: int = 0, ecmp: float = 0.1) -> str:
+    """
+    경로 n개짜리 'show ip route' 원문.
+    대부분 OSPF(O>*), 1/20은 connected(+ 같은 prefix의 비선택 O), 일부 static,
+    ecmp 비율만큼은 next-hop 2개(ECMP 연속 줄).
+    """
+    rnd = random.Random(seed)
+    out = [LEGEND, "K>* 0.0.0.0/0 [0/0] via 172.20.20.1, eth0, 00:53:38\n"]
+    for i in range(n - 1):
+        net = _net(i)
+        r = rnd.random()
+        if i % 20 == 0:
+            out.append(f"O   {net} [110/10] is directly connected, eth{i % 8 + 1}, weight 1, 00:51:35\n"
+                       f"C>* {net} is directly connected, eth{i % 8 + 1}, 00:52:17\n")
+        elif r < 0.02:
+            out.append(f"S>* {net} [1/0] via 10.255.0.{i % 250 + 1}, eth1, weight 1, 01:02:03\n")
+        else:
+            metric = 20 + (i % 7) * 10
+            out.append(f"O>* {net} [110/{metric}] via 10.0.12.{i % 250 + 1}, eth1, weight 1, 00:51:15\n")
+            if r < 0.02 + ecmp:
+                out.append(f"  *                     via 10.0.13.{i % 250 + 1}, eth2, weight 1, 00:51:15\n")
+    return "".join(out)
+
+
+def neighbor_table(n: int, seed: int = 0, full: float = 0.95) -> str:
+    """이웃 n개짜리 'show ip ospf neighbor' 원문 (full 비율만큼 Full/-, 나머지는 Init/- 등)."""
+    rnd = random.Random(seed)
+    lines = [NEIGHBOR_HEADER]
+    for i in range(n):
+        state = "Full/-" if rnd.random() < full else rnd.choice(("Init/-", "2-Way/DROther", "ExStart/-"))
+        rid = f"172.{16 + (i >> 16)}.{(i >> 8) & 255}.{i & 255}"
+        addr = f"10.{(i >> 14) & 255}.{(i >> 6) & 255}.{(i & 63) * 4 + 2}"
+        lines.append(f"{rid:<15} {1:>3} {state:<15} 51m25s            35.472s {addr:<15} "
+                     f"eth{i % 48 + 1}:{addr[:-1]}1                       0     0     0\n")
+    lines.append("\n")
+    return "".join(lines)
+
+
+def snapshot(routers: int, routes: int = 200, neighbors: int = 4, seed: int = 0) -> dict:
+    """장비 routers대 스냅샷. 장비마다 seed를 달리해 출력이 조금씩 다르다."""
+    return {
+        f"clab-synth-r{i}": {
+            "routes": route_table(routes, seed + i),
+            "ospf": neighbor_table(neighbors, seed + i),
+            "error": None,
+            "latency_ms": 100.0,
+        }
+        for i in range(1, routers + 1)
+    }
+
+
+def host_vars(i: int, networks: int = 4) -> dict:
+    """validate.py 템플릿(frr.conf.j2) 컨텍스트: 라우터 i, OSPF 네트워크 networks개."""
+    return {
+        "hostname": f"r{i}",
+        "inventory_hostname": f"clab-synth-r{i}",
+        "transit_if": "eth1",
+        "ospf_area": 0,
+        "ospf_networks": [_net(i * networks + k) for k in range(networks)],
+    }
+
+
+def fleet_vars(routers: int) -> dict[str, dict]:
+    """
+    라우터 routers대 의도 변수: 장비마다 LAN /24 1개, 두 대씩 짝지은 transit /30 1개(100.64.0.0/10),
+    ospf_networks = [LAN, transit]. routers가 홀수면 마지막 장비의 transit은 한쪽만 선언된다.
+    """
+    out = {}
+    for i in range(1, routers + 1):
+        link = (i - 1) // 2
+        lan = _net(i)
+        transit = f"100.{64 + (link >> 14)}.{(link >> 6) & 255}.{(link & 63) * 4}/30"
+        out[f"clab-synth-r{i}"] = {
+            "hostname": f"r{i}",
+            "inventory_hostname": f"clab-synth-r{i}",
+            "lan_net": lan,
+            "transit_net": transit,
+            "ospf_area": 0,
+            "ospf_networks": [lan, transit],
+        }
+    return out
+
+
+def router_config(i: int, networks: int = 4, interfaces: int = 8) -> str:
+    """host_vars(i)로 렌더했을 때와 같은 OSPF 섹션 + 인터페이스 stanza들을 가진 백업 설정."""
+    hv = host_vars(i, networks)
+    lines = ["frr version 9.1", f"hostname {hv['hostname']}", "!"]
+    for k in range(1, interfaces + 1):
+        lines += [f"interface eth{k}", f" description synth link {k}",
+                  " ip ospf network point-to-point", "!"]
+    lines.append("router ospf")
+    lines += [f" network {net} area 0" for net in hv["ospf_networks"]]
+    lines += ["!", "line vty", ""]
+    return "\n".join(lines)
+
+
+def junit_xml(tests: int, suites: int = 1, failure_rate: float = 0.02, seed: int = 0) -> str:
+    """testcase tests개를 suites개로 나눈 junit XML (실패/스킵/소요 시간 포함)."""
+    rnd = random.Random(seed)
+    per = max(1, tests // max(1, suites))
+    out = ['<?xml version="1.0" encoding="utf-8"?>\n<testsuites>\n']
+    done = 0
+    for s in range(suites):
+        count = per if s < suites - 1 else tests - done
+        cases, fails, skips = [], 0, 0
+        for k in range(count):
+            t = rnd.expovariate(20)
+            name = f'<testcase classname="tests.test_synth_{s}" name="test_r{k}" time="{t:.3f}"'
+            r = rnd.random()
+            if r < failure_rate:
+                fails += 1
+                cases.append(f'{name}><failure message="assert False">AssertionError</failure></testcase>\n')
+            elif r < failure_rate * 2:
+                skips += 1
+                cases.append(f'{name}><skipped message="lab only"/></testcase>\n')
+            else:
+                cases.append(f"{name}/>\n")
+        out.append(f'<testsuite name="pytest-{s}" errors="0" failures="{fails}" skipped="{skips}" '
+                   f'tests="{count}">\n')
+        out += cases
+        out.append("</testsuite>\n")
+        done += count
+    out.append("</testsuites>\n")
+    return "".join(out)
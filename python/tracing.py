@@ -0,0 +1,377 @@
+"""
+tracing.py
+
+파이프라인 공통 구간(span) 타이머 + 트레이스 파일 (collect_routes / validate / report / pytest).
+
+- 켜는 법: 환경변수 NETAUTO_TRACE=1|true|yes|on (기본 디렉토리 python/out) 또는 NETAUTO_TRACE=<디렉토리>,
+  도구별 --trace PATH (1|true|yes|on 이면 기본 경로, 0|false|no|off 또는 빈 값이면 NETAUTO_TRACE 와 상관없이
+  꺼짐 -> trace_arg()). 꺼져 있으면 span()은 공유 no-op 객체를 돌려주므로 비용이 거의 없다.
+- 중첩: 같은 프로세스에서 도구 안에서 다른 도구를 부르면(pytest 훅의 netauto.run("collect") 등)
+  안쪽 세션이 끝날 때 바깥 트레이서로 돌아간다.
+- span(name, **args): 구간 이름 + 속성(device/host, bytes, retries ...)을 기록하는 컨텍스트 매니저
+  * with 블록 안에서 sp.set(bytes=...) / sp.add("retries") 로 속성을 채운다
+  * 스레드 안전 (스레드 풀 수집기에서 장비별 span이 스레드별 tid로 남는다)
+- timed(store, name): 트레이서 없이도 동작하는 측정기. 프로세스 풀 워커처럼 트레이서가 없는 곳에서
+  (이름, 시작 µs, 길이 µs)를 모아 돌려주면 부모가 record_all()로 옮겨 담는다.
+- 출력: trace-<도구>.json (Chrome trace 형식: chrome://tracing, https://ui.perfetto.dev 에서 열림)
+  * traceEvents : ph "X" 완료 이벤트 (ts/dur 단위 µs, 시작 시각은 벽시계 기준이라 프로세스 간 정렬됨)
+  * otherData   : 도구 이름, 시작 시각, 전체 소요 시간, 구간별 요약(summary) -> report.py 성능 섹션
+- 심층 분석(선택): NETAUTO_PROFILE=cprofile|sample 또는 --profile
+  * cprofile : profile-<도구>.prof (pstats / snakeviz) + 누적 시간 상위 함수 stderr 출력
+  * sample   : 5ms 간격 스택 샘플링, profile-<도구>.folded (flamegraph.pl / speedscope 입력)
+
+사용 예:
+    with tracing.session("collect_routes", args.trace, args.profile):
+        with tracing.span("device", device=c) as sp:
+            ...
+            sp.set(bytes=len(out))
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+OUT = ROOT / "python" / "out"
+
+TRACE_ENV = "NETAUTO_TRACE"
+PROFILE_ENV = "NETAUTO_PROFILE"
+PROFILE_MODES = ("cprofile", "sample")
+SAMPLE_INTERVAL = 0.005   # sample 모드 스택 샘플링 간격(초)
+SLOWEST = 10              # 요약에 남길 가장 느린 장비/호스트 span 수
+SUBJECT_KEYS = ("device", "host", "node")   # 이 속성이 있는 span = 장비/호스트 단위 구간
+
+
+def now_us() -> int:
+    return time.time_ns() // 1000
+
+
+class Span:
+    __slots__ = ("name", "cat", "args", "ts", "dur", "tid")
+
+    def __init__(self, name: str, cat: str, args: dict):
+        self.name, self.cat, self.args = name, cat, args
+        self.ts, self.dur, self.tid = 0, 0, 0
+
+    def set(self, **kv):
+        self.args.update(kv)
+
+    def add(self, key: str, n: int = 1):
+        self.args[key] = self.args.get(key, 0) + n
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **kv):
+        pass
+
+    def add(self, key: str, n: int = 1):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """도구 1회 실행의 이벤트 모음 (스레드 안전)."""
+
+    def __init__(self, tool: str, path: Path):
+        self.tool, self.path = tool, Path(path)
+        self.pid = os.getpid()
+        self.started = now_us()
+        self._t0 = time.perf_counter_ns()
+        self.events: list[dict] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, cat: str = "stage", **args):
+        sp = Span(name, cat, args)
+        sp.ts = now_us()
+        t0 = time.perf_counter_ns()
+        try:
+            yield sp
+        except BaseException as e:
+            sp.args.setdefault("error", type(e).__name__)
+            raise
+        finally:
+            sp.dur = (time.perf_counter_ns() - t0) // 1000
+            sp.tid = threading.get_native_id()
+            self._add(sp.name, sp.cat, sp.ts, sp.dur, sp.tid, sp.args)
+
+    def record(self, name: str, ts: int, dur: int, cat: str = "stage", tid: int | None = None, **args):
+        """이미 측정된 구간(다른 프로세스 등)을 추가한다."""
+        self._add(name, cat, ts, dur, tid if tid is not None else threading.get_native_id(), args)
+
+    def _add(self, name, cat, ts, dur, tid, args):
+        ev = {"name": name, "cat": cat, "ph": "X", "ts": ts, "dur": dur,
+              "pid": self.pid, "tid": tid, "args": args}
+        with self._lock:
+            self.events.append(ev)
+
+    def summary(self) -> dict:
+        """
+        구간 이름별 {count, total_ms, max_ms, bytes, retries} + 가장 느린 장비/호스트 span 목록.
+        (같은 이름이 스레드/프로세스에서 겹쳐 돌면 total_ms는 벽시계가 아니라 누적 시간)
+        """
+        with self._lock:
+            events = list(self.events)
+        stages = {}
+        for ev in events:
+            s = stages.setdefault(ev["name"], {"cat": ev["cat"], "count": 0, "total_ms": 0.0,
+                                               "max_ms": 0.0, "bytes": 0, "retries": 0})
+            ms = ev["dur"] / 1000
+            s["count"] += 1
+            s["total_ms"] += ms
+            s["max_ms"] = max(s["max_ms"], ms)
+            s["bytes"] += ev["args"].get("bytes", 0) or 0
+            s["retries"] += ev["args"].get("retries", 0) or 0
+        for s in stages.values():
+            s["total_ms"] = round(s["total_ms"], 3)
+            s["max_ms"] = round(s["max_ms"], 3)
+        subjects = [ev for ev in events if any(k in ev["args"] for k in SUBJECT_KEYS)]
+        subjects.sort(key=lambda ev: ev["dur"], reverse=True)
+        slowest = [{"stage": ev["name"],
+                    "subject": next(str(ev["args"][k]) for k in SUBJECT_KEYS if k in ev["args"]),
+                    "ms": round(ev["dur"] / 1000, 3),
+                    "bytes": ev["args"].get("bytes", 0),
+                    "retries": ev["args"].get("retries", 0),
+                    "error": ev["args"].get("error")}
+                   for ev in subjects[:SLOWEST]]
+        return {"stages": stages, "slowest": slowest}
+
+    def to_chrome(self) -> dict:
+        with self._lock:
+            events = sorted(self.events, key=lambda ev: ev["ts"])
+        meta = [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0,
+                 "args": {"name": self.tool}}]
+        return {
+            "traceEvents": meta + events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "tool": self.tool,
+                "started": self.started,
+                "wall_ms": round((time.perf_counter_ns() - self._t0) / 1e6, 3),
+                "summary": self.summary(),
+            },
+        }
+
+    def write(self) -> Path:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(".part-" + self.path.name)
+        tmp.write_text(json.dumps(self.to_chrome()), encoding="utf-8")
+        tmp.replace(self.path)
+        return self.path
+
+
+# --- 전역 트레이서 (도구 main()에서 session()으로 켜고 끈다) ---
+_tracer: Tracer | None = None
+_outer: list = []        # 중첩 start() 때 밀어 둔 바깥 트레이서들
+
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("", "0", "false", "no", "off")
+
+
+def trace_setting() -> Path | None:
+    """NETAUTO_TRACE 해석: 꺼짐 -> None, 참 값 -> python/out, 그 밖의 값 -> 그 디렉토리."""
+    val = os.getenv(TRACE_ENV, "").strip()
+    if val.lower() in _FALSE:
+        return None
+    return OUT if val.lower() in _TRUE else Path(val)
+
+
+def trace_arg(val: str):
+    """--trace 값 해석 (NETAUTO_TRACE 와 같은 단어): 꺼짐 -> False, 참 값 -> True (기본 경로), 그 밖의 값 -> 파일 경로."""
+    word = val.strip().lower()
+    if word in _FALSE:
+        return False
+    return True if word in _TRUE else Path(val)
+
+
+def trace_dir() -> Path:
+    """NETAUTO_TRACE 가 디렉토리를 가리키면 그곳, 아니면 python/out."""
+    return trace_setting() or OUT
+
+
+def trace_path(tool: str) -> Path:
+    return trace_dir() / f"trace-{tool}.json"
+
+
+def start(tool: str, path=None) -> Tracer | None:
+    """
+    path(--trace, trace_arg() 결과) 또는 NETAUTO_TRACE 가 켜져 있을 때만 트레이서를 켠다 (켜면 finish() 와 짝을 맞춘다).
+    path=False 는 명시적으로 끔, True 는 기본 경로. 이미 켜진 트레이서가 있으면 밀어 두었다가 finish() 때 되돌린다.
+    """
+    global _tracer
+    if path is False or (path is None and trace_setting() is None):
+        return None
+    _outer.append(_tracer)
+    _tracer = Tracer(tool, trace_path(tool) if path is None or path is True else Path(path))
+    return _tracer
+
+
+def finish() -> Path | None:
+    """트레이스 파일을 쓰고 바깥 트레이서(없으면 끔)로 돌아간다. 반환: 쓴 경로 (꺼져 있었으면 None)"""
+    global _tracer
+    tracer = _tracer
+    if tracer is None:
+        return None
+    _tracer = _outer.pop() if _outer else None
+    return tracer.write()
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, cat: str = "stage", **args):
+    tracer = _tracer
+    return tracer.span(name, cat, **args) if tracer else NULL_SPAN
+
+
+def record(name: str, ts: int, dur: int, cat: str = "stage", tid: int | None = None, **args):
+    if _tracer:
+        _tracer.record(name, ts, dur, cat, tid, **args)
+
+
+def record_all(timings, cat: str = "stage", tid: int | None = None, **args):
+    """timed()로 모은 [(이름, 시작 µs, 길이 µs), ...] 를 현재 트레이서로 옮긴다."""
+    if _tracer:
+        for name, ts, dur in timings:
+            _tracer.record(name, ts, dur, cat, tid, **args)
+
+
+@contextmanager
+def timed(store: list, name: str):
+    ts, t0 = now_us(), time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        store.append((name, ts, (time.perf_counter_ns() - t0) // 1000))
+
+
+# --- 선택적 프로파일러 ---
+class _Sampler:
+    """SAMPLE_INTERVAL 마다 모든 스레드 스택을 떠서 접힌 스택(folded) 횟수를 센다."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="netauto-sampler", daemon=True)
+
+    def _loop(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.counts[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+@contextmanager
+def profiled(tool: str, mode: str | None = None, top: int = 15):
+    """mode(--profile) 또는 NETAUTO_PROFILE 이 cprofile|sample 이면 블록 전체를 프로파일링한다."""
+    mode = mode or os.getenv(PROFILE_ENV) or None
+    if mode is None:
+        yield
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"unknown profile mode {mode!r} (choose from {', '.join(PROFILE_MODES)})")
+    out = trace_dir()
+    out.mkdir(parents=True, exist_ok=True)
+    if mode == "cprofile":
+        import cProfile
+        import pstats
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            path = out / f"profile-{tool}.prof"
+            prof.dump_stats(path)
+            buf = io.StringIO()
+            pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(top)
+            print(buf.getvalue(), file=sys.stderr)
+            print(f"profile: {path}", file=sys.stderr)
+        return
+    sampler = _Sampler()
+    sampler.start()
+    try:
+        yield
+    finally:
+        sampler.stop()
+        path = out / f"profile-{tool}.folded"
+        path.write_text("".join(f"{stack} {n}\n" for stack, n in sampler.counts.most_common()),
+                        encoding="utf-8")
+        leaf = Counter()
+        for stack, n in sampler.counts.items():
+            leaf[stack.rpartition(";")[2]] += n
+        total = sum(leaf.values()) or 1
+        for fn, n in leaf.most_common(top):
+            print(f"{n / total:6.1%}  {fn}", file=sys.stderr)
+        print(f"profile: {path} ({total} samples)", file=sys.stderr)
+
+
+@contextmanager
+def session(tool: str, trace=None, profile: str | None = None):
+    """도구 main() 한 번: 트레이서 시작 + (선택) 프로파일링 + 끝날 때 트레이스 파일 기록."""
+    tracer = start(tool, trace)
+    try:
+        with profiled(tool, profile):
+            if tracer:
+                with tracer.span("total", cat="tool"):
+                    yield tracer
+            else:
+                yield None
+    finally:
+        path = finish() if tracer else None     # 꺼진 세션은 바깥 트레이서를 닫지 않는다
+        if path:
+            print(f"trace: {path}", file=sys.stderr)
+
+
+def add_arguments(ap):
+    """도구 CLI 공통 옵션 (--trace / --profile)."""
+    ap.add_argument("--trace", type=trace_arg, default=None,
+                    help=f"구간 트레이스(Chrome trace JSON) 경로, 1/on 이면 기본 경로, 0/off 면 끔 "
+                         f"(기본: ${TRACE_ENV} 가 있으면 trace-<도구>.json)")
+    ap.add_argument("--profile", choices=PROFILE_MODES, default=None,
+                    help=f"심층 프로파일링: cprofile(.prof) / sample(.folded) (기본: ${PROFILE_ENV})")
+
+
+def load_summaries(directory=None) -> list[dict]:
+    """디렉토리의 trace-*.json 에서 otherData(도구, 시작 시각, 소요 시간, 요약)만 읽는다."""
+    out = []
+    for p in sorted(Path(directory or trace_dir()).glob("trace-*.json")):
+        try:
+            other = json.loads(p.read_text(encoding="utf-8")).get("otherData") or {}
+        except (OSError, ValueError):
+            continue
+        if other.get("summary"):
+            out.append(other)
+    return out
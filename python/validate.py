@@ -1,168 +1,285 @@
 # ---------------------------------------------
 # 네트워크 자동화 실습: "드리프트 감지" 스크립트
 # (의도한 설정 vs 실제 백업 설정 비교)
+#
+# 검증 엔진 구성
+# - 렌더는 configgen.py 엔진 (배포용 설정 생성과 같은 변수 병합 / 컴파일된 템플릿 / 2-패스 렌더)
+# - 호스트 결과 캐시: (템플릿, 호스트 렌더 컨텍스트, 백업) 해시가 같으면
+#   이전 결과를 그대로 사용 (python/out/.validate_cache.json)
+#   -> 아무것도 안 바뀐 재실행은 파일 해시만 계산하고 끝난다
+# - --changed-only: backup.py 가 남긴 바뀐 호스트 목록(python/out/backup_changed.txt) 밖의 호스트는
+#   렌더 입력(템플릿/컨텍스트/옵션)과 백업 파일 stat(mtime_ns, 크기)이 캐시와 같으면 백업을 읽지 않고
+#   이전 결과를 그대로 쓴다 (목록은 마지막 backup.py 실행분뿐이라 Ansible 백업 등은 stat 으로 잡는다)
+# - 캐시 미스 호스트는 프로세스 풀(--jobs)에서 병렬 렌더/비교
+# - 비교는 config_tree.py의 stanza 트리 단위 (순서/공백 무관, 크기에 선형)
+#   --sections ospf,interface 로 비교할 섹션 선택 (all = 전체)
+# - 구간 트레이스(tracing.py, NETAUTO_TRACE / --trace): 입력 해시·캐시·호스트별 렌더/비교·결과 쓰기 시간
+#   워커 프로세스는 check_host 결과의 timings로 돌려주고 부모가 트레이스에 옮겨 담는다
+# - 대상 호스트는 inventory.py 그룹(기본 routers), --shard i/N 으로 나눠 검증 가능
 # ---------------------------------------------
 
-import re, subprocess, pathlib, sys
-from jinja2 import Environment, StrictUndefined
-import yaml
+import argparse, json, os, pathlib, sys, tempfile
+
+import backup
+import config_tree
+import configgen
+import inventory
+import tracing
 
 # ===== 설정 =====
-COMPARE_ONLY_OSPF = True         # True: router ospf 블록만 비교 (불필요한 잡음 줄이기)
-ALLOW_WHITESPACE_DIFF = True     # True: 공백/빈 줄 차이는 무시 (포맷팅 차이 제거)
-BACKUP_GLOB = "*.conf"           # backups/*.conf 기준으로 비교할 호스트 자동 추출
+DEFAULT_SECTIONS = "ospf"        # 비교할 섹션 (router ospf 블록만: 불필요한 잡음 줄이기)
+DEFAULT_GROUP = "routers"        # 검증 대상 인벤토리 그룹
+BACKUP_GLOB = "*.conf"           # 인벤토리에 그룹이 없을 때 backups/*.conf 로 호스트 추출
+PARALLEL_MIN_HOSTS = 32          # 캐시 미스 호스트가 이보다 적으면 프로세스 풀 없이 직렬 처리
+CACHE_VERSION = 4                # 비교 로직이 바뀌면 올려서 기존 캐시 무효화
 # =================
 
 # 프로젝트 루트 경로 계산 (현재 파일 → python/validate.py → 루트로 이동)
 root = pathlib.Path(__file__).resolve().parents[1]
 
-# 비교 결과(diff)를 저장할 디렉토리 (없으면 생성)
+# 비교 결과(diff)와 결과 캐시를 저장할 디렉토리 (main에서 생성)
 outdir = root / "python" / "out"
-outdir.mkdir(parents=True, exist_ok=True)
-
-# Jinja2 환경 설정
-# - StrictUndefined: 정의되지 않은 변수가 있으면 오류 발생
-# - trim_blocks/lstrip_blocks: 불필요한 개행과 들여쓰기 제거
-env = Environment(
-    undefined=StrictUndefined,
-    trim_blocks=True,
-    lstrip_blocks=True,
-)
-
-# 템플릿(frr.conf.j2) 로드
-tpl_path = root / "ansible" / "templates" / "frr.conf.j2"
-tpl_src = tpl_path.read_text(encoding="utf-8")
-tpl = env.from_string(tpl_src)
-
-# group_vars 로드 (전체 라우터에 공통 적용되는 변수)
-gvars_path = root / "ansible" / "group_vars" / "routers.yml"
-gvars = {}
-if gvars_path.exists():
-    gvars = yaml.safe_load(gvars_path.read_text(encoding="utf-8")) or {}
-
-# 비교할 대상 호스트 목록: backups/*.conf 파일 이름에서 자동 추출
+cache_path = outdir / ".validate_cache.json"
+
+tpl_path = configgen.TEMPLATE
 backups_dir = root / "backups"
-hosts = sorted(p.stem for p in backups_dir.glob(BACKUP_GLOB)) or [
-    "clab-netauto-r1", "clab-netauto-r2"   # 기본값
-]
 
-def load_host_vars(host: str) -> dict:
-    """
-    특정 호스트(host_vars/*.yml)와 group_vars를 로드해서
-    Jinja 템플릿에 넘길 컨텍스트(dict)를 만든다.
-    """
-    hv_file = root / "ansible" / "host_vars" / f"{host}.yml"
-    hv = {}
-    if hv_file.exists():
-        hv = yaml.safe_load(hv_file.read_text(encoding="utf-8")) or {}
-
-    # inventory_hostname 기본 제공 (템플릿에서 default 필터용)
-    hv.setdefault("inventory_hostname", host)
-
-    # group_vars + host_vars 병합 (host_vars가 우선)
-    ctx = dict(gvars)
-    ctx.update(hv)
-
-    # ospf_networks 자동 생성 (lan_net, transit_net 기반)
-    if "ospf_networks" not in ctx:
-        nets = []
-        if ctx.get("lan_net"): nets.append(ctx["lan_net"])
-        if ctx.get("transit_net"): nets.append(ctx["transit_net"])
-        if nets:
-            ctx["ospf_networks"] = nets
-    return ctx
-
-# router ospf 블록만 추출하기 위한 정규식
-OSPF_START = re.compile(r"^router ospf\b", re.M)
-SECTION_END = re.compile(r"^\s*!\s*$", re.M)
-
-def extract_ospf(text: str) -> str:
-    """
-    config 텍스트에서 'router ospf' 블록만 추출한다.
-    (router ospf ~ 다음 ! 줄 직전까지)
-    """
-    m = OSPF_START.search(text)
-    if not m:
-        return ""
-    start = m.start()
-    m2 = SECTION_END.search(text, pos=start + 1)
-    end = m2.start() if m2 else len(text)
-    return text[start:end]
-
-def normalize(text: str) -> str:
+
+def discover_hosts(group: str = DEFAULT_GROUP, shard: str | None = None) -> list[str]:
     """
-    비교 전에 공백/개행을 정규화해서 포맷팅 차이 무시.
-    - 각 줄 끝 공백 제거
-    - 연속 빈 줄을 1개로 축소
-    - 전체 앞뒤 공백 제거
+    비교할 대상 호스트 목록: 인벤토리(inventory.py) 그룹 장비.
+    인벤토리에 그룹이 없으면 backups/*.conf 파일 이름에서 추출한다.
     """
-    lines = [ln.rstrip() for ln in text.splitlines()]
-    text = "\n".join(lines)
-    text = re.sub(r"\n{2,}", "\n", text, flags=re.M)
-    return text.strip()
+    hosts = inventory.load().group(group) or sorted(p.stem for p in backups_dir.glob(BACKUP_GLOB))
+    return inventory.shard(hosts, shard)
 
-# ---------------------------------------------
-# 메인 루프: 호스트별로 비교 수행
-# ---------------------------------------------
-fail = 0      # 차이 발생 횟수
-checked = []  # 비교 성공한 호스트 리스트
 
-for host in hosts:
-    # 1) 변수 로드 (host_vars + group_vars)
-    ctx = load_host_vars(host)
+def check_host(job: dict) -> dict:
+    """
+    호스트 1대 검증 (프로세스 풀 워커에서도 실행되므로 picklable한 dict만 주고받는다).
+    반환: {"host", "status": ok|drift|error, "message", "suffix", "rendered", "backup", "diff",
+           "pid", "timings": tracing.timed() 구간 목록 (run_checks가 트레이스로 옮기고 지움)}
+    """
+    host = job["host"]
+    res = {"host": host, "status": "ok", "message": "", "suffix": "",
+           "rendered": "", "backup": "", "diff": "", "pid": os.getpid(), "timings": []}
+    timings = res["timings"]
 
-    # 2) 템플릿 렌더 (2-패스: nested Jinja 변수까지 치환)
+    # 1) 템플릿 렌더 (컨텍스트는 부모가 configgen.contexts()로 미리 합쳐서 넘긴다)
     try:
-        once = tpl.render(**ctx)                      # 1차 렌더
-        rendered = env.from_string(once).render(**ctx)  # 2차 렌더
+        with tracing.timed(timings, "render"):
+            rendered = configgen.render(job["tpl_src"], job["ctx"])
     except Exception as e:
-        print(f"[ERROR] Jinja render failed for {host}: {e}")
-        fail += 1
-        continue
+        res.update(status="error", message=f"Jinja render failed for {host}: {e}")
+        return res
 
-    # 3) 백업 파일 로드
+    # 2) 백업 파일 로드
     bfile = backups_dir / f"{host}.conf"
     if not bfile.exists():
-        print(f"[ERROR] backup not found for {host}: {bfile}")
-        fail += 1
-        continue
+        res.update(status="error", message=f"backup not found for {host}: {bfile}")
+        return res
     backup = bfile.read_text(encoding="utf-8")
 
-    # 4) 비교 대상 선택 (전체 vs OSPF 섹션만)
-    if COMPARE_ONLY_OSPF:
-        rendered_cmp = extract_ospf(rendered)
-        backup_cmp   = extract_ospf(backup)
-        suffix = ".ospf"
-    else:
-        rendered_cmp = rendered
-        backup_cmp   = backup
-        suffix = ""
-
-    # 5) 공백 정규화 (옵션)
-    if ALLOW_WHITESPACE_DIFF:
-        rendered_cmp = normalize(rendered_cmp)
-        backup_cmp   = normalize(backup_cmp)
-
-    # 6) 비교 수행
-    if rendered_cmp != backup_cmp:
-        # 차이 있을 때
-        print(f"[DRIFT] {host} differs")
-        # 비교 파일을 python/out에 저장해서 diff 확인 가능
-        rfile = outdir / f"{host}{suffix}.rendered"
-        bfile2 = outdir / f"{host}{suffix}.backup"
-        rfile.write_text(rendered_cmp + "\n", encoding="utf-8")
-        bfile2.write_text(backup_cmp + "\n", encoding="utf-8")
-        # diff 결과를 터미널에 출력
-        subprocess.run(["diff", "-u", str(bfile2), str(rfile)])
-        fail += 1
-    checked.append(host)
+    # 3) 설정 트리로 파싱 후 비교할 섹션만 선택 (공백/줄 순서 차이는 자동으로 무시됨)
+    # 4) 트리 diff (차이 있으면 정렬된 설정 텍스트와 변경 목록 저장)
+    with tracing.timed(timings, "compare"):
+        sections = config_tree.parse_sections(job["sections"])
+        if sections != (config_tree.ALL,):
+            res["suffix"] = "." + "-".join(sections)
+        rendered_tree = config_tree.select(config_tree.parse(rendered), sections)
+        backup_tree   = config_tree.select(config_tree.parse(backup), sections)
+        changes = config_tree.diff(backup_tree, rendered_tree)
+    if changes:
+        name = f"{host}{res['suffix']}"
+        res.update(
+            status="drift",
+            message=f"{host} differs",
+            rendered=config_tree.dump(rendered_tree),
+            backup=config_tree.dump(backup_tree),
+            diff=(f"--- {outdir / (name + '.backup')}\n"
+                  f"+++ {outdir / (name + '.rendered')}\n"
+                  + config_tree.format_diff(changes)),
+        )
+    return res
+
+
+def inputs_key(tpl_hash: str, ctx: dict, options: tuple) -> str:
+    """(템플릿, 렌더 컨텍스트, 옵션) 해시 -> 백업을 뺀 렌더 입력 키 (--changed-only 재사용 판단)"""
+    return configgen.sha256("|".join((str(CACHE_VERSION), tpl_hash, configgen.context_hash(ctx), repr(options))))
+
+
+def cache_key(inputs: str, host: str) -> str:
+    """(렌더 입력, 백업) 해시 -> 호스트 결과 캐시 키"""
+    return configgen.sha256(inputs + "|" + configgen.file_hash(backups_dir / f"{host}.conf"))
+
+
+def backup_sig(host: str) -> list | None:
+    """백업 파일 stat 지문 [mtime_ns, 크기] (없으면 None) -> 내용 해시 없이 바뀌었는지 싸게 판단"""
+    try:
+        st = (backups_dir / f"{host}.conf").stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def load_cache(path: pathlib.Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def write_cache(path: pathlib.Path, entries: dict, drop=()) -> int:
+    """
+    결과 캐시 병합 저장: 쓰기 직전에 다시 읽은 캐시에 이번 호스트 항목만 덮어쓰고(drop 은 지움)
+    고유 임시 파일 + replace 로 바꾼다 -> 부분 실행(호스트 지정 / --shard)이 다른 호스트 항목을 지우지 않고,
+    동시에 도는 샤드가 반쯤 쓴 파일을 읽지 않는다. 반환: 쓴 바이트 수
+    """
+    cache = load_cache(path)
+    cache.update(entries)
+    for h in drop:
+        cache.pop(h, None)
+    body = json.dumps(cache)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".part-{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(body)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return len(body)
+
+
+def run_checks(hosts: list[str], jobs: int, use_cache: bool = True,
+               sections=DEFAULT_SECTIONS, changed: set[str] | None = None) -> tuple[list[dict], int]:
+    """
+    호스트 목록 검증. 반환: (호스트 순서대로의 결과 리스트, 캐시 적중 수)
+    changed: 백업이 바뀐 호스트 집합 (None = 모름 -> 모든 호스트의 백업 해시 확인).
+             주어지면 그 밖의 호스트는 렌더 입력과 백업 stat 이 캐시와 같을 때 백업 해시 없이 결과를 재사용한다.
+    """
+    with tracing.span("load_cache", cat="io"):
+        cache = load_cache(cache_path) if use_cache else {}
+
+    with tracing.span("hash_inputs", cat="validate", hosts=len(hosts)):
+        tpl_src = tpl_path.read_text(encoding="utf-8")
+        sections = config_tree.parse_sections(sections)
+        options = (sections,)
+        ctxs = configgen.contexts(hosts)
+        tpl_hash = configgen.sha256(tpl_src)
+        inputs = {h: inputs_key(tpl_hash, ctxs[h], options) for h in hosts}
+        sigs = {h: backup_sig(h) for h in hosts}
+        results, keys = {}, {}
+        for h in hosts:
+            hit = cache.get(h)
+            if changed is not None and h not in changed and hit and hit.get("inputs") == inputs[h] \
+                    and sigs[h] is not None and hit.get("backup") == sigs[h]:
+                keys[h] = hit["key"]              # 백업 그대로 -> 파일 해시 생략
+            else:
+                keys[h] = cache_key(inputs[h], h)
+            if hit and hit.get("key") == keys[h]:
+                results[h] = hit["result"]
+    hits = len(results)
+
+    misses = [h for h in hosts if h not in results]
+    if misses:
+        job_list = [{"host": h, "ctx": ctxs[h], "tpl_src": tpl_src, "sections": sections}
+                    for h in misses]
+        with tracing.span("check_hosts", cat="validate", hosts=len(misses)):
+            if jobs > 1 and len(misses) >= PARALLEL_MIN_HOSTS:
+                from concurrent.futures import ProcessPoolExecutor
+                with ProcessPoolExecutor(max_workers=jobs, initializer=configgen.init_worker,
+                                         initargs=(tpl_src,)) as pool:
+                    done = list(pool.map(check_host, job_list, chunksize=max(1, len(job_list) // (jobs * 4))))
+            else:
+                done = [check_host(j) for j in job_list]
+        for r in done:
+            tracing.record_all(r.pop("timings", ()), cat="validate", tid=r.pop("pid", None), host=r["host"])
+            results[r["host"]] = r
+
+    if use_cache:
+        # 결과 캐시 갱신 (렌더 오류는 환경 문제일 수 있어 캐시하지 않고 이전 항목도 지움)
+        entries = {h: {"key": keys[h], "inputs": inputs[h], "backup": sigs[h], "result": results[h]}
+                   for h in hosts if results[h]["status"] != "error"}
+        with tracing.span("write_cache", cat="io") as sp:
+            sp.set(bytes=write_cache(cache_path, entries, drop=[h for h in hosts if h not in entries]))
+
+    return [results[h] for h in hosts], hits
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="의도 설정(템플릿) vs 백업 설정 드리프트 검증")
+    ap.add_argument("hosts", nargs="*", help="검증 대상 (기본: 인벤토리 --group 장비)")
+    ap.add_argument("--group", default=DEFAULT_GROUP, help="인벤토리 그룹 (기본: routers)")
+    ap.add_argument("--shard", type=inventory.shard_arg, default=None,
+                    help="i/N: 호스트 이름 해시 기준 N 조각 중 i번째만 검증")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                    help="렌더/비교 프로세스 수")
+    ap.add_argument("--sections", default=DEFAULT_SECTIONS,
+                    help="비교할 섹션, 쉼표 구분 (예: ospf,interface / all)")
+    ap.add_argument("--no-cache", action="store_true", help="호스트 결과 캐시 사용 안 함")
+    ap.add_argument("--changed-only", nargs="?", type=pathlib.Path, const=backup.CHANGED_PATH, default=None,
+                    metavar="FILE", help="backup.py 의 바뀐 호스트 목록(기본: python/out/backup_changed.txt) "
+                                         "밖의 호스트는 백업을 다시 읽지 않고 캐시 결과 재사용")
+    tracing.add_arguments(ap)
+    args = ap.parse_args(argv)
+    with tracing.session("validate", args.trace, args.profile):
+        return _run(args)
+
+
+def _run(args) -> int:
+    outdir.mkdir(parents=True, exist_ok=True)
+    hosts = inventory.shard(args.hosts, args.shard) if args.hosts else discover_hosts(args.group, args.shard)
+
+    changed = None
+    if args.changed_only:
+        changed = backup.read_changed(args.changed_only)
+        if changed is None:
+            print(f"[WARN] {args.changed_only} not found; checking every host's backup", file=sys.stderr)
+
+    # ---------------------------------------------
+    # 호스트별 비교 수행 (캐시 적중은 재사용, 나머지는 렌더/비교)
+    # ---------------------------------------------
+    results, hits = run_checks(hosts, args.jobs, use_cache=not args.no_cache,
+                               sections=args.sections, changed=changed)
+
+    fail = 0      # 차이 발생 횟수
+    checked = []  # 비교 성공한 호스트 리스트
+    for r in results:
+        if r["status"] == "error":
+            print(f"[ERROR] {r['message']}")
+            fail += 1
+            continue
+        if r["status"] == "drift":
+            # 차이 있을 때: 비교 파일을 python/out에 저장해서 diff 확인 가능
+            print(f"[DRIFT] {r['message']}")
+            name = f"{r['host']}{r['suffix']}"
+            with tracing.span("write_diff", cat="io", host=r["host"]) as sp:
+                (outdir / f"{name}.rendered").write_text(r["rendered"] + "\n", encoding="utf-8")
+                (outdir / f"{name}.backup").write_text(r["backup"] + "\n", encoding="utf-8")
+                sp.set(bytes=len(r["rendered"]) + len(r["backup"]) + 2)
+            # diff 결과를 터미널에 출력
+            sys.stdout.write(r["diff"])
+            fail += 1
+        checked.append(r["host"])
+
+    # ---------------------------------------------
+    # 최종 결과 출력
+    # ---------------------------------------------
+    if fail == 0:
+        # 모든 호스트에서 드리프트 없음
+        print(f"✅ No drift found across {len(checked)} host(s): {', '.join(checked)}")
+    print(f"(cache: {hits}/{len(hosts)} host(s) reused"
+          + (f", {len(changed & set(hosts))} changed backup(s)" if changed is not None else "") + ")",
+          file=sys.stderr)
+
+    # 종료 코드: 0=성공(드리프트 없음), 1=실패(드리프트 존재)
+    return 1 if fail else 0
 
-# ---------------------------------------------
-# 최종 결과 출력
-# ---------------------------------------------
-if fail == 0:
-    # 모든 호스트에서 드리프트 없음
-    print(f"✅ No drift found across {len(checked)} host(s): {', '.join(checked)}")
 
-# 종료 코드: 0=성공(드리프트 없음), 1=실패(드리프트 존재)
-sys.exit(1 if fail else 0)
+if __name__ == "__main__":
+    sys.exit(main())
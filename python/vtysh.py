@@ -0,0 +1,271 @@
+"""
+vtysh.py
+
+vtysh 명령 배치 실행 레이어.
+
+- N개의 show 명령을 'docker exec' 1회 + vtysh 기동 1회로 실행한다.
+    docker exec <container> vtysh -E -c 'show a' -c 'show b' ...
+- -E(--echo) 옵션은 각 명령 출력 앞에 '<hostname># <명령>' 줄을 찍어 주므로
+  그 줄을 경계로 출력을 명령별 결과로 다시 나눈다(demultiplex).
+- 장비 수 x 명령 수 만큼 fork/exec 하던 비용이 장비 수 만큼으로 줄어든다.
+- VtyshSession: 'docker exec -i <container> vtysh' 를 한 번 띄워 두고 stdin으로 명령을 계속 보낸다
+  (상주 수집기 collectd.py 용). 배치마다 docker exec / vtysh 기동 비용이 없어진다.
+  명령 사이에 'echo <마커>' 를 끼워 보내고 그 마커 줄로 출력을 나눈다
+  (비대화형 stdin에서 프롬프트/입력 에코 형태가 버전마다 달라도 경계가 흔들리지 않음).
+- 실행 백엔드는 교체 가능하다 (get_executor / set_executor): 기본 DockerExecutor,
+  NETAUTO_EXECUTOR=fake 면 fakelab.py 시뮬레이터. 수집기/테스트는 run_batch()와
+  get_executor().session()만 쓰므로 백엔드를 몰라도 된다.
+"""
+
+import itertools
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+
+# -E 가 찍는 프롬프트 부분: 'r1# ' / 'r1(config)# ' / 'r1> '
+_PROMPT = re.compile(r"^\S+[#>] $")
+
+
+@dataclass
+class BatchResult:
+    """배치 실행 결과. outputs는 명령 문자열 -> 해당 명령의 출력."""
+    container: str
+    commands: list[str]
+    returncode: int
+    stdout: str = ""
+    stderr: str = ""
+    outputs: dict[str, str] = field(default_factory=dict)
+
+
+def batch_argv(container: str, commands: list[str]) -> list[str]:
+    """배치 실행용 argv (셸을 거치지 않으므로 명령 안의 따옴표를 신경 쓸 필요 없음)."""
+    argv = ["docker", "exec", container, "vtysh", "-E"]
+    for cmd in commands:
+        argv += ["-c", cmd]
+    return argv
+
+
+def _is_echo(line: str, cmd: str) -> bool:
+    s = line.rstrip("\r\n")
+    return s.endswith(cmd) and bool(_PROMPT.match(s[: len(s) - len(cmd)]))
+
+
+def split_output(text: str, commands: list[str]) -> dict[str, str]:
+    """
+    'vtysh -E -c ...' 출력 전체를 명령별 출력으로 나눈다.
+    - 명령 에코 줄은 명령 순서대로만 찾는다(출력 본문에 같은 문자열이 있어도 안전)
+    - 에코 줄을 찾지 못한 명령(앞 명령 실패로 중단 등)은 빈 문자열
+    - 같은 명령이 두 번 들어오면 마지막 출력이 남는다
+    """
+    outputs = {cmd: "" for cmd in commands}
+    idx = 0
+    current = None
+    buf: list[str] = []
+    for line in text.splitlines(keepends=True):
+        if idx < len(commands) and _is_echo(line, commands[idx]):
+            if current is not None:
+                outputs[current] = "".join(buf)
+            current = commands[idx]
+            idx += 1
+            buf = []
+            continue
+        if current is not None:
+            buf.append(line)
+    if current is not None:
+        outputs[current] = "".join(buf)
+    return outputs
+
+
+class DockerExecutor:
+    """실제 컨테이너에 docker exec 로 붙는 기본 실행 백엔드."""
+    name = "docker"
+
+    def run_batch(self, container: str, commands: list[str], timeout: float | None = None) -> BatchResult:
+        """
+        commands를 한 번의 docker exec / vtysh 호출로 실행한다.
+        - timeout 초과 시 subprocess.TimeoutExpired 발생 (자식 프로세스는 종료됨)
+        - 종료코드는 검사하지 않고 BatchResult.returncode로 넘긴다
+        """
+        cp = subprocess.run(
+            batch_argv(container, commands),
+            text=True,
+            capture_output=True,
+            timeout=timeout,
+        )
+        return BatchResult(
+            container=container,
+            commands=list(commands),
+            returncode=cp.returncode,
+            stdout=cp.stdout,
+            stderr=cp.stderr,
+            outputs=split_output(cp.stdout, commands),
+        )
+
+    def session(self, container: str) -> "VtyshSession":
+        return VtyshSession(container)
+
+
+_executor = None
+
+
+def get_executor():
+    """
+    현재 실행 백엔드. 처음 부를 때 환경변수 NETAUTO_EXECUTOR 로 고른다.
+    - docker (기본): DockerExecutor
+    - fake         : fakelab.FakeExecutor (랩 없이 녹화/합성 출력으로 응답, NETAUTO_FAKE로 지연/오류 설정)
+    """
+    global _executor
+    if _executor is None:
+        kind = os.getenv("NETAUTO_EXECUTOR", "docker")
+        if kind == "fake":
+            import fakelab
+            _executor = fakelab.FakeExecutor.from_env()
+        elif kind == "docker":
+            _executor = DockerExecutor()
+        else:
+            raise ValueError(f"unknown NETAUTO_EXECUTOR: {kind!r} (docker | fake)")
+    return _executor
+
+
+def set_executor(executor):
+    """실행 백엔드 교체 (None이면 다음 get_executor()에서 환경변수로 다시 고름). 이전 백엔드 반환."""
+    global _executor
+    prev, _executor = _executor, executor
+    return prev
+
+
+def run_batch(container: str, commands: list[str], timeout: float | None = None) -> BatchResult:
+    """현재 실행 백엔드로 commands를 배치 1회 실행한다 (계약은 DockerExecutor.run_batch)."""
+    return get_executor().run_batch(container, commands, timeout)
+
+
+# 세션 출력 경계 마커: 'echo __NETAUTO_<배치 번호>_<명령 번호>__'
+_MARK = "__NETAUTO_{}_{}__"
+_EOF = object()
+
+
+def session_argv(container: str) -> list[str]:
+    """상주 세션용 argv: stdin을 열어 둔 채 vtysh 하나를 띄운다."""
+    return ["docker", "exec", "-i", container, "vtysh"]
+
+
+class VtyshSession:
+    """
+    장비 하나에 붙어 있는 장수(long-lived) vtysh 세션.
+    - run()은 run_batch()와 같은 BatchResult를 돌려준다 (collect_routes.collect_device에 그대로 꽂힘)
+    - 제한 시간을 넘기거나 세션이 죽으면 프로세스를 정리하고, 다음 run()에서 새로 띄운다
+    - 한 세션은 한 번에 배치 하나만 실행한다(내부 lock)
+    """
+
+    def __init__(self, container: str, argv: list[str] | None = None):
+        self.container = container
+        self.argv = argv or session_argv(container)
+        self.proc: subprocess.Popen | None = None
+        self.starts = 0                    # 프로세스를 띄운 횟수 (재사용 확인/지표용)
+        self._lines: queue.Queue = queue.Queue()
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def _start(self):
+        self.proc = subprocess.Popen(
+            self.argv, text=True, bufsize=1,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        )
+        self.starts += 1
+        self._lines = queue.Queue()
+        threading.Thread(target=self._pump, args=(self.proc, self._lines), daemon=True).start()
+
+    @staticmethod
+    def _pump(proc: subprocess.Popen, lines: queue.Queue):
+        for line in proc.stdout:
+            lines.put(line)
+        lines.put(_EOF)
+
+    def close(self):
+        proc, self.proc = self.proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+    def run(self, commands: list[str], timeout: float | None = None) -> BatchResult:
+        """
+        commands를 열린 세션에서 실행한다 (run_batch와 같은 계약).
+        - timeout 초과 시 세션을 닫고 subprocess.TimeoutExpired 발생
+        - 도중에 세션이 끝나면 받은 만큼 돌려주고 returncode에 종료코드를 남긴다
+        """
+        with self._lock:
+            if not self.alive:
+                self.close()
+                self._start()
+            batch = next(self._seq)
+            marks = [_MARK.format(batch, i) for i in range(len(commands) + 1)]
+            script = "".join(f"echo {marks[i]}\n{cmd}\n" for i, cmd in enumerate(commands))
+            try:
+                self.proc.stdin.write(script + f"echo {marks[-1]}\n")
+                self.proc.stdin.flush()
+            except OSError:
+                pass                        # 이미 죽은 세션: 아래에서 EOF로 처리
+            deadline = None if timeout is None else time.monotonic() + timeout
+            raw: list[str] = []
+            outputs = {cmd: "" for cmd in commands}
+            current, buf = None, []
+            pending = iter(marks)
+            want = next(pending)
+            while True:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                try:
+                    if remaining is not None and remaining <= 0:
+                        raise queue.Empty
+                    line = self._lines.get(timeout=remaining)
+                except queue.Empty:
+                    self.close()
+                    raise subprocess.TimeoutExpired(self.argv, timeout) from None
+                if line is _EOF:
+                    if current is not None:
+                        outputs[current] = _strip_echo(buf, current)
+                    rc = self.proc.wait()
+                    self.close()
+                    return BatchResult(self.container, list(commands), rc or 1, "".join(raw), "", outputs)
+                raw.append(line)
+                if line.strip() != want:
+                    if current is not None:
+                        buf.append(line)
+                    continue
+                if current is not None:
+                    outputs[current] = _strip_echo(buf, current)
+                idx = marks.index(want)
+                if idx == len(commands):
+                    return BatchResult(self.container, list(commands), 0, "".join(raw), "", outputs)
+                current, buf = commands[idx], []
+                want = next(pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _strip_echo(lines: list[str], cmd: str) -> str:
+    """세션 출력에서 프롬프트/입력 에코 줄('r1# show ...', 'r1# echo __...')을 뺀다."""
+    return "".join(
+        ln for ln in lines
+        if not (_is_echo(ln, cmd) or _PROMPT.match(ln.rstrip("\r\n") + " ")
+                or (ln.rstrip().endswith("__") and "echo __NETAUTO_" in ln))
+    )
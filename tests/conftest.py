@@ -1,8 +1,32 @@
-import os, time, subprocess, pathlib, pytest
+import os, sys, copy, json, time, subprocess, pathlib, urllib.request, pytest
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 DEFAULT_PREFIX = "clab-netauto"
 PREFIX = os.getenv("NETAUTO_PREFIX", DEFAULT_PREFIX)
+# 랩 없이 도는 테스트들이 쓰는 기록된 수집 결과 (r1, r2)
+RECORDED_ROUTES = ROOT / "python" / "out" / "routes.json"
+
+sys.path.insert(0, str(ROOT / "python"))
+import vtysh
+import collect_routes
+import route_index as route_index_mod
+import inventory
+import netauto
+import tracing
+
+# 상주 수집기(python/collectd.py) 주소. 있으면 스냅샷을 새로 수집하지 않고 수집기 메모리에서 읽는다.
+COLLECTOR = os.getenv("NETAUTO_COLLECTOR")
+
+# 장비 목록은 inventory.py (inventory.ini + 토폴로지)에서: 노드 이름(r1 ...) 기준
+INVENTORY = inventory.load()
+NODES = tuple(INVENTORY.nodes())
+ROUTERS = tuple(INVENTORY.nodes(inventory.ROUTERS))
+
+# 라우터 테스트들이 보는 show 명령 전체. 라우터당 docker exec 1회(배치)로 수집한다.
+ROUTER_SHOW_COMMANDS = [
+    "show version",
+    "show ip ospf neighbor",
+]
 
 def run(cmd: str, timeout: int = 25):
     return subprocess.run(cmd, shell=True, text=True, capture_output=True, timeout=timeout)
@@ -10,23 +34,123 @@ def run(cmd: str, timeout: int = 25):
 def docker_exec(container: str, inner: str, timeout: int = 25):
     return run(f"docker exec {container} sh -lc \"{inner}\"", timeout=timeout)
 
-def retry(fn, tries=5, delay=2):
-    last = None
-    for _ in range(tries):
-        last = fn()
-        if last.returncode == 0:
-            return last
-        time.sleep(delay)
-    return last
+def vtysh_batch(container: str, commands: list[str], timeout: int = 25):
+    return vtysh.run_batch(container, commands, timeout=timeout)
+
+def retry(fn, ok=lambda r: r.returncode == 0, timeout: float = 10.0,
+          initial: float = 0.1, factor: float = 2.0, max_delay: float = 2.0):
+    """
+    적응형 재시도: 처음엔 빠르게(0.1s) 다시 보고, 실패할수록 간격을 2배씩(최대 max_delay) 늘린다.
+    - 전체 대기 시간이 timeout을 넘기 전까지 ok(결과)가 참이 되면 바로 반환
+    - 끝내 실패하면 마지막 결과를 그대로 반환 (assert 메시지에 출력이 남도록)
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial
+    with tracing.span("retry", cat="test", fn=getattr(fn, "__name__", "?")) as sp:
+        while True:
+            last = fn()
+            remaining = deadline - time.monotonic()
+            if ok(last) or remaining <= 0:
+                return last
+            sp.add("retries")
+            time.sleep(min(delay, remaining))
+            delay = min(delay * factor, max_delay)
+
+class RouterState:
+    """
+    라우터 상태 세션 캐시. 라우터마다 처음 필요할 때 한 번만 수집하고 테스트들이 공유한다.
+    - show(r)  : ROUTER_SHOW_COMMANDS 배치 결과 (vtysh.BatchResult)
+    - node(r)  : collect_routes 구조화 모드 노드 payload (NETAUTO_COLLECTOR 가 있으면 수집기에서 읽음)
+    - index(r) : node(r)로 만든 LPM 경로 인덱스
+    - refresh(r): 캐시를 버리고 다음 조회 때 다시 수집 (r 생략 시 전체)
+    """
+
+    def __init__(self, containers: dict):
+        self.containers = containers
+        self._show, self._node, self._index = {}, {}, {}
+
+    def refresh(self, r: str | None = None):
+        for cache in (self._show, self._node, self._index):
+            if r is None:
+                cache.clear()
+            else:
+                cache.pop(r, None)
+
+    def show(self, r: str, refresh: bool = False):
+        if refresh or r not in self._show:
+            self._show[r] = retry(lambda: vtysh_batch(self.containers[r], ROUTER_SHOW_COMMANDS))
+        return self._show[r]
+
+    def _collect(self, r: str) -> dict:
+        c = self.containers[r]
+        if COLLECTOR:
+            with urllib.request.urlopen(f"{COLLECTOR.rstrip('/')}/snapshot/{c}", timeout=30) as f:
+                return json.load(f)
+        return collect_routes.collect_device(c, structured=True)
+
+    def node(self, r: str, refresh: bool = False) -> dict:
+        if refresh or r not in self._node:
+            self._node[r] = retry(lambda: self._collect(r), ok=lambda n: not n.get("error"))
+            self._index.pop(r, None)
+        return self._node[r]
+
+    def index(self, r: str):
+        if r not in self._index:
+            self._index[r] = route_index_mod.build_index(self.node(r))
+        return self._index[r]
+
+def pytest_addoption(parser):
+    parser.addoption("--shard", default=os.getenv("NETAUTO_SHARD"), type=inventory.shard_arg,
+                     help="i/N: 테스트 nodeid 해시 기준 N 조각 중 i번째만 실행 (여러 머신 분할)")
+
+def pytest_generate_tests(metafunc):
+    # 'router' 인자를 받는 테스트는 인벤토리 라우터마다 하나씩 -> xdist가 장비 단위로 나눠 돌린다
+    if "router" in metafunc.fixturenames:
+        metafunc.parametrize("router", ROUTERS)
+
+def pytest_collection_modifyitems(config, items):
+    spec = config.getoption("--shard")
+    if not spec:
+        return
+    keep = set(inventory.shard([it.nodeid for it in items], spec))
+    deselected = [it for it in items if it.nodeid not in keep]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [it for it in items if it.nodeid in keep]
 
 @pytest.fixture(scope="session")
 def containers():
-    return {
-        "r1": f"{PREFIX}-r1",
-        "r2": f"{PREFIX}-r2",
-        "h1": f"{PREFIX}-h1",
-        "h2": f"{PREFIX}-h2",
-    }
+    """노드 이름 -> 컨테이너 이름 (NETAUTO_PREFIX 로 접두사 변경 가능)"""
+    return {node: f"{PREFIX}-{node}" for node in NODES}
+
+@pytest.fixture(scope="session")
+def router_state(containers):
+    """세션 전체가 공유하는 라우터 상태 캐시 (RouterState)."""
+    return RouterState(containers)
+
+@pytest.fixture(scope="session")
+def router_show(router_state):
+    """라우터별 show 배치 결과. router_show(r, refresh=True) 면 다시 수집."""
+    return router_state.show
+
+@pytest.fixture(scope="session")
+def snapshot(router_state):
+    """라우터 상태 스냅샷 {r1: payload, r2: payload} (router_state 캐시 공유)."""
+    return {r: router_state.node(r) for r in ROUTERS}
+
+@pytest.fixture(scope="session")
+def route_index(router_state):
+    """라우터별 LPM 경로 인덱스 {r1: RouteIndex, ...} (router_state 캐시 공유)."""
+    return {r: router_state.index(r) for r in ROUTERS}
+
+@pytest.fixture(scope="session")
+def _recorded_routes():
+    return json.loads(RECORDED_ROUTES.read_text(encoding="utf-8"))
+
+@pytest.fixture
+def recorded_snapshot(_recorded_routes):
+    """기록된 스냅샷(python/out/routes.json)의 사본. 테스트마다 새 사본이라 고쳐 써도 된다 (랩 불필요)."""
+    return copy.deepcopy(_recorded_routes)
 
 @pytest.fixture(scope="session")
 def artifacts_dir():
@@ -34,10 +158,31 @@ def artifacts_dir():
     d.mkdir(parents=True, exist_ok=True)
     return d
 
-def pytest_runtest_makereport(item, call):
-    if call.when == "call" and call.excinfo is not None:
-        try:
-            subprocess.run("python3 python/collect_routes.py", shell=True, cwd=ROOT)
-            subprocess.run("python3 python/report.py", shell=True, cwd=ROOT)
-        except Exception:
-            pass
+# 실패한 테스트 nodeid. 실패 시점 상태 수집/리포트는 세션 끝에 한 번만 돌린다.
+_FAILED: list[str] = []
+
+def pytest_runtest_logreport(report):
+    if report.when == "call" and report.failed:
+        _FAILED.append(report.nodeid)
+
+# 세션 트레이서 (NETAUTO_TRACE 가 꺼져 있으면 None)
+_TRACER = None
+
+def pytest_sessionstart(session):
+    # NETAUTO_TRACE 가 있으면 재시도 횟수/대기 시간을 trace-pytest[-<워커>].json 에 남긴다
+    global _TRACER
+    worker = getattr(session.config, "workerinput", {}).get("workerid")
+    _TRACER = tracing.start(f"pytest-{worker}" if worker else "pytest")
+
+def pytest_sessionfinish(session, exitstatus):
+    if _TRACER:
+        tracing.finish()
+    if not _FAILED or hasattr(session.config, "workerinput"):   # xdist 워커는 컨트롤러에 맡김
+        return
+    # 인터프리터를 새로 띄우지 않고 같은 프로세스에서 수집/리포트 실행
+    try:
+        if not COLLECTOR:   # 상주 수집기가 있으면 report.py가 그 스냅샷을 읽는다
+            netauto.run("collect")
+        netauto.run("report")
+    except Exception:
+        pass
@@ -1,6 +1,7 @@
 import re
 import pytest
 from conftest import docker_exec, retry
+import validate
 
 @pytest.mark.smoke
 def test_vtysh_available(containers):
@@ -39,8 +40,8 @@ def test_r2_has_ospf_route_to_h1(containers):
     assert "O>*" in out, f"OSPF route to 10.0.1.0/24 missing on R2:\n{out}"
     assert "via 10.0.12.1" in out, f"Next-hop should be 10.0.12.1 on R2:\n{out}"
 
-def test_no_drift_against_template(containers):
+def test_no_drift_against_template(containers, capsys):
     """Day3 드리프트 검증을 테스트에 편입 (의도==실제면 통과)"""
-    from subprocess import run
-    cp = run("python3 python/validate.py", shell=True, text=True, capture_output=True)
-    assert cp.returncode == 0, f"Drift detected!\n{cp.stdout}\n{cp.stderr}"
+    rc = validate.main([])
+    out = capsys.readouterr()
+    assert rc == 0, f"Drift detected!\n{out.out}\n{out.err}"
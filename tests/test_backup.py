@@ -0,0 +1,106 @@
+import hashlib
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import backup
+import configgen
+import fakelab
+import validate
+import vtysh
+
+HOSTS = ["clab-synth-r1", "clab-synth-r2", "clab-synth-r3"]
+
+
+def test_running_config_is_deduplicated_and_only_changes_are_reported(tmp_path):
+    lab = fakelab.FakeLab.synthetic(3, routes=5)
+    lab.nodes["clab-synth-r3"]["config"] = lab.nodes["clab-synth-r2"]["config"]
+    run = fakelab.FakeExecutor(lab).run_batch
+    store = backup.Store(tmp_path / ".store")
+
+    first = backup.backup_all(HOSTS, store, tmp_path, workers=3, run=run)
+    assert [r["status"] for r in first] == ["new"] * 3
+    assert len(list((tmp_path / ".store" / "objects").rglob("*"))) == 2 + 2   # 본문 2개 (디렉토리 2개 포함)
+    text = (tmp_path / "clab-synth-r1.conf").read_text(encoding="utf-8")
+    assert text.startswith("frr version 9.1\nhostname ") and text.endswith("line vty\n\n")
+    assert "Building configuration" not in text and not text.rstrip().endswith("end")
+    assert store.get(first[0]["sha"]) == text
+
+    again = backup.backup_all(HOSTS, store, tmp_path, workers=3, run=run)
+    assert backup.changed_hosts(again) == [] and {r["status"] for r in again} == {"unchanged"}
+
+    lab.nodes["clab-synth-r2"]["config"] += "ip forwarding\n"
+    third = backup.backup_all(HOSTS, store, tmp_path, workers=3, run=run)
+    assert backup.changed_hosts(third) == ["clab-synth-r2"]
+    assert [sha for _, sha in store.log("clab-synth-r2")] == [first[1]["sha"], third[1]["sha"]]
+    assert len(store.log("clab-synth-r1")) == 1
+
+
+def test_backup_cli_writes_changed_list_and_keeps_going_on_errors(tmp_path, capsys):
+    ex = fakelab.FakeExecutor(fakelab.FakeLab.synthetic(2, routes=5),
+                              fakelab.Profile(down=frozenset({"clab-synth-r2"})))
+    changed = tmp_path / "changed.txt"
+    args = ["clab-synth-r1", "clab-synth-r2", "--dir", str(tmp_path), "--changed-out", str(changed)]
+    prev = vtysh.set_executor(ex)
+    try:
+        assert backup.main(args) == 0
+        assert backup.read_changed(changed) == {"clab-synth-r1"}
+        assert backup.main(args + ["--no-partial"]) == 1
+        assert backup.read_changed(changed) == set()
+    finally:
+        vtysh.set_executor(prev)
+    assert "clab-synth-r2" in capsys.readouterr().err
+    assert backup.read_changed(tmp_path / "missing.txt") is None
+    assert backup.clean_running_config("Building configuration...\n\nCurrent configuration:\n!\nhostname r1\n!\nend\n") \
+        == "hostname r1\n"
+
+
+def test_validate_changed_only_skips_unchanged_backups(tmp_path, monkeypatch):
+    routers = ["clab-netauto-r1", "clab-netauto-r2"]
+    for h in routers:
+        shutil.copy(configgen.ROOT / "backups" / f"{h}.conf", tmp_path / f"{h}.conf")
+    monkeypatch.setattr(validate, "backups_dir", tmp_path)
+    monkeypatch.setattr(validate, "cache_path", tmp_path / ".validate_cache.json")
+    hashed = []
+    file_hash = configgen.file_hash
+    monkeypatch.setattr(configgen, "file_hash", lambda p: hashed.append(p.stem) or file_hash(p))
+
+    first, hits = validate.run_checks(routers, jobs=1, changed=set())
+    assert hits == 0 and sorted(hashed) == routers          # 캐시가 없으면 전부 검증
+    assert {r["status"] for r in first} == {"ok"}
+
+    hashed.clear()
+    again, hits = validate.run_checks(routers, jobs=1, changed=set())
+    assert hits == 2 and hashed == [] and again == first     # 목록에 없고 stat 이 같으면 백업을 읽지 않음
+
+    results, hits = validate.run_checks(routers, jobs=1, changed={"clab-netauto-r2"})
+    assert hits == 2 and hashed == ["clab-netauto-r2"]
+
+    # 목록에 없어도 (Ansible 백업 / 이전 backup.py 실행 등) 파일이 바뀌었으면 다시 검증
+    hashed.clear()
+    (tmp_path / "clab-netauto-r2.conf").write_text("hostname r2\n", encoding="utf-8")
+    results, hits = validate.run_checks(routers, jobs=1, changed=set())
+    assert hits == 1 and hashed == ["clab-netauto-r2"]
+    assert [r["status"] for r in results] == ["ok", "drift"]
+
+
+def test_store_put_is_safe_under_concurrent_identical_writes(tmp_path):
+    store = backup.Store(tmp_path / ".store")
+    texts = ["router ospf\n network 10.0.1.0/24 area 0\n"] * 480
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        shas = set(pool.map(store.put, texts))
+    assert len(shas) == 1 and store.get(shas.pop()) == texts[0]
+    assert [p.name for p in (tmp_path / ".store" / "objects").rglob("*") if p.is_file()] == \
+        [hashlib.sha256(texts[0].encode()).hexdigest()]               # 임시 파일이 남지 않음
+
+
+def test_offline_backup_of_recorded_lab_is_a_fixed_point(tmp_path):
+    for h in ("clab-netauto-r1", "clab-netauto-r2"):
+        shutil.copy(configgen.ROOT / "backups" / f"{h}.conf", tmp_path / f"{h}.conf")
+    originals = {p.name: p.read_bytes() for p in tmp_path.glob("*.conf")}
+    store = backup.Store(tmp_path / ".store")
+    hosts = ["clab-netauto-r1", "clab-netauto-r2"]
+    for n in range(3):      # 실행마다 새 프로세스처럼 랩을 백업 디렉토리에서 다시 만든다
+        lab = fakelab.FakeLab.recorded(fakelab.DEFAULT_SNAPSHOT, configs_dir=tmp_path)
+        results = backup.backup_all(hosts, store, tmp_path, run=fakelab.FakeExecutor(lab).run_batch)
+        assert [r["status"] for r in results] == (["new"] * 2 if n == 0 else ["unchanged"] * 2)
+    assert {p.name: p.read_bytes() for p in tmp_path.glob("*.conf")} == originals
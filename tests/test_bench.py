@@ -0,0 +1,41 @@
+import bench
+import configgen
+import frr_parse
+import report
+import synth
+
+def test_synthetic_route_table_parses_back():
+    text = synth.route_table(500, ecmp=0.2)
+    recs = frr_parse.parse_routes(text)
+    assert len({(r.network, r.prefixlen) for r in recs}) == 500          # K default + 499
+    assert any(r.code == "O" and (r.nexthop or "").startswith("10.0.13.") for r in recs)   # ECMP 줄
+    assert synth.route_table(500, ecmp=0.2) == text                     # 같은 seed = 같은 출력
+
+def test_synthetic_neighbors_snapshot_and_junit(tmp_path):
+    total, full = report.parse_ospf_neighbors(synth.neighbor_table(200, full=0.5))
+    assert total == 200 and 0 < full < 200
+    nodes, *_ = report.aggregate_metrics(synth.snapshot(3, routes=50, neighbors=2))
+    assert set(nodes) == {"clab-synth-r1", "clab-synth-r2", "clab-synth-r3"}
+    p = tmp_path / "junit.xml"
+    p.write_text(synth.junit_xml(1000, suites=4), encoding="utf-8")
+    j = report.parse_junit(p)
+    assert j["tests"] == 1000 and j["failures"] > 0 and j["passed"] < 1000
+
+def test_synthetic_config_matches_rendered_template():
+    import config_tree
+    tpl = configgen.TEMPLATE.read_text(encoding="utf-8")
+    rendered = configgen.render(tpl, synth.host_vars(7))
+    ospf = config_tree.parse_sections("ospf")
+    assert not config_tree.diff(config_tree.select(config_tree.parse(rendered), ospf),
+                                config_tree.select(config_tree.parse(synth.router_config(7)), ospf))
+
+def test_measure_and_compare_against_baseline():
+    sizes = dict(bench.SCALES["small"], routes=200)
+    r = bench.measure(bench.STAGES["parse_routes"], sizes, repeat=1)
+    assert r["items"] > 200 and r["throughput"] > 0 and r["peak_kib"] > 0
+    results = {"parse_routes": r}
+    assert bench.compare(results, {"parse_routes": {"throughput": r["throughput"], "peak_kib": r["peak_kib"]}}) == []
+    slow = bench.compare(results, {"parse_routes": {"throughput": r["throughput"] * 2, "peak_kib": r["peak_kib"] / 2}})
+    assert len(slow) == 2 and slow[0].startswith("parse_routes: throughput")
+    late = bench.compare(results, {"parse_routes": {"max_seconds": r["seconds"] / 2}})
+    assert len(late) == 1 and "> target" in late[0]
@@ -0,0 +1,90 @@
+import json, subprocess, sys, threading, time
+import pytest
+from conftest import ROOT, vtysh
+import collectd
+import snapshot
+
+# 비대화형 vtysh 흉내: 줄마다 프롬프트+입력을 에코하고, echo/show 명령에 답한다
+FAKE_VTYSH = r'''
+import json, sys, time
+data = json.load(open(sys.argv[1]))[sys.argv[2]]
+answers = {"show ip route": data["routes"], "show ip ospf neighbor": data["ospf"]}
+for line in sys.stdin:
+    cmd = line.strip()
+    print("r1# " + cmd)
+    if cmd.startswith("echo "):
+        print(cmd[5:])
+    elif cmd == "show hang":
+        time.sleep(30)
+    else:
+        sys.stdout.write(answers.get(cmd, "% Unknown command: " + cmd + "\n"))
+    sys.stdout.flush()
+'''
+
+ROUTES = ROOT / "python" / "out" / "routes.json"
+
+@pytest.fixture
+def fake_session(tmp_path):
+    script = tmp_path / "fake_vtysh.py"
+    script.write_text(FAKE_VTYSH, encoding="utf-8")
+    sessions = []
+    def make(container):
+        s = vtysh.VtyshSession(container, argv=[sys.executable, str(script), str(ROUTES), container])
+        sessions.append(s)
+        return s
+    yield make
+    for s in sessions:
+        s.close()
+
+def test_session_is_reused_and_output_is_demuxed(fake_session):
+    expected = json.loads(ROUTES.read_text(encoding="utf-8"))["clab-netauto-r1"]
+    s = fake_session("clab-netauto-r1")
+    cmds = ["show ip route", "show ip ospf neighbor"]
+    for _ in range(2):
+        res = s.run(cmds, timeout=10)
+        assert res.returncode == 0
+        assert res.outputs == {"show ip route": expected["routes"], "show ip ospf neighbor": expected["ospf"]}
+    assert s.starts == 1
+
+def test_session_timeout_restarts_on_next_run(fake_session):
+    s = fake_session("clab-netauto-r1")
+    with pytest.raises(subprocess.TimeoutExpired):
+        s.run(["show hang"], timeout=0.5)
+    assert not s.alive
+    assert s.run(["show ip ospf neighbor"], timeout=10).outputs["show ip ospf neighbor"]
+    assert s.starts == 2
+
+def test_next_delay_backs_off_and_caps():
+    assert collectd.next_delay(10, 0, jitter=0) == 10
+    assert collectd.next_delay(10, 2, jitter=0) == 40
+    assert collectd.next_delay(10, 9, jitter=0, max_backoff=300) == 300
+    assert collectd.next_delay(10, 0, jitter=0.1, rand=lambda: 0.0) == pytest.approx(9)
+    assert collectd.next_delay(10, 0, jitter=0.1, rand=lambda: 1.0) == pytest.approx(11)
+
+def test_scheduler_polls_and_serves_latest_snapshot(fake_session):
+    def make(container):
+        if container == "broken":
+            return vtysh.VtyshSession(container, argv=[sys.executable, "-c", "pass"])
+        return fake_session(container)
+    col = collectd.Collector(["clab-netauto-r1", "clab-netauto-r2", "broken"], interval=0.05,
+                             jitter=0.2, max_backoff=0.4, session_factory=make, cmd_timeout=5)
+    server = collectd.serve(col, "127.0.0.1:0")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    worker = threading.Thread(target=col.run, daemon=True)
+    worker.start()
+    try:
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and col.devices["clab-netauto-r1"].polls < 3:
+            time.sleep(0.05)
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        data = snapshot.load(url + "/snapshot.ndjson")
+    finally:
+        col.stop()
+        worker.join(10)
+        server.shutdown()
+        server.server_close()
+    r1 = col.devices["clab-netauto-r1"]
+    assert r1.polls >= 3 and r1.failures == 0 and r1.session.starts == 1
+    assert col.devices["broken"].failures >= 1
+    assert data["clab-netauto-r1"]["routes"] == json.loads(ROUTES.read_text(encoding="utf-8"))["clab-netauto-r1"]["routes"]
+    assert data["broken"]["error"]
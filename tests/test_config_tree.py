@@ -0,0 +1,44 @@
+from conftest import ROOT
+import config_tree
+
+RUNNING = """frr version 9.1
+hostname r1
+!
+interface eth1
+ ip ospf network point-to-point
+!
+router ospf
+ network 10.0.12.0/30 area 0
+ network 10.0.1.0/24   area 0
+exit
+!
+router ospf vrf blue
+ network 192.168.0.0/24 area 1
+exit
+!
+line vty
+"""
+
+def test_parse_groups_every_ospf_block_order_insensitive():
+    tree = config_tree.parse(RUNNING)
+    ospf = config_tree.select(tree, "ospf")
+    assert set(ospf.children) == {"router ospf", "router ospf vrf blue"}
+    reordered = RUNNING.replace(" network 10.0.12.0/30 area 0\n network 10.0.1.0/24   area 0",
+                                " network 10.0.1.0/24 area 0\n network 10.0.12.0/30 area 0")
+    assert config_tree.diff(tree, config_tree.parse(reordered)) == []
+
+def test_diff_reports_paths_per_section():
+    old = config_tree.parse(RUNNING)
+    new = config_tree.parse(RUNNING.replace("10.0.1.0/24", "10.0.9.0/24").replace(" ip ospf network point-to-point\n", ""))
+    changes = config_tree.diff(config_tree.select(old, "ospf,interface"), config_tree.select(new, "ospf,interface"))
+    assert sorted(changes) == [
+        ("+", ("router ospf", "network 10.0.9.0/24 area 0")),
+        ("-", ("interface eth1", "ip ospf network point-to-point")),
+        ("-", ("router ospf", "network 10.0.1.0/24 area 0")),
+    ]
+
+def test_backup_matches_itself_across_all_sections():
+    text = (ROOT / "backups" / "clab-netauto-r1.conf").read_text(encoding="utf-8")
+    tree = config_tree.parse(text)
+    assert config_tree.diff(tree, config_tree.parse(config_tree.dump(tree))) == []
+    assert config_tree.parse_sections("") == (config_tree.ALL,)
@@ -0,0 +1,54 @@
+import config_tree
+import configgen
+import synth
+
+ROUTERS = ["clab-netauto-r1", "clab-netauto-r2"]
+
+
+def test_generated_configs_match_backups_and_are_written_once(tmp_path):
+    stats = configgen.generate(ROUTERS, tmp_path)
+    assert sorted(stats["written"]) == ROUTERS and not stats["errors"]
+    ospf = config_tree.parse_sections("ospf")
+    for h in ROUTERS:
+        text = (tmp_path / f"{h}.conf").read_text(encoding="utf-8")
+        backup = (configgen.ROOT / "backups" / f"{h}.conf").read_text(encoding="utf-8")
+        assert not config_tree.diff(config_tree.select(config_tree.parse(backup), ospf),
+                                    config_tree.select(config_tree.parse(text), ospf))
+
+    mtime = (tmp_path / "clab-netauto-r1.conf").stat().st_mtime_ns
+    again = configgen.generate(ROUTERS, tmp_path)
+    assert again["written"] == [] and sorted(again["unchanged"]) == ROUTERS
+    assert (tmp_path / "clab-netauto-r1.conf").stat().st_mtime_ns == mtime
+
+    (tmp_path / "clab-netauto-r2.conf").write_text("hand edited\n", encoding="utf-8")
+    assert configgen.generate(ROUTERS, tmp_path)["written"] == ["clab-netauto-r2"]
+
+
+def test_context_change_rerenders_only_that_host(tmp_path):
+    hosts = [f"clab-synth-r{i}" for i in range(100)]
+    ctxs = {h: synth.host_vars(i) for i, h in enumerate(hosts)}
+    assert len(configgen.generate(hosts, tmp_path, jobs=2, ctxs=ctxs)["written"]) == 100
+    ctxs["clab-synth-r7"]["ospf_area"] = 1
+    stats = configgen.generate(hosts, tmp_path, ctxs=ctxs)
+    assert stats["written"] == ["clab-synth-r7"] and len(stats["unchanged"]) == 99
+    assert " area 1" in (tmp_path / "clab-synth-r7.conf").read_text(encoding="utf-8")
+
+
+def test_host_context_derives_networks_and_memoizes_yaml(tmp_path):
+    ctx = configgen.host_context("clab-netauto-r1")
+    assert ctx["inventory_hostname"] == "clab-netauto-r1" and ctx["ospf_networks"]
+    assert configgen.derive({"lan_net": "10.0.9.0/24", "transit_net": "10.0.99.0/30"})["ospf_networks"] == \
+        ["10.0.9.0/24", "10.0.99.0/30"]
+
+    p = tmp_path / "vars.yml"
+    p.write_text("a: 1\n", encoding="utf-8")
+    first = configgen.load_yaml(p)
+    assert configgen.load_yaml(p) is first
+    p.write_text("a: 22\n", encoding="utf-8")          # 크기가 바뀌면 다시 읽음
+    assert configgen.load_yaml(p) == {"a": 22}
+    assert configgen.load_yaml(tmp_path / "missing.yml") == {}
+
+
+def test_render_error_is_reported_not_raised(tmp_path):
+    stats = configgen.generate(["clab-synth-x"], tmp_path, ctxs={"clab-synth-x": {"inventory_hostname": "x"}})
+    assert "clab-synth-x" in stats["errors"] and not (tmp_path / "clab-synth-x.conf").exists()
@@ -2,6 +2,8 @@ import os
 import re
 import pytest
 from conftest import docker_exec, retry
+import validate
+import path_sim
 
 CI_LIGHT = os.getenv("CI_LIGHT") == "1"
 
@@ -10,10 +12,9 @@ skip_if_light = pytest.mark.skipif(CI_LIGHT, reason="CI light mode: no lab/docke
 
 @pytest.mark.smoke
 @skip_if_light
-def test_vtysh_available(containers):
-    for r in ("r1", "r2"):
-        cp = docker_exec(containers[r], "vtysh -c 'show version' || true")
-        assert "FRRouting" in cp.stdout, f"vtysh not available on {containers[r]}:\n{cp.stdout}\n{cp.stderr}"
+def test_vtysh_available(containers, router_show, router):
+    cp = router_show(router)
+    assert "FRRouting" in cp.outputs["show version"], f"vtysh not available on {containers[router]}:\n{cp.stdout}\n{cp.stderr}"
 
 @pytest.mark.smoke
 @skip_if_light
@@ -23,33 +24,42 @@ def test_ping_h1_to_h2(containers):
 
 @pytest.mark.routing
 @skip_if_light
-def test_ospf_neighbors_full(containers):
-    for r in ("r1", "r2"):
-        cp = retry(lambda: docker_exec(containers[r], "vtysh -c 'show ip ospf neighbor'"))
-        full_count = len(re.findall(r"\bFull\b", cp.stdout))
-        assert full_count >= 1, f"OSPF neighbor not Full on {containers[r]}:\n{cp.stdout}"
+def test_ospf_neighbors_full(containers, router_state, router):
+    def full_count(cp):
+        return len(re.findall(r"\bFull\b", cp.outputs["show ip ospf neighbor"]))
+    cp = router_state.show(router)
+    if not full_count(cp):      # 아직 수렴 중일 수 있음: 캐시를 갱신하며 잠깐 기다림
+        cp = retry(lambda: router_state.show(router, refresh=True), ok=full_count)
+    assert full_count(cp) >= 1, f"OSPF neighbor not Full on {containers[router]}:\n{cp.outputs['show ip ospf neighbor']}"
 
 @pytest.mark.routing
 @skip_if_light
-def test_r1_has_ospf_route_to_h2(containers):
-    """R1 라우팅 테이블에 10.0.2.0/24 OSPF 경로 및 기대 next-hop 검사"""
-    cp = retry(lambda: docker_exec(containers["r1"], "vtysh -c 'show ip route 10.0.2.0/24'"))
-    out = cp.stdout
-    # FRR 버전에 따라 요약표시는 O>* 이지만, prefix 조회는 아래 형태
-    assert 'Known via "ospf"' in out, f"Not learned via OSPF on R1:\n{out}"
-    assert re.search(r"^\s*\*\s*10\.0\.12\.2\b", out, re.M), f"Next-hop should be 10.0.12.2 on R1:\n{out}"
+def test_r1_has_ospf_route_to_h2(route_index):
+    """R1 라우팅 테이블에 10.0.2.0/24 OSPF 경로 및 기대 next-hop 검사 (스냅샷 LPM 조회)"""
+    route = route_index["r1"].lookup("10.0.2.100")
+    assert route is not None and route.code == "O", f"Not learned via OSPF on R1: {route!r}"
+    assert route.prefix == "10.0.2.0/24", f"Unexpected best match on R1: {route!r}"
+    assert route.nexthop == "10.0.12.2", f"Next-hop should be 10.0.12.2 on R1: {route!r}"
 
 @pytest.mark.routing
 @skip_if_light
-def test_r2_has_ospf_route_to_h1(containers):
-    """R2 라우팅 테이블에 10.0.1.0/24 OSPF 경로 및 기대 next-hop 검사"""
-    cp = retry(lambda: docker_exec(containers["r2"], "vtysh -c 'show ip route 10.0.1.0/24'"))
-    out = cp.stdout
-    assert 'Known via "ospf"' in out, f"Not learned via OSPF on R2:\n{out}"
-    assert re.search(r"^\s*\*\s*10\.0\.12\.1\b", out, re.M), f"Next-hop should be 10.0.12.1 on R2:\n{out}"
-
-def test_no_drift_against_template(containers):
-    from subprocess import run
-    cp = run("python3 python/validate.py", shell=True, text=True, capture_output=True)
-    assert cp.returncode == 0, f"Drift detected!\n{cp.stdout}\n{cp.stderr}"
+def test_r2_has_ospf_route_to_h1(route_index):
+    """R2 라우팅 테이블에 10.0.1.0/24 OSPF 경로 및 기대 next-hop 검사 (스냅샷 LPM 조회)"""
+    route = route_index["r2"].lookup("10.0.1.100")
+    assert route is not None and route.code == "O", f"Not learned via OSPF on R2: {route!r}"
+    assert route.prefix == "10.0.1.0/24", f"Unexpected best match on R2: {route!r}"
+    assert route.nexthop == "10.0.12.1", f"Next-hop should be 10.0.12.1 on R2: {route!r}"
+
+@pytest.mark.routing
+@skip_if_light
+def test_forwarding_paths_all_pairs(snapshot):
+    """라이브 스냅샷 기준 전체 (노드 x 주소) 포워딩 경로가 목적지에 도달"""
+    sim = path_sim.Simulator(snapshot, path_sim.load_topology(), path_sim.load_host_vars())
+    bad = [r for r in sim.matrix().values() if not r.ok]
+    assert not bad, "\n".join(f"{r.src} -> {r.dst}: {r.status} {r.hops} {r.reason}" for r in bad)
+
+def test_no_drift_against_template(containers, capsys):
+    rc = validate.main([])
+    out = capsys.readouterr()
+    assert rc == 0, f"Drift detected!\n{out.out}\n{out.err}"
 
@@ -0,0 +1,53 @@
+import subprocess
+import pytest
+from conftest import ROOT, vtysh
+import collect_routes
+import collectd
+import fakelab
+
+@pytest.fixture
+def fake():
+    ex = fakelab.FakeExecutor(fakelab.FakeLab.recorded(ROOT / "python" / "out" / "routes.json"))
+    prev = vtysh.set_executor(ex)
+    yield ex
+    vtysh.set_executor(prev)
+
+def test_collector_runs_against_recorded_outputs(fake):
+    data = collect_routes.collect_all(["clab-netauto-r1", "clab-fake-r999"], structured=True)
+    r1 = data["clab-netauto-r1"]
+    assert r1["error"] is None and "10.0.2.0/24" in r1["routes"]
+    assert {r["prefix"] for r in r1["route_records"] if r["code"] == "O"} >= {"10.0.2.0/24"}
+    assert r1["neighbor_records"][0]["full"] is True
+    assert data["clab-fake-r999"]["routes"]               # 모르는 이름은 녹화 장비 하나에 대응
+    assert fake.calls == 2
+
+def test_profile_injects_hangs_errors_and_down_devices(fake):
+    fake.profile = fakelab.Profile.parse("hang=1")
+    with pytest.raises(subprocess.TimeoutExpired):
+        vtysh.run_batch("clab-netauto-r1", ["show version"], timeout=0.05)
+    node = collect_routes.collect_device("clab-netauto-r1", cmd_timeout=0.05, device_timeout=0.05)
+    assert node["error"].startswith("timeout after")
+    fake.profile = fakelab.Profile.parse("error=1")
+    assert collect_routes.collect_device("clab-netauto-r1")["error"].startswith("rc=1")
+    fake.profile = fakelab.Profile.parse("down=clab-netauto-r2, latency=5")
+    assert collect_routes.collect_device("clab-netauto-r2")["error"]
+    node = collect_routes.collect_device("clab-netauto-r1")
+    assert node["error"] is None and node["latency_ms"] >= 5
+    with pytest.raises(ValueError):
+        fakelab.Profile.parse("bogus=1")
+
+def test_fake_sessions_plug_into_collector_daemon(fake):
+    fake.profile = fakelab.Profile(down=frozenset({"clab-netauto-r2"}))
+    col = collectd.Collector(["clab-netauto-r1", "clab-netauto-r2"])
+    for _ in range(2):
+        col.poll_all()
+    st = col.status()["devices"]
+    assert st["clab-netauto-r1"] == {**st["clab-netauto-r1"], "polls": 2, "failures": 0, "session_starts": 1}
+    assert st["clab-netauto-r2"]["failures"] == 2 and st["clab-netauto-r2"]["session_starts"] == 2
+
+def test_stress_reports_throughput_and_failures():
+    res = fakelab.stress(200, 32, fakelab.Profile(latency=2, jitter=1, hang=0.05, error=0.05, seed=3),
+                         device_timeout=0.2)
+    assert res["devices"] == 200 and res["devices_per_s"] > 0
+    assert res["timeouts"] > 0 and res["errors"] > 0
+    assert res["latency_ms_p50"] < 200
@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+import conftest
+
+def test_retry_polls_fast_then_backs_off(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(conftest.time, "sleep", sleeps.append)
+    results = iter([1, 1, 1, 1, 0])
+    cp = conftest.retry(lambda: SimpleNamespace(returncode=next(results)))
+    assert cp.returncode == 0
+    assert sleeps == [0.1, 0.2, 0.4, 0.8]
+
+def test_retry_gives_up_at_deadline_with_last_result():
+    calls = []
+    cp = conftest.retry(lambda: calls.append(1) or SimpleNamespace(returncode=1), timeout=0.3)
+    assert cp.returncode == 1 and 2 <= len(calls) <= 4
+
+def test_router_state_collects_once_and_refreshes(monkeypatch):
+    calls = []
+    def fake_collect(container, structured=False):
+        calls.append(container)
+        return {"routes": "O>* 10.0.2.0/24 [110/20] via 10.0.12.2, eth1, weight 1, 00:51:15\n",
+                "ospf": "", "error": None}
+    monkeypatch.setattr(conftest, "COLLECTOR", None)
+    monkeypatch.setattr(conftest.collect_routes, "collect_device", fake_collect)
+    state = conftest.RouterState({"r1": "clab-netauto-r1"})
+    assert state.index("r1").lookup("10.0.2.100").nexthop == "10.0.12.2"
+    state.node("r1")
+    state.index("r1")
+    assert calls == ["clab-netauto-r1"]
+    state.refresh("r1")
+    state.index("r1")
+    assert calls == ["clab-netauto-r1"] * 2
@@ -0,0 +1,33 @@
+import copy
+import history
+
+def test_only_deltas_are_stored_and_flaps_are_queryable(tmp_path, recorded_snapshot):
+    conn = history.connect(tmp_path / "h.sqlite")
+    data = recorded_snapshot
+    _, first = history.ingest(conn, data, ts=1000)
+    assert first > 0
+    assert history.ingest(conn, data, ts=2000)[1] == 0        # 변화 없음 -> 저장 없음
+
+    flapped = copy.deepcopy(data)
+    r1 = flapped["clab-netauto-r1"]
+    r1["routes"] = "\n".join(ln for ln in r1["routes"].splitlines() if "10.0.2.0/24" not in ln)
+    assert history.ingest(conn, flapped, ts=3000)[1] == 1     # 경로 1개 닫힘
+    assert history.ingest(conn, data, ts=4000)[1] == 1        # 다시 생김
+
+    rows = history.prefix_history(conn, "10.0.2.0/24", device="clab-netauto-r1")
+    ospf = [(r["from"], r["to"]) for r in rows if r["code"] == "O"]
+    assert ospf == [(1000, 3000), (4000, None)]
+    assert history.prefix_history(conn, "10.0.2.0/24", device="clab-netauto-r1", since=3100, until=3900) == []
+    assert not [r for r in history.routes_at(conn, "clab-netauto-r1", 3500) if r["prefix"] == "10.0.2.0/24"]
+
+def test_neighbor_down_since(tmp_path, recorded_snapshot):
+    conn = history.connect(tmp_path / "h.sqlite")
+    data = recorded_snapshot
+    history.ingest(conn, data, ts=1000)
+    assert history.neighbor_down_since(conn, "clab-netauto-r1", "172.20.20.3") is None
+    down = copy.deepcopy(data)
+    down["clab-netauto-r1"]["ospf"] = ""
+    down["clab-netauto-r2"]["error"] = "timeout"              # 실패 장비는 건드리지 않음
+    history.ingest(conn, down, ts=2000)
+    assert history.neighbor_down_since(conn, "clab-netauto-r1", "172.20.20.3") == 2000
+    assert history.neighbor_down_since(conn, "clab-netauto-r2", "172.20.20.2") is None
@@ -0,0 +1,41 @@
+import pytest
+from conftest import ROOT
+import inventory
+
+def test_inventory_groups_vars_and_topology():
+    inv = inventory.load(ROOT, cache_path=None)
+    assert inv.group("routers") == ["clab-netauto-r1", "clab-netauto-r2"]
+    assert inv.nodes("routers") == {"r1": "clab-netauto-r1", "r2": "clab-netauto-r2"}
+    assert set(inv.group()) == {f"clab-netauto-{n}" for n in ("r1", "r2", "h1", "h2")}
+    r1 = inv.devices["clab-netauto-r1"]
+    assert r1.vars["ospf_area"] == 0 and r1.vars["lan_net"] == "10.0.1.0/24"   # group_vars + host_vars
+    assert r1.vars["ansible_connection"] == "docker"                           # 인라인 변수
+    assert r1.kind == "linux" and "routers" in r1.groups
+
+def test_parse_ini_children_and_vars():
+    hosts, members, children, gvars = inventory.parse_ini(
+        "top1\n[a]\nx1 k=1\n[b]\nx2\n[ab:children]\na\nb\n[ab:vars]\nasn = 65000\n")
+    assert members["ungrouped"] == ["top1"] and hosts["x1"] == {"k": 1}
+    assert inventory._expand("ab", members, children) == ["x1", "x2"]
+    assert gvars == {"ab": {"asn": 65000}}
+
+def test_load_is_cached_by_mtime(tmp_path):
+    (tmp_path / "ansible").mkdir()
+    ini = tmp_path / "ansible" / "inventory.ini"
+    ini.write_text("[routers]\nrt1\n", encoding="utf-8")
+    cache = tmp_path / "cache.json"
+    first = inventory.load(tmp_path, cache)
+    assert inventory.load(tmp_path, cache) is first and cache.exists()
+    inventory._memo.clear()
+    assert inventory.load(tmp_path, cache).group("routers") == ["rt1"]     # 디스크 캐시
+    ini.write_text("[routers]\nrt1\nrt2\n", encoding="utf-8")
+    assert inventory.load(tmp_path, cache).group("routers") == ["rt1", "rt2"]
+
+def test_shards_partition_fleet_deterministically():
+    names = [f"clab-big-r{i}" for i in range(2000)]
+    parts = [inventory.shard(names, f"{i}/8") for i in range(1, 9)]
+    assert sorted(sum(parts, [])) == sorted(names)
+    assert all(150 < len(p) < 350 for p in parts)
+    assert inventory.shard(list(reversed(names)), "3/8") == list(reversed(parts[2]))
+    with pytest.raises(ValueError):
+        inventory.parse_shard("0/4")
@@ -0,0 +1,55 @@
+import junit
+import report
+import synth
+
+SHARD = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" errors="1" failures="1" skipped="1" tests="4">
+<testcase classname="tests.test_a" name="test_ok" time="0.5"/>
+<testcase classname="tests.test_a.TestX" name="test_fail" time="2.0"><failure message="x">boom</failure></testcase>
+<testcase classname="tests.test_b" name="test_skip" time="0.0"><skipped message="lab"/></testcase>
+<testcase classname="tests.test_b" name="test_err" time="1.0"><error message="e">err</error></testcase>
+</testsuite></testsuites>
+"""
+NO_ATTRS = """<testsuite name="bare">
+<testcase classname="tests.test_c" name="test_1" time="3.0"/>
+<testcase classname="tests.test_c" name="test_2" time="0.1"><failure/></testcase>
+</testsuite>
+"""
+
+
+def test_aggregate_glob_of_shards(tmp_path):
+    (tmp_path / "junit-gw0.xml").write_text(SHARD, encoding="utf-8")
+    (tmp_path / "junit-gw1.xml").write_text(SHARD, encoding="utf-8")
+    (tmp_path / "junit-bare.xml").write_text(NO_ATTRS, encoding="utf-8")
+    agg = junit.aggregate(str(tmp_path / "junit-*.xml"), top=3)
+    assert agg["files"] == 3
+    assert (agg["tests"], agg["failures"], agg["errors"], agg["skipped"], agg["passed"]) == (10, 3, 2, 2, 3)
+    assert agg["time"] == 10.1
+    assert [(c["name"], c["outcome"]) for c in agg["slowest"]] == \
+        [("test_1", "passed"), ("test_fail", "failed"), ("test_fail", "failed")]
+    assert agg["modules"][0] == {"module": "tests.test_a", "tests": 4, "time": 5.0}
+    assert junit.aggregate(str(tmp_path / "missing*.xml"))["tests"] == 0
+
+
+def test_iter_cases_matches_synthetic_counts(tmp_path):
+    p = tmp_path / "junit.xml"
+    p.write_text(synth.junit_xml(2000, suites=5), encoding="utf-8")
+    cases = list(junit.iter_cases([p]))
+    agg = report.parse_junit(p)
+    assert len(cases) == agg["tests"] == 2000
+    assert sum(c.outcome == "failed" for c in cases) == agg["failures"]
+    assert sum(c.outcome == "skipped" for c in cases) == agg["skipped"]
+    assert max(c.time for c in cases) == agg["slowest"][0]["time"]
+
+
+def test_report_shows_slowest_tests_and_github_output(tmp_path, monkeypatch):
+    (tmp_path / "junit.xml").write_text(SHARD, encoding="utf-8")
+    agg = report.parse_junit(tmp_path / "junit.xml")
+    md = report.build_slowest_tests_md(agg)
+    assert "`tests.test_a.TestX::test_fail` | failed | 2.000" in md
+    assert report.build_slowest_tests_md({}) == ""
+
+    out = tmp_path / "gh_output"
+    monkeypatch.setenv("GITHUB_OUTPUT", str(out))
+    assert junit.main([str(tmp_path / "junit.xml"), "--github-output"]) == 0
+    assert out.read_text(encoding="utf-8").splitlines() == ["tests=4", "passed=1", "failed=2", "skipped=1"]
@@ -0,0 +1,28 @@
+import subprocess
+import sys
+
+import netauto
+import synth
+from conftest import ROOT
+
+HEAVY = ("jinja2", "yaml", "xml.etree.ElementTree", "urllib.request", "cProfile", "concurrent.futures.process")
+
+
+def test_importing_tools_does_not_load_heavy_dependencies():
+    # 새 인터프리터에서만 확인 가능 (이 테스트 프로세스는 이미 전부 불러왔다)
+    code = ("import sys, netauto, validate, collect_routes, report, configgen, backup, path_sim, inventory; "
+            f"print([m for m in {HEAVY!r} if m in sys.modules])")
+    cp = subprocess.run([sys.executable, "-c", code], cwd=ROOT / "python", text=True, capture_output=True)
+    assert cp.returncode == 0, cp.stderr
+    assert cp.stdout.strip() == "[]"
+
+
+def test_commands_run_in_process(tmp_path, capsys):
+    p = tmp_path / "junit.xml"
+    p.write_text(synth.junit_xml(20), encoding="utf-8")
+    assert netauto.main(["junit", str(p), "--top", "1"]) == 0
+    assert "20 tests" in capsys.readouterr().out
+
+    assert netauto.run("junit", ["--top", "not-a-number"]) == 2       # argparse 오류도 종료코드로
+    assert netauto.main([]) == 2 and netauto.main(["bogus"]) == 2
+    assert "validate" in capsys.readouterr().out
@@ -0,0 +1,26 @@
+import path_sim
+
+def _sim(snapshot):
+    return path_sim.Simulator(snapshot, path_sim.load_topology(), path_sim.load_host_vars())
+
+def test_h1_to_h2_path_from_snapshot(recorded_snapshot):
+    res = _sim(recorded_snapshot).trace("h1", "10.0.2.100")
+    assert res.ok and res.hops == ["h1", "r1", "r2", "h2"]
+
+def test_all_pairs_delivered(recorded_snapshot):
+    results = _sim(recorded_snapshot).matrix()
+    assert results and all(r.ok for r in results.values())
+
+def test_missing_route_falls_to_mgmt_default_and_blackholes(recorded_snapshot):
+    snap = recorded_snapshot
+    snap["clab-netauto-r1"]["routes"] = "\n".join(
+        ln for ln in snap["clab-netauto-r1"]["routes"].splitlines() if "10.0.2.0/24" not in ln)
+    res = _sim(snap).trace("h1", "10.0.2.100")
+    assert res.status == "blackhole" and res.hops == ["h1", "r1"]
+    assert "eth0" in res.reason
+
+def test_routing_loop_detected(recorded_snapshot):
+    snap = recorded_snapshot
+    snap["clab-netauto-r2"]["routes"] = "O>* 10.0.2.0/24 [110/20] via 10.0.12.1, eth1, weight 1, 00:00:10\n"
+    res = _sim(snap).trace("r1", "10.0.2.100")
+    assert res.status == "loop" and res.hops == ["r1", "r2", "r1"]
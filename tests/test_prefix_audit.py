@@ -0,0 +1,54 @@
+import pytest
+
+import frr_parse
+import prefix_audit
+import synth
+
+
+def kinds(findings):
+    return [(f.kind, f.prefix, f.hosts) for f in findings]
+
+
+def test_intended_lab_vars_are_clean(capsys):
+    assert prefix_audit.main([]) == 0
+    assert "No prefix conflicts across 2 host(s)" in capsys.readouterr().out
+
+
+def test_overlap_one_sided_area_and_coverage():
+    ctxs = {
+        "a": {"lan_net": "10.0.1.0/24", "transit_net": "10.0.12.0/30", "ospf_area": 0,
+              "ospf_networks": ["10.0.1.0/24", "10.0.12.0/30"]},
+        "b": {"lan_net": "10.0.1.128/25", "transit_net": "10.0.12.0/30", "ospf_area": 1,
+              "ospf_networks": ["10.0.0.0/16"]},                  # 집약 network 문은 LAN/transit 을 덮는다
+        "c": {"lan_net": "10.0.3.0/24", "transit_net": "10.0.99.0/30", "ospf_networks": ["10.0.3.0/24"]},
+        "d": {"lan_net": "10.0.4.0/24", "transit_net": "10.0.13.0/30", "ospf_networks": ["10.0.4.0/24"]},
+        "e": {"lan_net": "10.0.5.1/24", "transit_net": "10.0.13.0/30", "ospf_networks": ["10.0.13.0/30"]},
+        "f": {"lan_net": "10.0.4.0/24", "transit_net": "bogus"},
+    }
+    assert kinds(prefix_audit.audit(ctxs)) == [
+        ("overlap", "10.0.1.0/24 / 10.0.1.128/25", ("a", "b")),
+        ("overlap", "10.0.4.0/24", ("d", "f")),
+        ("one-sided", "10.0.13.0/30", ("d", "e")),
+        ("one-sided", "10.0.99.0/30", ("c",)),
+        ("area-mismatch", "10.0.12.0/30", ("a", "b")),
+        ("uncovered", "10.0.4.0/24", ("f",)),
+        ("uncovered", "10.0.5.0/24", ("e",)),
+        ("invalid", "bogus", ("f",)),
+    ]
+
+
+def test_large_fleet_is_clean_and_single_fault_is_found():
+    ctxs = synth.fleet_vars(4000)
+    assert prefix_audit.audit(ctxs) == []
+    ctxs["clab-synth-r3"]["transit_net"] = ctxs["clab-synth-r1"]["transit_net"]
+    ctxs["clab-synth-r3"]["ospf_networks"][1] = ctxs["clab-synth-r1"]["transit_net"]
+    assert [f.kind for f in prefix_audit.audit(ctxs)] == ["one-sided", "transit-shared"]
+
+
+def test_prefix_bounds_and_invalid_prefixes():
+    assert frr_parse.prefix_bounds("10.0.12.1/30") == (0x0A000C00, 0x0A000C03, 30)
+    assert frr_parse.prefix_bounds("10.0.0.9") == (0x0A000009, 0x0A000009, 32)
+    for bad in ("10.0.12.0/33", "10.0.12/24", "10.0.12.0/x"):
+        with pytest.raises(ValueError):
+            frr_parse.prefix_bounds(bad)
+        assert [f.kind for f in prefix_audit.audit({"a": {"lan_net": bad, "ospf_networks": []}})] == ["invalid"]
@@ -0,0 +1,92 @@
+import pytest
+import frr_records
+import report
+
+ROUTE_JSON = {
+    "10.0.2.0/24": [
+        {"prefix": "10.0.2.0/24", "protocol": "ospf", "selected": True, "installed": True,
+         "distance": 110, "metric": 20, "uptime": "00:51:15",
+         "nexthops": [{"fib": True, "ip": "10.0.12.2", "interfaceName": "eth1", "active": True}]},
+    ],
+    "10.0.12.0/30": [
+        {"prefix": "10.0.12.0/30", "protocol": "ospf", "distance": 110, "metric": 10,
+         "nexthops": [{"directlyConnected": True, "interfaceName": "eth1", "active": True}]},
+        {"prefix": "10.0.12.0/30", "protocol": "connected", "selected": True, "installed": True,
+         "nexthops": [{"fib": True, "directlyConnected": True, "interfaceName": "eth1", "active": True}]},
+    ],
+}
+NEIGHBOR_JSON = {"neighbors": {"172.20.20.3": [
+    {"nbrPriority": 1, "nbrState": "Full/-", "ifaceAddress": "10.0.12.2", "ifaceName": "eth1:10.0.12.1"},
+]}}
+
+def test_route_records_normalize_frr_json():
+    recs = frr_records.route_records(ROUTE_JSON)
+    assert len(recs) == 3
+    ospf = recs[0]
+    assert (ospf["code"], ospf["selected"], ospf["fib"], ospf["metric"]) == ("O", True, True, 20)
+    assert ospf["nexthops"][0]["ip"] == "10.0.12.2"
+
+def test_neighbor_records_accept_old_and_new_layouts():
+    new = frr_records.neighbor_records(NEIGHBOR_JSON)
+    old = frr_records.neighbor_records({"neighbors": {"172.20.20.3": {"state": "Full/DR", "address": "10.0.12.2"}}})
+    assert new[0]["full"] and old[0]["full"]
+    assert new[0]["address"] == old[0]["address"] == "10.0.12.2"
+
+def test_report_prefers_records_and_falls_back_to_text(recorded_snapshot):
+    text_metrics = report.node_ospf_metrics(recorded_snapshot["clab-netauto-r1"])
+    structured = {
+        "route_records": frr_records.route_records(ROUTE_JSON),
+        "neighbor_records": frr_records.neighbor_records(NEIGHBOR_JSON),
+    }
+    assert text_metrics == (3, 1, 1)
+    assert report.node_ospf_metrics(structured) == (2, 1, 1)
+
+def test_parse_routes_text_into_compact_records(recorded_snapshot):
+    import frr_parse
+    text = recorded_snapshot["clab-netauto-r1"]["routes"]
+    recs = frr_parse.parse_routes(text)
+    assert len(recs) == 7                       # 범례 줄 제외
+    assert frr_parse.parse_routes(text) is recs  # 내용 해시 캐시
+    ospf = [r for r in recs if r.code == "O" and r.selected]
+    assert len(ospf) == 1
+    r = ospf[0]
+    assert (r.prefix, r.network, r.prefixlen) == ("10.0.2.0/24", frr_parse.ip_to_int("10.0.2.0"), 24)
+    assert (r.distance, r.metric, r.nexthop, r.interface, r.age) == (110, 20, "10.0.12.2", "eth1", "00:51:15")
+    assert not hasattr(r, "__dict__")
+
+def test_ip_to_int_accepts_only_dotted_quads():
+    import frr_parse
+    assert frr_parse.ip_to_int("10.0.0.2") == 0x0A000002
+    assert frr_parse.prefix_to_ints("10.0.2.9/24") == (0x0A000200, 24)
+    for bad in ("10.0.2", "1", "300.0.0.1", "10.0.0.2 ", "010.0.0.1"):
+        with pytest.raises(ValueError):
+            frr_parse.ip_to_int(bad)
+    with pytest.raises(ValueError):
+        frr_parse.prefix_to_ints("10.0.0.0/33")
+
+def test_parse_routes_ecmp_continuation_lines():
+    import frr_parse
+    text = (
+        "O>* 10.9.0.0/16 [110/30] via 10.0.12.2, eth1, weight 1, 00:01:00\n"
+        "  *                     via 10.0.13.2, eth3, weight 1, 00:01:00\n"
+    )
+    recs = frr_parse.parse_routes(text)
+    assert [r.nexthop for r in recs] == ["10.0.12.2", "10.0.13.2"]
+    assert report.parse_ospf_routes_count(text) == 1
+
+def test_parse_routes_nexthop_interface_and_age_fields():
+    import frr_parse
+    text = (
+        "B>  10.9.0.0/16 [20/0] via 10.0.12.9 (recursive), weight 1, 2w3d01h\n"
+        "  *                    via 10.0.12.2, eth1 onlink, weight 1, 1d02h03m\n"
+        "S>* 10.8.0.0/16 [1/0] via 10.0.12.2, eth1\n"
+        "O>* 10.7.0.0/16 [110/30] via 10.0.12.2, eth1, weight 1, 00:0x:15\n"
+        "O>* 10.6.0.0/33 [110/30] via 10.0.12.2, eth1, weight 1, 00:01:15\n"   # 길이 범위 밖 -> 무시
+    )
+    fields = [(r.prefix, r.nexthop, r.interface, r.age) for r in frr_parse.parse_routes(text)]
+    assert fields == [
+        ("10.9.0.0/16", "10.0.12.9", "weight 1", "2w3d01h"),
+        ("10.9.0.0/16", "10.0.12.2", "eth1 onlink", "1d02h03m"),
+        ("10.8.0.0/16", "10.0.12.2", "eth1", ""),
+        ("10.7.0.0/16", "10.0.12.2", "eth1", ""),        # 나이 형식이 아니면 빈 문자열
+    ]
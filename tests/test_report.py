@@ -0,0 +1,47 @@
+import json
+import report
+
+JUNIT = dict(tests=0, failures=0, errors=0, skipped=0, passed=0)
+
+def _use_tmp_docs(monkeypatch, tmp_path):
+    monkeypatch.setattr(report, "DOCS_DIR", tmp_path)
+    monkeypatch.setattr(report, "REPORT_MD", tmp_path / "report.md")
+    monkeypatch.setattr(report, "STATE_PATH", tmp_path / ".report_state.json")
+
+def test_incremental_report_rebuilds_only_changed_nodes(monkeypatch, tmp_path, recorded_snapshot):
+    _use_tmp_docs(monkeypatch, tmp_path)
+    data = recorded_snapshot
+    assert report.update_report(data, JUNIT) == 2
+    data["clab-netauto-r1"]["latency_ms"] = 12.5          # 지문에서 제외되는 값
+    assert report.update_report(data, JUNIT) == 0
+
+    data["clab-netauto-r2"]["ospf"] = ""                  # r2 이웃 사라짐
+    assert report.update_report(data, JUNIT) == 1
+    text = report.REPORT_MD.read_text(encoding="utf-8")
+    assert "| OSPF Neighbors (Full) | 1/1 |" in text
+    assert "172.20.20.2" not in text                      # 상세 섹션도 갱신됨
+    assert "172.20.20.3" in text
+
+def test_removed_nodes_drop_out_of_report(monkeypatch, tmp_path, recorded_snapshot):
+    _use_tmp_docs(monkeypatch, tmp_path)
+    data = recorded_snapshot
+    report.update_report(data, JUNIT)
+    del data["clab-netauto-r2"]
+    report.update_report(data, JUNIT)
+    assert "## clab-netauto-r2" not in report.REPORT_MD.read_text(encoding="utf-8")
+
+def test_detail_blocks_are_copied_by_offset_not_kept_in_state(monkeypatch, tmp_path, recorded_snapshot):
+    _use_tmp_docs(monkeypatch, tmp_path)
+    data = recorded_snapshot
+    report.update_report(data, JUNIT)
+    data["clab-netauto-r2"]["ospf"] = ""
+    assert report.update_report(data, JUNIT) == 1              # r1 블록은 이전 report.md 에서 복사
+    text = report.REPORT_MD.read_text(encoding="utf-8")
+    assert text.endswith(report.build_detail_md(data))
+    state = json.loads(report.STATE_PATH.read_text(encoding="utf-8"))
+    assert all(set(st) == {"fp", "metrics", "offset", "length"} for st in state["nodes"].values())
+    assert not list(tmp_path.glob(".part-*"))
+
+    report.REPORT_MD.write_text(text.replace("clab-netauto-r1", "clab-netauto-rX"), encoding="utf-8")
+    assert report.update_report(data, JUNIT) == 2              # 손으로 고친 report.md -> offset 불신, 전부 렌더
+    assert report.REPORT_MD.read_text(encoding="utf-8") == text
@@ -0,0 +1,20 @@
+import route_index
+
+def test_lpm_prefers_longest_selected_prefix(recorded_snapshot):
+    idx = route_index.build_indexes(recorded_snapshot)["clab-netauto-r1"]
+    r = idx.lookup("10.0.2.100")
+    assert (r.code, r.prefix, r.nexthop) == ("O", "10.0.2.0/24", "10.0.12.2")
+    # 10.0.1.0/24 은 O(미선택)와 C>* 가 있으나 선택된 connected 경로만 인덱스에 들어감
+    assert idx.lookup("10.0.1.100").code == "C"
+    # 나머지는 default route
+    assert idx.lookup("8.8.8.8").prefix == "0.0.0.0/0"
+
+def test_many_expectations_against_one_snapshot(recorded_snapshot):
+    idx = route_index.build_indexes(recorded_snapshot)
+    expectations = [("clab-netauto-r1", f"10.0.2.{h}", "10.0.12.2") for h in range(1, 255)]
+    expectations += [("clab-netauto-r2", f"10.0.1.{h}", "10.0.12.1") for h in range(1, 255)]
+    assert all(idx[node].nexthops(addr) == [nh] for node, addr, nh in expectations)
+
+def test_no_route_without_default():
+    idx = route_index.RouteIndex([])
+    assert idx.lookup("10.0.0.1") is None and idx.lookup_all("10.0.0.1") == ()
@@ -0,0 +1,26 @@
+import json
+import report
+import snapshot
+
+def test_ndjson_gzip_roundtrip_and_json_export(tmp_path, recorded_snapshot):
+    data = recorded_snapshot
+    nd = tmp_path / "routes.ndjson.gz"
+    with snapshot.NdjsonWriter(nd) as w:
+        for node, payload in data.items():
+            w.write(node, payload)
+    assert snapshot.is_ndjson(nd)
+    assert snapshot.load(nd) == data
+    out = tmp_path / "routes.json"
+    assert snapshot.export_json(nd, out) == 2
+    assert json.loads(out.read_text(encoding="utf-8")) == data
+
+def test_streaming_metrics_match_dict_metrics(tmp_path, recorded_snapshot):
+    data = recorded_snapshot
+    nd = tmp_path / "routes.ndjson"
+    with snapshot.NdjsonWriter(nd) as w:
+        for node, payload in data.items():
+            w.write(node, payload)
+    assert report.aggregate_metrics(snapshot.iter_nodes(nd)) == report.aggregate_metrics(data)
+
+def test_missing_snapshot_is_empty(tmp_path):
+    assert snapshot.load(tmp_path / "nope.ndjson") == {}
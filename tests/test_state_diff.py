@@ -0,0 +1,51 @@
+import copy
+import json
+import history
+import state_diff
+import synth
+
+def _write(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+def test_identical_snapshots_have_no_diff(tmp_path, recorded_snapshot):
+    a = _write(tmp_path / "a.json", recorded_snapshot)
+    assert state_diff.diff_snapshots(a, a) == {}
+    assert state_diff.main([str(a), str(a)]) == 0
+
+def test_added_removed_changed_routes_and_neighbor_transition(tmp_path, recorded_snapshot):
+    old = recorded_snapshot
+    new = copy.deepcopy(old)
+    r1 = new["clab-netauto-r1"]
+    r1["routes"] = (r1["routes"]
+                    .replace("O>* 10.0.2.0/24 [110/20] via 10.0.12.2", "O>* 10.0.2.0/24 [110/30] via 10.0.12.2")
+                    .replace("C>* 172.20.20.0/24 is directly connected, eth0, 00:53:38\n", "")
+                    + "O>* 10.0.3.0/24 [110/20] via 10.0.12.2, eth1, weight 1, 00:00:05\n")
+    r1["ospf"] = r1["ospf"].replace("Full/-  ", "Init/-  ")
+    new["clab-netauto-r2"]["error"] = "timeout"               # 실패 장비는 비교하지 않음
+
+    res = state_diff.diff_snapshots(_write(tmp_path / "old.json", old), _write(tmp_path / "new.json", new))
+    assert list(res) == ["clab-netauto-r1"]
+    d = res["clab-netauto-r1"]
+    assert [(r["code"], r["prefix"]) for r in d["added"]] == [("O", "10.0.3.0/24")]
+    assert [(r["code"], r["prefix"]) for r in d["removed"]] == [("C", "172.20.20.0/24")]
+    assert d["changed"] == [{"prefix": "10.0.2.0/24", "code": "O", "changes": {"metric": [20, 30]}}]
+    assert d["neighbors"] == [{"neighbor_id": "172.20.20.3", "old": "Full/-", "new": "Init/-",
+                               "address": "10.0.12.2"}]
+    text = state_diff.format_text(res)
+    assert "~ O 10.0.2.0/24: metric 20 -> 30" in text
+    assert "~ neighbor 172.20.20.3 (10.0.12.2): Full/- -> Init/-" in text
+
+def test_ecmp_nexthop_order_is_ignored():
+    a = {"routes": "O>* 10.0.9.0/24 [110/20] via 10.0.12.2, eth1, weight 1, 00:01:00\n"
+                   "  *                     via 10.0.13.2, eth2, weight 1, 00:01:00\n"}
+    b = {"routes": "O>* 10.0.9.0/24 [110/20] via 10.0.13.2, eth2, weight 1, 00:02:00\n"
+                   "  *                     via 10.0.12.2, eth1, weight 1, 00:02:00\n"}
+    assert state_diff.is_empty(state_diff.diff_device(a, b))
+
+def test_route_groups_are_cached_per_parsed_table():
+    payload = {"routes": synth.route_table(300, ecmp=0.2)}
+    groups = history.route_groups(payload)
+    assert history.route_groups(dict(payload)) is groups       # 같은 원문 -> 같은 파싱 튜플 -> 캐시 적중
+    ecmp = [st[4] for st in groups.values() if len(st[4]) > 1]
+    assert ecmp and all(list(nhs) == sorted(nhs, key=str) for nhs in ecmp)
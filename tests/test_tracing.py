@@ -0,0 +1,115 @@
+import argparse
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+import collect_routes
+import fakelab
+import report
+import tracing
+
+
+@pytest.fixture(autouse=True)
+def own_tracer(monkeypatch):
+    # conftest 가 NETAUTO_TRACE 로 켠 세션 트레이서를 건드리지 않도록 테스트마다 전역을 비워 두고 되돌린다
+    monkeypatch.setattr(tracing, "_tracer", None)
+    monkeypatch.setattr(tracing, "_outer", [])
+
+
+def test_span_is_noop_when_disabled(monkeypatch):
+    monkeypatch.delenv(tracing.TRACE_ENV, raising=False)
+    assert tracing.start("x") is None
+    with tracing.span("stage", device="r1") as sp:
+        sp.set(bytes=10)
+    assert sp is tracing.NULL_SPAN and tracing.finish() is None
+
+
+def test_env_values_and_nested_sessions_restore_outer(tmp_path, monkeypatch):
+    for off in ("0", "false", "OFF", ""):
+        monkeypatch.setenv(tracing.TRACE_ENV, off)
+        assert tracing.trace_setting() is None and tracing.start("x") is None
+    monkeypatch.setenv(tracing.TRACE_ENV, "yes")
+    assert tracing.trace_setting() == tracing.OUT
+    monkeypatch.setenv(tracing.TRACE_ENV, str(tmp_path))
+    assert tracing.trace_path("x") == tmp_path / "trace-x.json"
+
+    outer = tracing.start("outer")
+    with tracing.session("inner"):
+        with tracing.span("device", device="r1"):
+            pass
+    assert tracing.enabled() and tracing._tracer is outer
+    monkeypatch.setenv(tracing.TRACE_ENV, "0")
+    with tracing.session("quiet"):           # 꺼진 세션이 바깥 트레이서를 닫지 않음
+        with tracing.span("write"):
+            pass
+    assert tracing.finish() == tmp_path / "trace-outer.json" and not tracing.enabled()
+    tools = {s["tool"]: s for s in tracing.load_summaries(tmp_path)}
+    assert set(tools) == {"outer", "inner"}
+    assert "device" in tools["inner"]["summary"]["stages"] and "write" in tools["outer"]["summary"]["stages"]
+
+
+def test_trace_flag_uses_the_same_on_off_words(tmp_path, monkeypatch):
+    ap = argparse.ArgumentParser()
+    tracing.add_arguments(ap)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv(tracing.TRACE_ENV, str(tmp_path))
+    for off in ("0", "off", ""):
+        assert ap.parse_args(["--trace", off]).trace is False
+        with tracing.session("x", ap.parse_args(["--trace", off]).trace) as tracer:
+            assert tracer is None                    # NETAUTO_TRACE 가 켜져 있어도 끔
+    assert not list(tmp_path.iterdir())
+    with tracing.session("x", ap.parse_args(["--trace", "on"]).trace):
+        pass
+    assert (tmp_path / "trace-x.json").exists()
+    assert ap.parse_args(["--trace", "out/t.json"]).trace == Path("out/t.json")
+
+
+def test_chrome_trace_and_summary(tmp_path):
+    path = tmp_path / "trace-t.json"
+    tracing.start("t", path)
+
+    def work(i):
+        with tracing.span("device", device=f"r{i}") as sp:
+            sp.set(bytes=100)
+            sp.add("retries", i)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    done = []
+    with tracing.timed(done, "render"):
+        pass
+    tracing.record_all(done, tid=1, host="h1")
+    assert tracing.finish() == path and not tracing.enabled()
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    spans = [e for e in data["traceEvents"] if e["ph"] == "X"]
+    assert {e["name"] for e in spans} == {"device", "render"}
+    assert all(isinstance(e["ts"], int) and e["dur"] >= 0 for e in spans)
+    summary = data["otherData"]["summary"]
+    assert summary["stages"]["device"]["count"] == 4
+    assert summary["stages"]["device"]["bytes"] == 400
+    assert summary["stages"]["device"]["retries"] == 6
+    assert {s["subject"] for s in summary["slowest"]} == {"r0", "r1", "r2", "r3", "h1"}
+    assert tracing.load_summaries(tmp_path)[0]["tool"] == "t"
+
+
+def test_collect_records_device_spans_and_perf_section(tmp_path):
+    lab = fakelab.FakeExecutor(fakelab.FakeLab.synthetic(2, routes=5))
+    tracing.start("collect_routes", tmp_path / "trace-collect_routes.json")
+    for c in ("clab-synth-r1", "clab-synth-r2"):
+        collect_routes.collect_device(c, structured=True, run=lab.run_batch)
+    tracing.finish()
+
+    perf = tracing.load_summaries(tmp_path)
+    stages = perf[0]["summary"]["stages"]
+    assert stages["device"]["count"] == 2 and stages["device"]["bytes"] > 0
+    assert stages["exec"]["count"] == 2
+    md = report.build_perf_md(perf)
+    assert "### Performance" in md and "| collect_routes | device | 2 |" in md
+    assert "clab-synth-r1" in md and "clab-synth-r2" in md
+    assert report.build_perf_md([]) == ""
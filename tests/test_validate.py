@@ -0,0 +1,24 @@
+import json
+import shutil
+
+import configgen
+import validate
+
+ROUTERS = ["clab-netauto-r1", "clab-netauto-r2"]
+
+
+def test_subset_run_keeps_other_hosts_cache_entries(tmp_path, monkeypatch):
+    for h in ROUTERS:
+        shutil.copy(configgen.ROOT / "backups" / f"{h}.conf", tmp_path / f"{h}.conf")
+    cache = tmp_path / "out" / ".validate_cache.json"
+    monkeypatch.setattr(validate, "backups_dir", tmp_path)
+    monkeypatch.setattr(validate, "cache_path", cache)
+
+    validate.run_checks(ROUTERS, jobs=1)
+    assert sorted(json.loads(cache.read_text(encoding="utf-8"))) == ROUTERS
+    _, hits = validate.run_checks(ROUTERS[:1], jobs=1)
+    assert hits == 1 and sorted(json.loads(cache.read_text(encoding="utf-8"))) == ROUTERS
+    assert not list(cache.parent.glob(".part-*"))
+
+    validate.write_cache(cache, {}, drop=[ROUTERS[1]])
+    assert sorted(json.loads(cache.read_text(encoding="utf-8"))) == ROUTERS[:1]
@@ -0,0 +1,17 @@
+from conftest import vtysh
+
+def test_split_output_demuxes_echoed_commands():
+    cmds = ["show version", "show ip route 10.0.2.0/24"]
+    raw = (
+        "r1# show version\n"
+        "FRRouting 9.1 (r1).\n"
+        "r1# show ip route 10.0.2.0/24\n"
+        'Routing entry for 10.0.2.0/24\n  Known via "ospf"\n'
+    )
+    out = vtysh.split_output(raw, cmds)
+    assert out["show version"] == "FRRouting 9.1 (r1).\n"
+    assert out["show ip route 10.0.2.0/24"].startswith("Routing entry for 10.0.2.0/24")
+
+def test_split_output_missing_command_is_empty():
+    out = vtysh.split_output("r1# show version\nFRRouting\n", ["show version", "show ip ospf neighbor"])
+    assert out == {"show version": "FRRouting\n", "show ip ospf neighbor": ""}